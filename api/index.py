@@ -4,6 +4,8 @@ import os
 import secrets
 import httpx
 
+from maestroia.core.metrics import install_fastapi
+
 app = FastAPI(
     title="MaestroIA API",
     description="Orquestrador de Agentes de IA para Marketing Digital",
@@ -11,6 +13,7 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc"
 )
+install_fastapi(app, "vercel")
 
 # ===========================
 # OAUTH CONFIGURATION
@@ -22,6 +25,13 @@ GOOGLE_OAUTH_CLIENT_SECRET = os.getenv("GOOGLE_OAUTH_CLIENT_SECRET")
 GITHUB_OAUTH_CLIENT_ID = os.getenv("GITHUB_OAUTH_CLIENT_ID")
 GITHUB_OAUTH_CLIENT_SECRET = os.getenv("GITHUB_OAUTH_CLIENT_SECRET")
 
+# Endpoints dos provedores; MOCK_PLATFORMS_URL aponta todos para o servidor local de testes
+MOCK_PLATFORMS_URL = os.getenv("MOCK_PLATFORMS_URL", "").rstrip("/")
+GOOGLE_TOKEN_URL = os.getenv("GOOGLE_TOKEN_URL", f"{MOCK_PLATFORMS_URL}/token" if MOCK_PLATFORMS_URL else "https://oauth2.googleapis.com/token")
+GOOGLE_USERINFO_URL = os.getenv("GOOGLE_USERINFO_URL", f"{MOCK_PLATFORMS_URL}/oauth2/v2/userinfo" if MOCK_PLATFORMS_URL else "https://www.googleapis.com/oauth2/v2/userinfo")
+GITHUB_TOKEN_URL = os.getenv("GITHUB_TOKEN_URL", f"{MOCK_PLATFORMS_URL}/login/oauth/access_token" if MOCK_PLATFORMS_URL else "https://github.com/login/oauth/access_token")
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", MOCK_PLATFORMS_URL or "https://api.github.com").rstrip("/")
+
 # ===========================
 # OAUTH ROUTES - GOOGLE
 # ===========================
@@ -55,7 +65,7 @@ async def google_oauth_callback(code: str = Query(None), error: str = Query(None
     async with httpx.AsyncClient() as client:
         # Trocar código por token
         token_response = await client.post(
-            "https://oauth2.googleapis.com/token",
+            GOOGLE_TOKEN_URL,
             data={
                 "client_id": GOOGLE_OAUTH_CLIENT_ID,
                 "client_secret": GOOGLE_OAUTH_CLIENT_SECRET,
@@ -73,7 +83,7 @@ async def google_oauth_callback(code: str = Query(None), error: str = Query(None
         
         # Obter informações do usuário
         userinfo_response = await client.get(
-            "https://www.googleapis.com/oauth2/v2/userinfo",
+            GOOGLE_USERINFO_URL,
             headers={"Authorization": f"Bearer {access_token}"}
         )
         
@@ -124,7 +134,7 @@ async def github_oauth_callback(code: str = Query(None), error: str = Query(None
     async with httpx.AsyncClient() as client:
         # Trocar código por token
         token_response = await client.post(
-            "https://github.com/login/oauth/access_token",
+            GITHUB_TOKEN_URL,
             data={
                 "client_id": GITHUB_OAUTH_CLIENT_ID,
                 "client_secret": GITHUB_OAUTH_CLIENT_SECRET,
@@ -146,7 +156,7 @@ async def github_oauth_callback(code: str = Query(None), error: str = Query(None
         
         # Obter informações do usuário
         userinfo_response = await client.get(
-            "https://api.github.com/user",
+            f"{GITHUB_API_URL}/user",
             headers={
                 "Authorization": f"Bearer {access_token}",
                 "Accept": "application/json"
@@ -162,7 +172,7 @@ async def github_oauth_callback(code: str = Query(None), error: str = Query(None
         email = user_info.get("email")
         if not email:
             email_response = await client.get(
-                "https://api.github.com/user/emails",
+                f"{GITHUB_API_URL}/user/emails",
                 headers={
                     "Authorization": f"Bearer {access_token}",
                     "Accept": "application/json"
@@ -1,5 +1,12 @@
+import time
+
 from maestroia.core.state import MaestroState
 from maestroia.services.openai_service import chat as openai_chat
+from maestroia.memory.store import (
+    lookup_campaign_memory,
+    store_campaign_memory,
+    memory_report,
+)
 
 
 def agente_estrategista(state: MaestroState) -> MaestroState:
@@ -18,6 +25,43 @@ def agente_estrategista(state: MaestroState) -> MaestroState:
             "erros": ["Pesquisa de mercado não encontrada no estado."]
         }
 
+    tenant = state.get("tenant_id")  # sem tenant, sem memória
+    entradas = {"objetivo": objetivo, "publico_alvo": publico, "canais": canais}
+    inicio = time.perf_counter()
+
+    memoria = lookup_campaign_memory("estrategia", tenant, entradas)
+    if memoria and memoria["modo"] == "reuso":
+        return {
+            "estrategia": memoria["output"],
+            "reuso_memoria": memory_report(state.get("reuso_memoria"), "estrategia", memoria, inicio),
+        }
+
+    if memoria:
+        delta_prompt = f"""
+    Você é um estrategista de marketing digital sênior.
+
+    Revise a estratégia abaixo, criada para uma campanha semelhante, para o novo contexto.
+
+    Objetivo: {objetivo}
+    Público-alvo: {publico}
+    Canais: {", ".join(canais)}
+
+    Pesquisa de mercado atual:
+    {pesquisa}
+
+    Estratégia anterior:
+    {memoria['output']}
+
+    Mantenha a estrutura (Posicionamento, Mensagem central, Estratégia por canal, KPIs)
+    e altere apenas o que a nova pesquisa, o público ou os canais exigirem.
+    """
+        resposta_text = openai_chat(delta_prompt)
+        store_campaign_memory("estrategia", tenant, entradas, resposta_text, memoria["duracao_original_s"])
+        return {
+            "estrategia": resposta_text,
+            "reuso_memoria": memory_report(state.get("reuso_memoria"), "estrategia", memoria, inicio),
+        }
+
     prompt = f"""
     Você é um estrategista de marketing digital sênior.
 
@@ -38,7 +82,9 @@ def agente_estrategista(state: MaestroState) -> MaestroState:
     """
 
     resposta_text = openai_chat(prompt)
+    store_campaign_memory("estrategia", tenant, entradas, resposta_text, time.perf_counter() - inicio)
 
     return {
-        "estrategia": resposta_text
+        "estrategia": resposta_text,
+        "reuso_memoria": memory_report(state.get("reuso_memoria"), "estrategia", None, inicio),
     }
@@ -1,3 +1,5 @@
+import time
+
 from maestroia.config.settings import (
     ENVIRONMENT,
     DEFAULT_LLM_MODEL,
@@ -6,6 +8,11 @@ from maestroia.config.settings import (
 from maestroia.core.state import MaestroState
 from maestroia.services.trends_service import get_trends_summary
 from maestroia.services.openai_service import chat as openai_chat
+from maestroia.memory.store import (
+    lookup_campaign_memory,
+    store_campaign_memory,
+    memory_report,
+)
 
 def agente_pesquisador(state: MaestroState) -> MaestroState:
     """
@@ -14,11 +21,46 @@ def agente_pesquisador(state: MaestroState) -> MaestroState:
 
     objetivo = state.get("objetivo", "Marketing digital")
     publico = state.get("publico_alvo", "Público geral")
+    tenant = state.get("tenant_id")  # sem tenant, sem memória
+    entradas = {"objetivo": objetivo, "publico_alvo": publico}
+    inicio = time.perf_counter()
+
+    # Campanha próxima de uma anterior do mesmo tenant: evita a análise completa
+    memoria = lookup_campaign_memory("pesquisa", tenant, entradas)
+    if memoria and memoria["modo"] == "reuso":
+        return {
+            "pesquisa": memoria["output"],
+            "reuso_memoria": memory_report(state.get("reuso_memoria"), "pesquisa", memoria, inicio),
+        }
 
     # Buscar tendências via trends_service (pytrends encapsulado)
     keywords = [objetivo, publico]
     trends_summary = get_trends_summary(keywords)
 
+    if memoria:
+        # Atualização delta: uma chamada ao LLM sobre a pesquisa anterior
+        delta_prompt = f"""
+    Atualize a pesquisa de mercado abaixo, feita para uma campanha semelhante, para o novo contexto.
+
+    Campanha anterior: objetivo "{memoria['inputs'].get('objetivo')}", público-alvo "{memoria['inputs'].get('publico_alvo')}"
+    Nova campanha: objetivo "{objetivo}", público-alvo "{publico}"
+
+    Dados atuais do Google Trends:
+    {trends_summary}
+
+    Pesquisa anterior:
+    {memoria['output']}
+
+    Ajuste apenas o que muda com o novo objetivo/público e com os dados atuais,
+    mantendo a mesma estrutura e as fontes citadas.
+    """
+        resposta_text = openai_chat(delta_prompt)
+        store_campaign_memory("pesquisa", tenant, entradas, resposta_text, memoria["duracao_original_s"])
+        return {
+            "pesquisa": resposta_text,
+            "reuso_memoria": memory_report(state.get("reuso_memoria"), "pesquisa", memoria, inicio),
+        }
+
     # Simulação de dados SEMrush (API paga - integrar chave real futuramente)
     semrush_data = f"Dados do SEMrush (dezembro 2024): Palavras-chave relacionadas '{objetivo}' com volume estimado de 8.500-12.000 buscas mensais globais, dificuldade de SEO média-alta (65/100). Palavras-chave relacionadas '{publico}' com volume de 4.200-6.800 buscas mensais, tendência de crescimento de 15% nos últimos 3 meses."
 
@@ -61,7 +103,9 @@ def agente_pesquisador(state: MaestroState) -> MaestroState:
     """
 
     resposta_text = openai_chat(prompt)
+    store_campaign_memory("pesquisa", tenant, entradas, resposta_text, time.perf_counter() - inicio)
 
     return {
-        "pesquisa": resposta_text
+        "pesquisa": resposta_text,
+        "reuso_memoria": memory_report(state.get("reuso_memoria"), "pesquisa", None, inicio),
     }
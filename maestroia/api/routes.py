@@ -1,33 +1,45 @@
-
-# Rota para buscar histórico de campanhas do usuário autenticado
-@app.get("/campaign/history")
-def get_campaign_history(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    campaigns = db.query(Campaign).filter(Campaign.user_id == current_user.id).all()
-    history = []
-    for c in campaigns:
-        history.append({
-            "id": c.id,
-            "objetivo": c.objetivo,
-            "publico_alvo": c.publico_alvo,
-            "canais": c.canais.split(",") if c.canais else [],
-            "orcamento": c.orcamento,
-            "resultado": json.loads(c.resultado) if c.resultado else None
-        })
-    return {"history": history}
-
-from fastapi import FastAPI, Depends, HTTPException, status, Request
+from fastapi import FastAPI, Depends, HTTPException, status, Request, Response
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from maestroia.graphs.marketing_graph import build_marketing_graph
 from maestroia.core.state import MaestroState
-from maestroia.core.database import get_db, User, hash_password, verify_password
-from maestroia.core.auth import create_access_token, get_current_user
+from maestroia.core.database import get_db, init_db, SessionLocal, User
+from maestroia.core.passwords import get_password_hasher, PasswordPoolSaturated
+from maestroia.core.auth import Principal, create_access_token, get_current_user, invalidate_user
+from maestroia.core.metrics import install_fastapi
+from maestroia.core import profiling
+import io
 import json
+import uuid
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+from typing import Optional
 import mercadopago
 from maestroia.config.settings import MERCADOPAGO_ACCESS_TOKEN
 from maestroia.services.meta_service import get_meta_oauth_url, exchange_code_for_token
 from maestroia.services.token_store import save_token
-from maestroia.config.settings import META_REDIRECT_URI
+from maestroia.config.settings import META_REDIRECT_URI, CAMPAIGN_RETRY_AFTER_SECONDS, PASSWORD_RETRY_AFTER_SECONDS
+from maestroia.config.settings import DB_AUTO_MIGRATE
+from maestroia.services.campaign_runner import get_campaign_runner, CampaignRunnerSaturated
+from maestroia.services import campaign_bulk, campaign_export, campaign_history, campaign_search
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema na inicialização, não no import; com DB_AUTO_MIGRATE=false o deploy roda as migrações
+    if DB_AUTO_MIGRATE:
+        init_db()
+    yield
+
+
+app = FastAPI(title="MaestroIA API", lifespan=lifespan)
+install_fastapi(app, "routes")
+
+graph = build_marketing_graph()
+
+
 @app.post("/webhook/mercadopago")
 async def webhook_mercadopago(request: Request, db: Session = Depends(get_db)):
     """
@@ -67,6 +79,7 @@ async def webhook_mercadopago(request: Request, db: Session = Depends(get_db)):
                     user.plano = "free"
                 user.pago = True
                 db.commit()
+                invalidate_user(user.email)
                 return {"status": f"Plano '{user.plano}' ativado para {payer_email}"}
             else:
                 return {"error": f"Usuário com email {payer_email} não encontrado."}
@@ -100,16 +113,31 @@ def meta_auth_callback(code: str, state: str = None, request: Request = None):
     save_token("meta", user_key, result.get("data"))
     return {"status": "ok", "user": user_key, "data": result.get("data")}
 
-app = FastAPI(title="MaestroIA API")
+# Pool cheio, worker que estourou PASSWORD_HASH_TIMEOUT_SECONDS ou pool quebrado (worker
+# morto; o próximo pedido recria o pool): em todos os casos o cliente pode tentar de novo.
+PASSWORD_POOL_ERRORS = (PasswordPoolSaturated, FuturesTimeoutError, BrokenProcessPool)
 
-graph = build_marketing_graph()
 
+def _password_pool_busy(e: Exception) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail=f"Muitos logins simultâneos ({e or type(e).__name__}). Tente novamente em instantes.",
+        headers={"Retry-After": str(PASSWORD_RETRY_AFTER_SECONDS)},
+    )
+
+
+# /register e /token esperam o bcrypt no pool de processos (maestroia.core.passwords): a
+# thread da requisição fica livre de CPU e o limite do pool impede que um pico de logins
+# ocupe todas as threads do servidor.
 @app.post("/register")
 def register(email: str, password: str, db: Session = Depends(get_db)):
     user = db.query(User).filter(User.email == email).first()
     if user:
         raise HTTPException(status_code=400, detail="Email already registered")
-    hashed_password = hash_password(password)
+    try:
+        hashed_password = get_password_hasher().hash(password)
+    except PASSWORD_POOL_ERRORS as e:
+        raise _password_pool_busy(e)
     new_user = User(email=email, hashed_password=hashed_password)
     db.add(new_user)
     db.commit()
@@ -118,28 +146,178 @@ def register(email: str, password: str, db: Session = Depends(get_db)):
 @app.post("/token")
 def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user:
+        raise HTTPException(status_code=400, detail="Incorrect email or password")
+    try:
+        valid, new_hash = get_password_hasher().verify(form_data.password, user.hashed_password)
+    except PASSWORD_POOL_ERRORS as e:
+        raise _password_pool_busy(e)
+    if not valid:
         raise HTTPException(status_code=400, detail="Incorrect email or password")
-    access_token = create_access_token(data={"sub": user.email})
+    if new_hash:
+        # BCRYPT_ROUNDS mudou desde o cadastro: regrava o hash com o custo atual
+        user.hashed_password = new_hash
+        db.commit()
+    # "uid" no token: o get_current_user não precisa buscar o usuário pelo email
+    access_token = create_access_token(data={"sub": user.email, "uid": user.id})
     return {"access_token": access_token, "token_type": "bearer"}
 
-from maestroia.core.database import Campaign
+def _executar_campanha(state: dict, user_id: int, request_id: str, profile_id: str, perfilar: bool,
+                       email: str) -> dict:
+    """Grafo + gravação da campanha; roda numa thread do CampaignRunner, nunca no event loop."""
+    with profiling.profile(profile_id, enabled=perfilar, rota="/campaign/run", usuario=email, requisicao=request_id):
+        result = graph.invoke(state)
+    # Salva a campanha no banco de dados (MaestroState chega como dict)
+    db = SessionLocal()
+    try:
+        campaign_history.save_campaign(db, user_id, state, result)
+        db.commit()
+    finally:
+        db.close()
+    return result
+
 
 @app.post("/campaign/run")
-async def run_campaign(state: MaestroState, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def run_campaign(state: MaestroState, request: Request, response: Response, current_user: Principal = Depends(get_current_user)):
+    request_id = request.headers.get("x-request-id") or uuid.uuid4().hex[:16]
+    response.headers["X-Request-ID"] = request_id
+    pedido = request.headers.get("x-profile") == "1" or request.query_params.get("profile") == "1"
+    perfilar = profiling.should_profile(pedido, current_user.email)
+    # Id do perfil gerado no servidor: o X-Request-ID vem do cliente e sobrescreveria perfis alheios
+    profile_id = f"{request_id}-{uuid.uuid4().hex[:8]}"
+    if perfilar:
+        response.headers["X-Profile-Id"] = profile_id
+    state = dict(state)
+    # O tenant da memória de campanhas é sempre o usuário autenticado, nunca o que o cliente mandou
+    state["tenant_id"] = str(current_user.id)
+    # Uma campanha por requisição: o retry do cliente com o mesmo X-Request-ID não publica em dobro
+    if not state.get("campanha_id"):
+        state["campanha_id"] = request_id
     try:
-        result = graph.invoke(state)
-        # Salva a campanha no banco de dados
-        campaign = Campaign(
-            user_id=current_user.id,
-            objetivo=state.objetivo if hasattr(state, 'objetivo') else str(getattr(state, 'objetivo', '')),
-            publico_alvo=state.publico_alvo if hasattr(state, 'publico_alvo') else str(getattr(state, 'publico_alvo', '')),
-            canais=','.join(state.canais) if hasattr(state, 'canais') and isinstance(state.canais, list) else str(getattr(state, 'canais', '')),
-            orcamento=str(state.orcamento) if hasattr(state, 'orcamento') else str(getattr(state, 'orcamento', '')),
-            resultado=json.dumps(result)
+        result = await get_campaign_runner().submit(
+            _executar_campanha, state, current_user.id, request_id, profile_id, perfilar, current_user.email
         )
-        db.add(campaign)
-        db.commit()
         return {"status": "success", "result": result}
+    except CampaignRunnerSaturated as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Capacidade de campanhas esgotada ({e}). Tente novamente em instantes.",
+            headers={"Retry-After": str(CAMPAIGN_RETRY_AFTER_SECONDS)},
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+def _bulk_runner(job_id: Optional[str], user_id: int, concurrency: Optional[int]):
+    """BulkRunner já com vaga de lote reservada; sem vaga, 503 antes de ler o arquivo."""
+    runner = campaign_bulk.BulkRunner(graph, user_id, job_id=job_id, concurrency=concurrency)
+    try:
+        runner.reserve()
+    except campaign_bulk.BulkJobsSaturated as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Muitos lotes em execução ({e}). Tente novamente em instantes.",
+            headers={"Retry-After": str(CAMPAIGN_RETRY_AFTER_SECONDS)},
+        )
+    return runner
+
+
+@app.post("/campaign/bulk")
+async def bulk_campaigns(request: Request, format: str = "csv", concurrency: Optional[int] = None,
+                         current_user: Principal = Depends(get_current_user)):
+    """Corpo = arquivo CSV/JSONL de campanhas; responde um fluxo NDJSON de progresso por linha."""
+    if format not in campaign_bulk.FORMATS:
+        raise HTTPException(status_code=400, detail=f"Formato inválido: use {', '.join(campaign_bulk.FORMATS)}")
+    runner = _bulk_runner(None, current_user.id, concurrency)
+    spool = await campaign_bulk.spool_body(request.stream())
+    rows = campaign_bulk.parse_specs(io.TextIOWrapper(spool, encoding="utf-8-sig", newline=""), format)
+    return StreamingResponse(campaign_bulk.ndjson(runner.run(rows)), media_type="application/x-ndjson",
+                             headers={"X-Bulk-Job-Id": runner.job_id})
+
+
+@app.get("/campaign/bulk/{job_id}")
+def get_bulk_job(job_id: str, current_user: Principal = Depends(get_current_user), db: Session = Depends(get_db)):
+    job = campaign_bulk.get_job(db, job_id, current_user.id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Lote não encontrado")
+    return job
+
+
+@app.post("/campaign/bulk/{job_id}/retry")
+def retry_bulk_job(job_id: str, concurrency: Optional[int] = None, current_user: Principal = Depends(get_current_user),
+                   db: Session = Depends(get_db)):
+    """Roda de novo as linhas `failed` do lote (as `invalid` precisam ser corrigidas no arquivo)."""
+    if campaign_bulk.get_job(db, job_id, current_user.id) is None:
+        raise HTTPException(status_code=404, detail="Lote não encontrado")
+    runner = _bulk_runner(job_id, current_user.id, concurrency)
+    return StreamingResponse(campaign_bulk.ndjson(runner.run(campaign_bulk.retry_rows(job_id))),
+                             media_type="application/x-ndjson", headers={"X-Bulk-Job-Id": job_id})
+
+# Rota para buscar histórico de campanhas do usuário autenticado
+@app.get("/campaign/history")
+def get_campaign_history(limit: int = campaign_history.DEFAULT_LIMIT, cursor: Optional[str] = None,
+                         fields: Optional[str] = None, current_user: Principal = Depends(get_current_user),
+                         db: Session = Depends(get_db)):
+    """Resumo paginado (sem `resultado`); a próxima página vem de `?cursor=<next_cursor>`."""
+    try:
+        return campaign_history.list_history(db, current_user.id, limit, cursor, fields)
+    except campaign_history.InvalidQuery as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/campaign/search")
+def search_campaigns(q: str, limit: int = campaign_search.DEFAULT_LIMIT, cursor: Optional[str] = None,
+                     current_user: Principal = Depends(get_current_user), db: Session = Depends(get_db)):
+    """Busca textual nas campanhas do usuário, por relevância, com trecho destacado."""
+    try:
+        return campaign_search.search(db, current_user.id, q, limit, cursor)
+    except campaign_search.InvalidSearch as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/campaign/export")
+def export_campaigns(format: str = "ndjson", include_result: bool = False, gzip: bool = False,
+                     current_user: Principal = Depends(get_current_user)):
+    """Todo o histórico em NDJSON ou CSV, em streaming (memória constante); `gzip=true` comprime no fluxo."""
+    if format not in campaign_export.FORMATS:
+        raise HTTPException(status_code=400, detail=f"Formato inválido: use {', '.join(campaign_export.FORMATS)}")
+    # Sessão própria dentro do gerador: a do Depends(get_db) fecha antes do fim do streaming
+    body = campaign_export.export_campaigns(current_user.id, format, include_result, gzip)
+    filename = campaign_export.export_filename(format, gzip)
+    return StreamingResponse(
+        body,
+        media_type="application/gzip" if gzip else campaign_export.FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@app.get("/campaign/{campaign_id:int}")
+def get_campaign_detail(campaign_id: int, sections: Optional[str] = None,
+                        current_user: Principal = Depends(get_current_user), db: Session = Depends(get_db)):
+    """Campanha com `resultado`; `?sections=estrategia,conteudo` descomprime só essas seções."""
+    wanted = [s.strip() for s in sections.split(",") if s.strip()] if sections else None
+    campaign = campaign_history.get_campaign(db, current_user.id, campaign_id, wanted)
+    if campaign is None:
+        raise HTTPException(status_code=404, detail="Campanha não encontrada")
+    return campaign
+
+
+def _require_admin(current_user: Principal = Depends(get_current_user)) -> Principal:
+    if not profiling.is_admin(current_user.email):
+        raise HTTPException(status_code=403, detail="Apenas administradores")
+    return current_user
+
+
+@app.get("/profiles")
+def list_profiles(limit: int = 50, admin: Principal = Depends(_require_admin)):
+    return {"profiles": profiling.list_profiles(limit)}
+
+
+@app.get("/profiles/{request_id}")
+def get_profile(request_id: str, format: str = "speedscope", admin: Principal = Depends(_require_admin)):
+    """Perfil de uma execução: JSON do speedscope (padrão) ou pilhas collapsed (format=collapsed)."""
+    data = profiling.load_profile(request_id, format)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Perfil não encontrado")
+    if format == "speedscope":
+        return data
+    return Response(data, media_type="text/plain; charset=utf-8")
@@ -1,9 +1,16 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from typing import Optional
+
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from maestroia.core.database import get_db, User, verify_password
+from maestroia.config import settings
+from maestroia.core import metrics
+from maestroia.core.database import SessionLocal, User, verify_password
 
 SECRET_KEY = "your-secret-key"  # Mover para .env
 ALGORITHM = "HS256"
@@ -11,6 +18,73 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+
+@dataclass(frozen=True)
+class Principal:
+    """Usuário autenticado: só o que as rotas usam, sem sessão do banco associada."""
+    id: int
+    email: str
+    plano: Optional[str] = None
+
+
+class PrincipalCache:
+    """Cache LRU com TTL de principals por subject (email) do JWT.
+
+    Por processo: `invalidate` só vale para o worker onde é chamado, e o TTL limita por
+    quanto tempo os demais enxergam dados antigos do usuário.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, subject: str) -> Optional[Principal]:
+        with self._lock:
+            entry = self._entries.get(subject)
+            if entry is not None and entry[1] > time.monotonic():
+                self._entries.move_to_end(subject)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._entries[subject]
+            self.misses += 1
+            return None
+
+    def put(self, subject: str, principal: Principal):
+        if self.ttl_seconds <= 0 or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[subject] = (principal, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(subject)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, subject: str):
+        with self._lock:
+            self._entries.pop(subject, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+principal_cache = PrincipalCache(settings.AUTH_CACHE_TTL_SECONDS, settings.AUTH_CACHE_MAX_ENTRIES)
+metrics.CACHE_HIT_RATIO.set_function(principal_cache.hit_ratio, cache="auth_principal")
+
+
+def invalidate_user(email: str):
+    """Chamar sempre que um usuário mudar (plano, senha, remoção) para não servir o principal antigo."""
+    principal_cache.invalidate(email)
+
+
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
     if expires_delta:
@@ -21,7 +95,25 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+
+def _load_principal(email: str, user_id: Optional[int]) -> Optional[Principal]:
+    db = SessionLocal()
+    try:
+        if user_id is not None:
+            user = db.get(User, user_id)
+            if user is not None and user.email != email:
+                return None  # id reaproveitado por outro usuário: token não vale mais
+        else:
+            user = db.query(User).filter(User.email == email).first()  # tokens sem "uid"
+        if user is None:
+            return None
+        return Principal(id=user.id, email=user.email, plano=getattr(user, "plano", None))
+    finally:
+        db.close()
+
+
+def get_current_user(token: str = Depends(oauth2_scheme)) -> Principal:
+    """Valida o JWT; o principal vem do cache e o banco só é consultado em caso de miss."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -32,9 +124,17 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         email: str = payload.get("sub")
         if email is None:
             raise credentials_exception
-    except JWTError:
+        user_id = payload.get("uid")
+        user_id = int(user_id) if user_id is not None else None
+    except (JWTError, TypeError, ValueError):
         raise credentials_exception
-    user = db.query(User).filter(User.email == email).first()
-    if user is None:
+    principal = principal_cache.get(email)
+    if principal is not None and (user_id is None or principal.id == user_id):
+        metrics.CACHE_LOOKUPS.inc(cache="auth_principal", result="hit")
+        return principal
+    metrics.CACHE_LOOKUPS.inc(cache="auth_principal", result="miss")
+    principal = _load_principal(email, user_id)
+    if principal is None:
         raise credentials_exception
-    return user
\ No newline at end of file
+    principal_cache.put(email, principal)
+    return principal
@@ -1,35 +1,142 @@
-from sqlalchemy import create_engine, Column, Integer, String
+import threading
+from pathlib import Path
+
+from sqlalchemy import create_engine, event, Boolean, Column, DateTime, Integer, String, Index
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from passlib.context import CryptContext
+from sqlalchemy.pool import StaticPool
+
+from maestroia.config import settings
+from maestroia.core.metrics import instrument_engine
+from maestroia.core import passwords
+
+DATABASE_URL = settings.DATABASE_URL
 
-DATABASE_URL = "sqlite:///./maestroia.db"
 
-engine = create_engine(DATABASE_URL)
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        # busy_timeout primeiro: trocar o journal_mode também precisa do lock
+        cursor.execute(f"PRAGMA busy_timeout = {int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute(f"PRAGMA journal_mode = {settings.SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous = {settings.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA cache_size = {-int(settings.SQLITE_CACHE_SIZE_KB)}")  # negativo = KiB
+        cursor.execute(f"PRAGMA mmap_size = {int(settings.SQLITE_MMAP_SIZE_MB) * 1024 * 1024}")
+    finally:
+        cursor.close()
+
+
+def make_engine(url: str = None, **kwargs):
+    """Engine com pool e PRAGMAs ajustados ao backend de `url` (padrão: settings.DATABASE_URL)."""
+    url = make_url(url or DATABASE_URL)
+    sqlite = url.get_backend_name() == "sqlite"
+    memory = sqlite and url.database in (None, "", ":memory:")
+    if sqlite:
+        options = {
+            "connect_args": {
+                "check_same_thread": False,  # sessões passam entre threads do pool do FastAPI
+                "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000,
+            },
+        }
+        if memory:
+            options["poolclass"] = StaticPool  # uma conexão só: cada conexão nova seria outro banco
+        else:
+            # Escritas são serializadas pelo próprio SQLite; conexões extras só servem aos leitores
+            options.update(pool_size=settings.DB_POOL_SIZE, max_overflow=0,
+                           pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS)
+    else:
+        options = {
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+            "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+            "pool_pre_ping": True,
+        }
+    options.update(kwargs)
+    new_engine = create_engine(url, **options)
+    if sqlite and not memory:
+        event.listen(new_engine, "connect", _sqlite_pragmas)
+    return instrument_engine(new_engine)
+
+
+engine = make_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 class User(Base):
     __tablename__ = "users"
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True)
-    hashed_password = Column(String)
+    hashed_password = Column(String)  # bcrypt; sha256 hex só em contas migradas do users.json
+    # Dados da conta usados pelo app Streamlit (ex-users.json) e pelo webhook de pagamento
+    display_name = Column(String, nullable=True)
+    plano = Column(String, nullable=True)
+    pago = Column(Boolean, nullable=True)
+    campanhas_mes = Column(Integer, nullable=True)
+    logged_in = Column(Boolean, nullable=True)
+    created_at = Column(DateTime, nullable=True)
 
 # Novo modelo para campanhas
 class Campaign(Base):
     __tablename__ = "campaigns"
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, index=True)
+    user_id = Column(Integer)  # coberto por ix_campaigns_user_id_id_desc
     objetivo = Column(String)
     publico_alvo = Column(String)
     canais = Column(String)
     orcamento = Column(String)
-    resultado = Column(String)
+    resultado = Column(String)  # legado: JSON inteiro, só em linhas anteriores ao result_store
+    resultado_ref = Column(String, nullable=True)  # manifesto em result_blobs
+
+
+# Histórico do usuário (id DESC, paginado por cursor) sem ordenar a tabela inteira
+Index("ix_campaigns_user_id_id_desc", Campaign.user_id, Campaign.id.desc())
+
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "migrations"
+_initialized = set()
+_init_lock = threading.Lock()
+
+
+def import_models():
+    """Registra no Base.metadata as tabelas definidas fora deste módulo."""
+    from maestroia.models import bulk, finance, publishing, results  # noqa: F401
+
+
+def alembic_config(bind=None):
+    from alembic.config import Config
+
+    config = Config()
+    config.set_main_option("script_location", str(MIGRATIONS_DIR))
+    if bind is not None:
+        config.attributes["engine"] = bind
+    return config
+
+
+def init_db(bind=None):
+    """Leva o schema do banco à última migração (alembic upgrade head).
+
+    Roda uma vez por processo e banco, na inicialização da API, do app Streamlit e dos
+    scripts; nunca no import. Em produção (DB_AUTO_MIGRATE=false) as migrações rodam no
+    deploy, com `alembic upgrade head`. Sem Alembic instalado, cai para create_all.
+    """
+    bind = bind or engine
+    key = str(bind.url)
+    with _init_lock:
+        if key in _initialized:
+            return
+        try:
+            from alembic import command
+        except ImportError:
+            import_models()
+            Base.metadata.create_all(bind=bind)
+        else:
+            command.upgrade(alembic_config(bind), "head")
+        _initialized.add(key)
 
-Base.metadata.create_all(bind=engine)
 
 def get_db():
     db = SessionLocal()
@@ -38,8 +145,9 @@ def get_db():
     finally:
         db.close()
 
+# Versões síncronas, na thread atual; a API usa o pool de maestroia.core.passwords
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return passwords.hash_sync(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
\ No newline at end of file
+    return passwords.verify_sync(plain_password, hashed_password)[0]
\ No newline at end of file
@@ -0,0 +1,319 @@
+"""Métricas operacionais no formato texto do Prometheus, sem dependências externas.
+
+Contadores e histogramas gravam em shards por thread: no caminho quente um `inc`/`observe`
+é só uma atualização de dicionário da própria thread, sem lock; os shards são somados apenas
+quando /metrics é lido. Quando uma thread termina, o shard dela é somado a um total base e
+descartado, então threads de vida curta não acumulam shards. Gauges de fila são calculados por callback no momento da coleta.
+
+`install_fastapi(app, "routes")` adiciona o middleware de requisições HTTP e a rota /metrics.
+"""
+import copy
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from typing import Callable, Optional
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), registry: Optional["Registry"] = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def header(self) -> list:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+
+
+class _ShardHolder:
+    """Guarda o shard no threading.local; morre junto com a thread (dict não aceita weakref)."""
+
+    __slots__ = ("values", "__weakref__")
+
+    def __init__(self):
+        self.values = {}
+
+
+class _Sharded(_Metric):
+    """Valores por thread; cada thread só escreve no próprio shard."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._local = threading.local()
+        self._shards = []
+        self._base = {}  # soma dos shards de threads que já terminaram
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> dict:
+        holder = getattr(self._local, "holder", None)
+        if holder is None:
+            holder = self._local.holder = _ShardHolder()
+            with self._shards_lock:
+                self._shards.append(holder.values)
+            weakref.finalize(holder, self._retire, holder.values)
+        return holder.values
+
+    def _retire(self, shard: dict):
+        # A thread dona já terminou: ninguém mais escreve no shard
+        with self._shards_lock:
+            self._shards.remove(shard)
+            for key, value in shard.items():
+                self._merge(self._base, key, value)
+
+    def _merge(self, totals: dict, key: tuple, value):
+        raise NotImplementedError
+
+    def _snapshot(self) -> list:
+        # Cópia do total base sob o lock: um shard aposentado depois disso não é contado duas vezes
+        with self._shards_lock:
+            return [copy.deepcopy(self._base)] + self._shards
+
+
+class Counter(_Sharded):
+    type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        shard = self._shard()
+        key = self._key(labels)
+        shard[key] = shard.get(key, 0.0) + amount
+
+    def _merge(self, totals: dict, key: tuple, value: float):
+        totals[key] = totals.get(key, 0.0) + value
+
+    def value(self, **labels) -> float:
+        key = self._key(labels)
+        return sum(shard.get(key, 0.0) for shard in self._snapshot())
+
+    def collect(self) -> list:
+        totals = {}
+        for shard in self._snapshot():
+            for key, value in list(shard.items()):
+                self._merge(totals, key, value)
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(totals.items())
+        ]
+
+
+class Histogram(_Sharded):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS,
+                 registry: Optional["Registry"] = None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def observe(self, value: float, **labels):
+        shard = self._shard()
+        key = self._key(labels)
+        state = shard.get(key)
+        if state is None:
+            # contagem por bucket (não cumulativa) + [+Inf], soma, total
+            state = shard[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+        state[bisect_left(self.buckets, value)] += 1
+        state[-2] += value
+        state[-1] += 1
+
+    def _merge(self, totals: dict, key: tuple, state: list):
+        acc = totals.setdefault(key, [0] * (len(self.buckets) + 1) + [0.0, 0])
+        for i, v in enumerate(list(state)):
+            acc[i] += v
+
+    def time(self, **labels):
+        return _Timer(self, labels)
+
+    def count(self, **labels) -> int:
+        key = self._key(labels)
+        return sum(shard[key][-1] for shard in self._snapshot() if key in shard)
+
+    def collect(self) -> list:
+        merged = {}
+        for shard in self._snapshot():
+            for key, state in list(shard.items()):
+                self._merge(merged, key, state)
+        lines = self.header()
+        for key, state in sorted(merged.items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), state):
+                cumulative += n
+                le = f'le="{_format_value(bound)}"' if bound != float("inf") else 'le="+Inf"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(state[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {state[-1]}")
+        return lines
+
+
+class _Timer:
+    def __init__(self, histogram: Histogram, labels: dict):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class Gauge(_Metric):
+    """Valor instantâneo: `set` direto ou `set_function` avaliado na coleta."""
+
+    type = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values = {}
+        self._functions = {}
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+    def set_function(self, func: Callable[[], float], **labels):
+        self._functions[self._key(labels)] = func
+
+    def collect(self) -> list:
+        values = dict(self._values)
+        for key, func in list(self._functions.items()):
+            try:
+                values[key] = float(func())
+            except Exception:
+                continue  # uma fonte indisponível não derruba o /metrics
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(values.items())
+        ]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Métrica duplicada: {metric.name}")
+            self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# =========================
+# MÉTRICAS DO MAESTROIA
+# =========================
+
+HTTP_REQUESTS = Counter("maestroia_http_requests_total", "Requisições HTTP atendidas", ("app", "method", "route", "status"))
+HTTP_LATENCY = Histogram("maestroia_http_request_duration_seconds", "Latência das requisições HTTP", ("app", "method", "route"))
+
+GRAPH_RUNS = Counter("maestroia_graph_runs_total", "Execuções do grafo de campanha", ("status",))
+GRAPH_DURATION = Histogram("maestroia_graph_run_duration_seconds", "Duração das execuções do grafo",
+                           buckets=(0.1, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300))
+NODE_DURATION = Histogram("maestroia_node_duration_seconds", "Duração de cada nó do grafo", ("node",))
+
+LLM_LATENCY = Histogram("maestroia_llm_request_duration_seconds", "Latência das chamadas ao LLM", ("provider", "model", "kind"))
+LLM_TOKENS = Counter("maestroia_llm_tokens_total", "Tokens consumidos no LLM", ("provider", "model", "type"))
+LLM_FALLBACKS = Counter("maestroia_llm_fallbacks_total", "Chamadas ao LLM que caíram no fallback", ("provider", "kind"))
+
+CACHE_LOOKUPS = Counter("maestroia_cache_lookups_total", "Consultas a caches (resultado: hit/delta/miss)", ("cache", "result"))
+CACHE_HIT_RATIO = Gauge("maestroia_cache_hit_ratio", "Taxa de acerto acumulada de cada cache", ("cache",))
+
+QUEUE_DEPTH = Gauge("maestroia_queue_depth", "Itens aguardando em filas internas", ("queue",))
+BACKGROUND_ERRORS = Counter("maestroia_background_errors_total", "Exceções em laços de background", ("worker", "exception"))
+LEDGER_BATCH_SIZE = Histogram("maestroia_ledger_batch_size", "Transações do razão gravadas por commit",
+                              buckets=(1, 2, 5, 10, 25, 50, 100, 200, 500))
+
+DB_QUERY_DURATION = Histogram("maestroia_db_query_duration_seconds", "Tempo das queries SQL", ("operation",),
+                              buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0))
+
+
+def render() -> str:
+    return REGISTRY.render()
+
+
+def executor_queue_depth(executor) -> int:
+    """Tarefas enfileiradas num ThreadPoolExecutor (ainda sem thread livre)."""
+    queue = getattr(executor, "_work_queue", None)
+    return queue.qsize() if queue is not None else 0
+
+
+def instrument_engine(engine):
+    """Mede cada query SQL do engine em DB_QUERY_DURATION, rotulada pelo comando (SELECT/INSERT...)."""
+    from sqlalchemy import event
+
+    # Início guardado no contexto da execução: morre com ela, mesmo quando a query levanta
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._maestroia_query_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, "_maestroia_query_start", None)
+        if start is not None:
+            operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+            DB_QUERY_DURATION.observe(time.perf_counter() - start, operation=operation)
+
+    return engine
+
+
+def install_fastapi(app, app_name: str):
+    """Middleware de métricas HTTP e rota GET /metrics no app FastAPI."""
+    from fastapi import Request
+    from fastapi.responses import Response
+
+    @app.middleware("http")
+    async def _metrics_middleware(request: Request, call_next):
+        start = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            # Rota como template (/campaign/{id}) para não explodir a cardinalidade
+            route = getattr(request.scope.get("route"), "path", None) or "não_roteada"
+            if route != "/metrics":
+                HTTP_REQUESTS.inc(app=app_name, method=request.method, route=route, status=status)
+                HTTP_LATENCY.observe(time.perf_counter() - start, app=app_name, method=request.method, route=route)
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics_endpoint():
+        return Response(render(), media_type=CONTENT_TYPE)
+
+    return app
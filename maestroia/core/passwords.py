@@ -0,0 +1,130 @@
+"""Hash e verificação de senhas (bcrypt) fora do processo da API.
+
+O bcrypt é caro de propósito: rodando na thread da requisição, um pico de logins ocupa um
+núcleo inteiro (e o GIL) e atrasa todas as outras rotas. O `PasswordHasher` manda o trabalho
+para um pool de processos com um worker por núcleo (PASSWORD_HASH_WORKERS) e aceita no
+máximo PASSWORD_HASH_MAX_PENDING pedidos na fila; além disso recusa na hora
+(`PasswordPoolSaturated`) e a API responde 503, em vez de prender as threads do servidor.
+
+`verify` também devolve o hash novo quando BCRYPT_ROUNDS mudou desde que a senha foi
+gravada: o login regrava o hash sem o usuário perceber.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from typing import Optional
+
+from passlib.context import CryptContext
+
+from maestroia.config import settings
+from maestroia.core import metrics
+
+
+class PasswordPoolSaturated(Exception):
+    """Todos os workers ocupados e a fila de senhas cheia."""
+
+
+@lru_cache(maxsize=None)
+def _context(rounds: int) -> CryptContext:
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+
+
+# Funções de módulo: são elas que vão (por referência) para os processos do pool
+
+def hash_sync(password: str, rounds: Optional[int] = None) -> str:
+    return _context(rounds or settings.BCRYPT_ROUNDS).hash(password)
+
+
+def verify_sync(password: str, hashed: str, rounds: Optional[int] = None) -> tuple:
+    """(senha confere, hash novo ou None); hash malformado conta como senha errada."""
+    try:
+        return _context(rounds or settings.BCRYPT_ROUNDS).verify_and_update(password, hashed)
+    except (TypeError, ValueError):
+        return False, None
+
+
+class PasswordHasher:
+    def __init__(self, workers: Optional[int] = None, max_pending: Optional[int] = None,
+                 inline: Optional[bool] = None):
+        self.workers = workers or settings.PASSWORD_HASH_WORKERS or os.cpu_count() or 1
+        self.max_pending = settings.PASSWORD_HASH_MAX_PENDING if max_pending is None else max_pending
+        self.inline = settings.PASSWORD_HASH_POOL == "inline" if inline is None else inline
+        self._slots = threading.BoundedSemaphore(self.workers + self.max_pending)
+        self._lock = threading.Lock()
+        self._admitted = 0
+        self._executor = None
+
+    @property
+    def admitted(self) -> int:
+        """Pedidos em execução ou aguardando um worker."""
+        return self._admitted
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: fork de um processo com threads (uvicorn, pools) pode herdar locks presos
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def _release(self):
+        with self._lock:
+            self._admitted -= 1
+        self._slots.release()
+
+    def _run(self, func, *args):
+        if not self._slots.acquire(blocking=False):
+            raise PasswordPoolSaturated(f"{self.workers} workers ocupados e {self.max_pending} senhas na fila")
+        with self._lock:
+            self._admitted += 1
+        if self.inline:
+            try:
+                return func(*args)
+            finally:
+                self._release()
+        try:
+            future = self._pool().submit(func, *args)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+        try:
+            return future.result(timeout=settings.PASSWORD_HASH_TIMEOUT_SECONDS)
+        except BrokenProcessPool:
+            # Worker morto (OOM, kill): o próximo pedido recria o pool
+            with self._lock:
+                self._executor = None
+            raise
+
+    def hash(self, password: str) -> str:
+        return self._run(hash_sync, password, settings.BCRYPT_ROUNDS)
+
+    def verify(self, password: str, hashed: str) -> tuple:
+        """(senha confere, hash novo para gravar ou None)."""
+        return self._run(verify_sync, password, hashed, settings.BCRYPT_ROUNDS)
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+_hasher = None
+_hasher_lock = threading.Lock()
+
+
+def get_password_hasher() -> PasswordHasher:
+    global _hasher
+    with _hasher_lock:
+        if _hasher is None:
+            _hasher = PasswordHasher()
+            hasher = _hasher
+            metrics.QUEUE_DEPTH.set_function(lambda: max(0, hasher.admitted - hasher.workers), queue="senhas")
+            metrics.QUEUE_DEPTH.set_function(lambda: min(hasher.admitted, hasher.workers),
+                                             queue="senhas_em_execucao")
+        return _hasher
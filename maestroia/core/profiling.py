@@ -0,0 +1,229 @@
+"""Profiling estatístico sob demanda de execuções de campanha.
+
+Ativado por requisição (header `X-Profile: 1` ou `?profile=1`, apenas para ADMIN_EMAILS) ou
+por amostragem (PROFILING_SAMPLE_RATE). Uma thread amostra a pilha da thread que executa o
+grafo a cada PROFILING_INTERVAL_MS via `sys._current_frames()` e grava as pilhas agregadas
+(formato "collapsed", pronto para flamegraph.pl/speedscope) em PROFILING_DIR/<request_id>.
+Desligado, o custo é só a checagem do header e do sorteio.
+
+CLI:
+    python -m maestroia.core.profiling list
+    python -m maestroia.core.profiling show <request_id> --format speedscope -o perfil.json
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Optional
+
+from maestroia.config import settings
+
+_SAFE_ID = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    # Caminho relativo ao pacote, para pilhas legíveis e iguais entre máquinas
+    marker = filename.rfind("maestroia")
+    short = filename[marker:] if marker >= 0 else os.path.basename(filename)
+    return f"{code.co_name} ({short}:{code.co_firstlineno})".replace(";", ",")
+
+
+class SamplingProfiler:
+    """Amostra periodicamente a pilha de uma thread e agrega as pilhas iguais."""
+
+    def __init__(self, thread_id: Optional[int] = None, interval_s: float = 0.005, max_seconds: float = 300.0):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval_s = interval_s
+        self.max_seconds = max_seconds
+        self.stacks = Counter()
+        self.samples = 0
+        self.started_at = None
+        self.duration_s = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        frame = sys._current_frames().get(self.thread_id)
+        if frame is None:
+            return
+        stack = []
+        while frame is not None:
+            stack.append(_frame_label(frame))
+            frame = frame.f_back
+        self.stacks[";".join(reversed(stack))] += 1
+        self.samples += 1
+
+    def _run(self):
+        deadline = time.perf_counter() + self.max_seconds
+        while not self._stop.wait(self.interval_s) and time.perf_counter() < deadline:
+            self._sample()
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="maestroia-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self.duration_s = time.perf_counter() - self.started_at
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def to_speedscope(collapsed: str, name: str, interval_s: float) -> dict:
+    """Converte pilhas collapsed para o formato "sampled" do speedscope (https://www.speedscope.app)."""
+    frames, index, samples, weights = [], {}, [], []
+    for line in collapsed.splitlines():
+        stack, _, count = line.rpartition(" ")
+        if not stack:
+            continue
+        ids = []
+        for label in stack.split(";"):
+            if label not in index:
+                index[label] = len(frames)
+                frames.append({"name": label})
+            ids.append(index[label])
+        samples.append(ids)
+        weights.append(int(count) * interval_s)
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled",
+            "name": name,
+            "unit": "seconds",
+            "startValue": 0,
+            "endValue": sum(weights),
+            "samples": samples,
+            "weights": weights,
+        }],
+        "name": name,
+        "exporter": "maestroia.core.profiling",
+    }
+
+
+# =========================
+# ATIVAÇÃO E ARMAZENAMENTO
+# =========================
+
+def is_admin(email: Optional[str]) -> bool:
+    admins = {e.strip().lower() for e in settings.ADMIN_EMAILS.split(",") if e.strip()}
+    return bool(email) and email.lower() in admins
+
+
+def should_profile(requested: bool = False, email: Optional[str] = None) -> bool:
+    """Pedido explícito de um admin, ou sorteio pela taxa de amostragem."""
+    if requested and is_admin(email):
+        return True
+    rate = settings.PROFILING_SAMPLE_RATE
+    return rate > 0 and random.random() < rate
+
+
+def _paths(request_id: str) -> tuple:
+    base = os.path.join(settings.PROFILING_DIR, _SAFE_ID.sub("_", request_id))
+    return base + ".collapsed", base + ".json"
+
+
+def save_profile(request_id: str, profiler: SamplingProfiler, metadata: Optional[dict] = None):
+    os.makedirs(settings.PROFILING_DIR, exist_ok=True)
+    collapsed_path, meta_path = _paths(request_id)
+    with open(collapsed_path, "w", encoding="utf-8") as f:
+        f.write(profiler.collapsed())
+    meta = {
+        "request_id": request_id,
+        "created_at": datetime.utcnow().isoformat(),
+        "duration_s": round(profiler.duration_s, 4),
+        "samples": profiler.samples,
+        "interval_s": profiler.interval_s,
+        **(metadata or {}),
+    }
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+
+
+@contextmanager
+def profile(request_id: str, enabled: bool = True, **metadata):
+    """Perfila o bloco na thread atual quando `enabled`; sem custo quando desligado."""
+    if not enabled:
+        yield None
+        return
+    profiler = SamplingProfiler(
+        interval_s=settings.PROFILING_INTERVAL_MS / 1000.0,
+        max_seconds=settings.PROFILING_MAX_SECONDS,
+    )
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        try:
+            save_profile(request_id, profiler, metadata)
+        except OSError:
+            pass  # falha ao gravar o perfil não afeta a campanha
+
+
+def list_profiles(limit: int = 50) -> list:
+    if not os.path.isdir(settings.PROFILING_DIR):
+        return []
+    metas = []
+    for name in os.listdir(settings.PROFILING_DIR):
+        if name.endswith(".json"):
+            with open(os.path.join(settings.PROFILING_DIR, name), encoding="utf-8") as f:
+                metas.append(json.load(f))
+    return sorted(metas, key=lambda m: m["created_at"], reverse=True)[:limit]
+
+
+def load_profile(request_id: str, fmt: str = "collapsed"):
+    """Perfil gravado: texto collapsed, dict speedscope (fmt="speedscope") ou None."""
+    collapsed_path, meta_path = _paths(request_id)
+    if not os.path.exists(collapsed_path):
+        return None
+    with open(collapsed_path, encoding="utf-8") as f:
+        collapsed = f.read()
+    if fmt != "speedscope":
+        return collapsed
+    with open(meta_path, encoding="utf-8") as f:
+        meta = json.load(f)
+    return to_speedscope(collapsed, f"campanha {request_id}", meta["interval_s"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Perfis de execução de campanhas")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    sub.add_parser("list", help="lista os perfis gravados")
+    show = sub.add_parser("show", help="exibe/exporta um perfil")
+    show.add_argument("request_id")
+    show.add_argument("--format", choices=("collapsed", "speedscope"), default="collapsed")
+    show.add_argument("-o", "--output", help="arquivo de saída (padrão: stdout)")
+    args = parser.parse_args(argv)
+
+    if args.comando == "list":
+        for meta in list_profiles():
+            print(f"{meta['request_id']:24} {meta['created_at']}  {meta['duration_s']:>8.2f}s  {meta['samples']:>6} amostras")
+        return
+
+    data = load_profile(args.request_id, args.format)
+    if data is None:
+        raise SystemExit(f"Perfil {args.request_id} não encontrado em {settings.PROFILING_DIR}")
+    texto = json.dumps(data) if args.format == "speedscope" else data
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(texto)
+    else:
+        sys.stdout.write(texto)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Verificação dos planos das consultas quentes.
+
+Roda EXPLAIN em cada consulta de HOT_QUERIES e aponta as que varrem a tabela inteira
+(ou ordenam numa B-tree temporária) em vez de usar um índice, para perceber quando uma
+migração ou mudança de consulta derruba um índice composto. No Postgres, tabelas pequenas
+levariam o planner ao Seq Scan de qualquer jeito: a checagem desliga enable_seqscan.
+
+CLI (sai com código 1 se alguma consulta cair em varredura):
+    python -m maestroia.core.query_plans
+"""
+import json
+import sys
+from datetime import datetime
+
+from sqlalchemy import text
+
+# nome -> (tabela, SQL, parâmetros de exemplo); mesmas consultas dos serviços
+HOT_QUERIES = {
+    "historico_campanhas": (
+        "campaigns",
+        "SELECT id, objetivo FROM campaigns WHERE user_id = :user_id ORDER BY id DESC LIMIT 21",
+        {"user_id": 1},
+    ),
+    "historico_campanhas_cursor": (
+        "campaigns",
+        "SELECT id, objetivo FROM campaigns WHERE user_id = :user_id AND id < :cursor ORDER BY id DESC LIMIT 21",
+        {"user_id": 1, "cursor": 1000},
+    ),
+    "extrato_carteira": (
+        "entries",
+        "SELECT id, amount, is_debit FROM entries WHERE wallet_id = :wallet_id AND timestamp >= :since "
+        "ORDER BY timestamp",
+        {"wallet_id": 1, "since": datetime(2026, 1, 1)},
+    ),
+    "carteira_da_conta": (
+        "wallets",
+        "SELECT id, balance FROM wallets WHERE account_id = :account_id AND currency = :currency",
+        {"account_id": 1, "currency": "BRL"},
+    ),
+    "usuario_por_email": (
+        "users",
+        "SELECT id FROM users WHERE email = :email",
+        {"email": "ana@example.com"},
+    ),
+}
+
+
+def _sqlite_problems(conn, table, sql, params):
+    rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params).fetchall()
+    details = [row[-1] for row in rows]
+    # "SCAN t" (e "SCAN t USING INDEX"): percorre a tabela/índice inteiro; "SEARCH" é busca pelo índice
+    return [d for d in details if d.startswith(f"SCAN {table}") or "TEMP B-TREE" in d]
+
+
+def _plan_nodes(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+def _postgres_problems(conn, table, sql, params):
+    with conn.begin():
+        conn.execute(text("SET LOCAL enable_seqscan = off"))
+        plan = conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"), params).scalar()
+    plan = json.loads(plan) if isinstance(plan, str) else plan
+    return [
+        f"{n['Node Type']} on {n.get('Relation Name')}"
+        for n in _plan_nodes(plan[0]["Plan"])
+        if n["Node Type"] == "Seq Scan" and n.get("Relation Name") == table
+    ]
+
+
+def check_query_plans(bind=None, queries=None) -> dict:
+    """{nome da consulta: [trechos do plano com varredura]} só das consultas com problema."""
+    if bind is None:
+        from maestroia.core.database import engine as bind
+    inspect_plan = _postgres_problems if bind.dialect.name == "postgresql" else _sqlite_problems
+    problems = {}
+    with bind.connect() as conn:
+        for name, (table, sql, params) in (queries or HOT_QUERIES).items():
+            found = inspect_plan(conn, table, sql, params)
+            if found:
+                problems[name] = found
+    return problems
+
+
+def main() -> int:
+    problems = check_query_plans()
+    for name in HOT_QUERIES:
+        status = "VARREDURA: " + "; ".join(problems[name]) if name in problems else "ok (índice)"
+        print(f"{name:28} {status}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
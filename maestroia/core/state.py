@@ -1,4 +1,12 @@
-from typing import TypedDict, Optional, List
+from typing import Annotated, Optional, List
+
+# typing_extensions: o FastAPI/pydantic só valida TypedDict desta origem em Python < 3.12
+from typing_extensions import TypedDict
+
+
+def merge_dicts(atual: Optional[dict], novo: Optional[dict]) -> dict:
+    """Reducer do LangGraph: cada nó acrescenta suas chaves sem apagar as dos anteriores."""
+    return {**(atual or {}), **(novo or {})}
 
 
 class MaestroState(TypedDict, total=False):
@@ -14,6 +22,8 @@ class MaestroState(TypedDict, total=False):
     publico_alvo: str
     canais: List[str]
     orcamento: Optional[float]
+    tenant_id: str  # isola a memória de campanhas por cliente/usuário
+    campanha_id: str  # chave de idempotência das publicações (derivada das entradas se ausente)
 
     # =========================
     # SAÍDAS DOS AGENTES
@@ -22,7 +32,10 @@ class MaestroState(TypedDict, total=False):
     estrategia: str
     conteudos: List[str]
     publicacoes: List[str]
+    outbox_ids: dict  # canal -> id da publicação no outbox (PUBLISH_MODE=outbox)
     metricas: dict
+    reuso_memoria: dict  # por nó: modo (completo/reuso/delta), similaridade, latência economizada
+    tempos_nos: Annotated[dict, merge_dicts]  # nó -> duração em segundos
 
     # =========================
     # CONTROLE E GOVERNANÇA
@@ -0,0 +1,223 @@
+"""Tracing leve dos nós do grafo e das chamadas externas (LLM, embeddings, trends, publicação).
+
+Cada `span(...)` mede um trecho e herda o trace do span corrente (contextvars). Quando o span
+raiz termina, o trace inteiro vai para o exportador configurado:
+
+- TRACE_EXPORTER=jsonl: uma linha JSON por span em TRACE_FILE;
+- TRACE_EXPORTER=otlp: OTLP/HTTP JSON em OTLP_ENDPOINT (coletor OpenTelemetry, Jaeger, Tempo...);
+- TRACE_EXPORTER=none (padrão): spans não são registrados.
+
+`python scripts/trace_report.py` lê o JSONL e mostra o caminho crítico e a fatia de cada nó.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from functools import wraps
+from typing import Optional
+
+import requests
+
+from maestroia.config import settings
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("maestroia_span", default=None)
+
+
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "status",
+                 "root", "finished")
+
+    def __init__(self, name: str, parent: Optional["Span"] = None, attributes: Optional[dict] = None):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = dict(attributes or {})
+        self.status = "ok"
+        # Spans finalizados do trace ficam no raiz até a exportação
+        self.root = parent.root if parent else self
+        self.finished = []
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class JsonlExporter:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: list):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        lines = "".join(json.dumps(s.to_dict(), ensure_ascii=False, default=str) + "\n" for s in spans)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class OtlpHttpExporter:
+    """OTLP/HTTP com codificação JSON; envio fora da thread da requisição."""
+
+    def __init__(self, endpoint: str, service_name: str = "maestroia"):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="otlp-export")
+        self._session = requests.Session()
+
+    def payload(self, spans: list) -> dict:
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+                "scopeSpans": [{
+                    "scope": {"name": "maestroia.core.tracing"},
+                    "spans": [{
+                        "traceId": s.trace_id,
+                        "spanId": s.span_id,
+                        "parentSpanId": s.parent_id or "",
+                        "name": s.name,
+                        "kind": 1,
+                        "startTimeUnixNano": str(s.start_ns),
+                        "endTimeUnixNano": str(s.end_ns),
+                        "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items()],
+                        "status": {"code": 2 if s.status == "error" else 1},
+                    } for s in spans],
+                }],
+            }]
+        }
+
+    def _send(self, spans: list):
+        try:
+            self._session.post(self.endpoint, json=self.payload(spans), timeout=5)
+        except requests.RequestException:
+            pass  # tracing nunca derruba a aplicação
+
+    def export(self, spans: list):
+        self._executor.submit(self._send, spans)
+
+
+_exporter = None
+_exporter_lock = threading.Lock()
+
+
+def get_exporter():
+    """Exportador do processo conforme TRACE_EXPORTER; None quando o tracing está desligado."""
+    global _exporter
+    if _exporter is None:
+        with _exporter_lock:
+            if _exporter is None:
+                kind = settings.TRACE_EXPORTER
+                if kind == "jsonl":
+                    _exporter = JsonlExporter(settings.TRACE_FILE)
+                elif kind == "otlp":
+                    _exporter = OtlpHttpExporter(settings.OTLP_ENDPOINT)
+                else:
+                    _exporter = False
+    return _exporter or None
+
+
+def set_exporter(exporter):
+    """Troca o exportador (testes e ferramentas); None volta a ler TRACE_EXPORTER."""
+    global _exporter
+    with _exporter_lock:
+        _exporter = exporter
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Mede o bloco como um span filho do span corrente (ou raiz de um novo trace).
+
+    Com o tracing desligado devolve None e não tem custo além da checagem.
+    """
+    exporter = get_exporter()
+    if exporter is None:
+        yield None
+        return
+    parent = _current_span.get()
+    current = Span(name, parent, attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.status = "error"
+        current.attributes.setdefault("error", f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        current.end_ns = time.time_ns()
+        _current_span.reset(token)
+        current.root.finished.append(current)
+        if parent is None:
+            exporter.export(current.finished)
+
+
+@contextmanager
+def trace(name: str, **attributes):
+    """Abre um span raiz (novo trace) — use na entrada de uma campanha ou requisição."""
+    token = _current_span.set(None)
+    try:
+        with span(name, **attributes) as root:
+            yield root
+    finally:
+        _current_span.reset(token)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def set_attribute(key: str, value):
+    """Anota o span corrente, se houver."""
+    current = _current_span.get()
+    if current is not None:
+        current.set_attribute(key, value)
+
+
+def traced(name: str, **attributes):
+    """Decorador: executa a função dentro de `span(name)`."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name, **attributes):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def bind_context(func):
+    """Propaga o span corrente para outra thread (ThreadPoolExecutor não copia contextvars)."""
+    ctx = copy_context()
+
+    def wrapper(*args, **kwargs):
+        return ctx.run(func, *args, **kwargs)
+    return wrapper
@@ -0,0 +1 @@
+"""Ferramentas de desenvolvimento: dublês locais das plataformas externas para testes de carga."""
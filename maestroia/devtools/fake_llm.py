@@ -0,0 +1,230 @@
+"""Provedor de LLM falso, determinístico e compatível com a API da OpenAI.
+
+Com LLM_PROVIDER=fake o `openai_service` usa `FakeOpenAIClient` no próprio processo; com
+FAKE_LLM_URL aponta o SDK da OpenAI para o servidor HTTP deste módulo. A mesma entrada gera
+sempre a mesma resposta, no formato que cada agente espera (pesquisa, estratégia, post por
+canal, otimização), com latência e número de tokens configuráveis. Embeddings são
+bag-of-words: textos com as mesmas palavras ficam próximos, como num modelo real.
+
+Uso:
+    python -m maestroia.devtools.fake_llm --port 9200 --latency-ms 800 --jitter-ms 200
+    FAKE_LLM_URL=http://127.0.0.1:9200/v1  # no .env do MaestroIA
+"""
+import argparse
+import asyncio
+import hashlib
+import math
+import random
+import re
+import time
+from types import SimpleNamespace
+from typing import Optional
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+_VOCABULARIO = (
+    "engajamento", "conversão", "audiência", "alcance", "autoridade", "conteúdo", "orgânico",
+    "funil", "retenção", "comunidade", "marca", "tráfego", "leads", "campanha", "segmentação",
+    "criativos", "recorrência", "confiança", "posicionamento", "jornada", "valor", "resultado",
+)
+
+
+def _tokens(text: str) -> list:
+    return _WORD.findall(text.lower())
+
+
+def count_tokens(text: str) -> int:
+    """Aproximação usada na `usage`: ~0,75 palavra por token, como nos modelos GPT."""
+    return max(1, math.ceil(len(_tokens(text)) / 0.75))
+
+
+def _campo(prompt: str, nome: str, padrao: str) -> str:
+    match = re.search(rf"{nome}:\s*(.+)", prompt)
+    return match.group(1).strip() if match else padrao
+
+
+class FakeLLM:
+    """Gera completions e embeddings determinísticos a partir do texto de entrada."""
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, completion_tokens: int = 200,
+                 embedding_dim: int = 1536):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.completion_tokens = completion_tokens
+        self.embedding_dim = embedding_dim
+
+    def latency(self, prompt: str) -> float:
+        """Latência em segundos; o jitter também é determinístico pelo prompt."""
+        rng = self._rng("latency", prompt)
+        return max(0.0, self.latency_ms + rng.uniform(-self.jitter_ms, self.jitter_ms)) / 1000.0
+
+    @staticmethod
+    def _rng(*partes: str) -> random.Random:
+        seed = hashlib.sha256("|".join(partes).encode("utf-8")).hexdigest()
+        return random.Random(int(seed[:16], 16))
+
+    def _corpo(self, prompt: str) -> str:
+        objetivo = _campo(prompt, "Objetivo", "a campanha")
+        publico = _campo(prompt, "Público-alvo", "o público")
+        if "concorrentes reais" in prompt:
+            return ("Agência Alfa (referência em campanhas digitais no Brasil), Estúdio Beta (forte presença em "
+                    "redes sociais), Grupo Gama (líder em mídia paga), Coletivo Delta (autoridade em conteúdo orgânico)")
+        if "Atualize a pesquisa" in prompt:
+            anterior = prompt.split("anterior:", 1)[-1].strip()[:600]
+            return f"Atualização para o novo contexto.\n\n{anterior}"
+        if "Analise o mercado" in prompt:
+            return (f"## Tendências\nSegundo dados do Google Trends, o interesse por {objetivo} cresceu 18% entre {publico}.\n"
+                    "## Oportunidades\nDados do SEMrush mostram baixa concorrência em palavras-chave de cauda longa.\n"
+                    "## Riscos\nDe acordo com relatório setorial de 2024, o custo por clique subiu 12%.\n"
+                    "## Concorrentes principais\nAgência Alfa, Estúdio Beta e Grupo Gama (fonte: SEMrush).")
+        if "estrategista" in prompt:
+            canais = _campo(prompt, "Canais", "Instagram")
+            return (f"**Posicionamento:** referência em {objetivo} para {publico}.\n"
+                    f"**Mensagem central:** resultados reais com {objetivo}.\n"
+                    f"**Estratégia por canal:** {canais} com calendário semanal e conteúdo nativo de cada rede.\n"
+                    "**KPIs:** alcance, taxa de engajamento, CTR, custo por lead e conversões.")
+        canal = re.search(r"criação de conteúdo para (.+?)\.", prompt)
+        if canal:
+            return (f"**Texto:** Descubra como transformar sua rotina com a nossa proposta em {canal.group(1)}.\n"
+                    "**Hashtags:** #marketing #conteudo #resultados\n"
+                    "**Call to Action:** \"Saiba mais no link da bio!\"\n"
+                    "**Imagem:** Pessoa sorridente usando o produto em ambiente iluminado.")
+        if prompt.startswith("Otimize"):
+            return ("1. Realocar 20% do orçamento para os canais com maior ROI.\n"
+                    "2. Testar duas variações de criativo por canal.\n"
+                    "3. Ajustar horários de publicação para os picos de engajamento.")
+        return f"Resposta simulada para: {prompt.strip()[:120]}"
+
+    def complete(self, prompt: str, model: str = "fake-gpt") -> str:
+        """Resposta do agente completada até ~`completion_tokens` com texto determinístico."""
+        texto = self._corpo(prompt)
+        faltam = self.completion_tokens - count_tokens(texto)
+        if faltam > 0:
+            rng = self._rng(model, prompt)
+            palavras = [rng.choice(_VOCABULARIO) for _ in range(int(faltam * 0.75))]
+            if palavras:
+                texto += "\n\nObservações: " + " ".join(palavras) + "."
+        return texto
+
+    def chat_completion(self, messages: list, model: str = "fake-gpt") -> dict:
+        prompt = "\n".join(str(m.get("content", "")) for m in messages)
+        texto = self.complete(prompt, model)
+        prompt_tokens = count_tokens(prompt)
+        completion_tokens = count_tokens(texto)
+        return {
+            "id": f"chatcmpl-fake-{hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:24]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": texto},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    def embed(self, text: str) -> list:
+        vec = [0.0] * self.embedding_dim
+        for token in _tokens(text):
+            h = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big")
+            vec[h % self.embedding_dim] += 1.0 if (h >> 63) else -1.0
+        norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+        return [v / norm for v in vec]
+
+    def embeddings(self, inputs, model: str = "fake-embedding") -> dict:
+        inputs = [inputs] if isinstance(inputs, str) else list(inputs)
+        tokens = sum(count_tokens(t) for t in inputs)
+        return {
+            "object": "list",
+            "model": model,
+            "data": [{"object": "embedding", "index": i, "embedding": self.embed(t)} for i, t in enumerate(inputs)],
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        }
+
+    def images(self, prompt: str, n: int = 1) -> dict:
+        h = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+        return {"created": int(time.time()), "data": [{"url": f"https://fake-llm.local/images/{h}-{i}.png"} for i in range(n)]}
+
+
+def _namespace(obj):
+    if isinstance(obj, dict):
+        return SimpleNamespace(**{k: _namespace(v) for k, v in obj.items()})
+    if isinstance(obj, list):
+        return [_namespace(v) for v in obj]
+    return obj
+
+
+class FakeOpenAIClient:
+    """Subconjunto do `openai.OpenAI` usado pelo `openai_service`, respondido pelo `FakeLLM`."""
+
+    def __init__(self, llm: Optional[FakeLLM] = None):
+        self.llm = llm or FakeLLM()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._chat_create))
+        self.embeddings = SimpleNamespace(create=self._embeddings_create)
+        self.images = SimpleNamespace(generate=self._images_generate)
+
+    def _chat_create(self, model: str, messages: list, **kwargs):
+        time.sleep(self.llm.latency("\n".join(str(m.get("content", "")) for m in messages)))
+        return _namespace(self.llm.chat_completion(messages, model))
+
+    def _embeddings_create(self, model: str, input, **kwargs):
+        return _namespace(self.llm.embeddings(input, model))
+
+    def _images_generate(self, prompt: str, n: int = 1, **kwargs):
+        return _namespace(self.llm.images(prompt, n))
+
+
+def create_app(llm: Optional[FakeLLM] = None):
+    """Servidor HTTP compatível com os endpoints /v1 da OpenAI usados pelo MaestroIA."""
+    from fastapi import FastAPI, Request
+
+    llm = llm or FakeLLM()
+    app = FastAPI(title="MaestroIA fake LLM", docs_url=None, redoc_url=None)
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        payload = await request.json()
+        messages = payload.get("messages", [])
+        await asyncio.sleep(llm.latency("\n".join(str(m.get("content", "")) for m in messages)))
+        return llm.chat_completion(messages, payload.get("model", "fake-gpt"))
+
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request):
+        payload = await request.json()
+        return llm.embeddings(payload.get("input", ""), payload.get("model", "fake-embedding"))
+
+    @app.post("/v1/images/generations")
+    async def images(request: Request):
+        payload = await request.json()
+        return llm.images(payload.get("prompt", ""), int(payload.get("n", 1)))
+
+    @app.get("/v1/models")
+    def models():
+        return {"object": "list", "data": [{"id": "fake-gpt", "object": "model", "owned_by": "maestroia"}]}
+
+    return app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor de LLM falso compatível com a API da OpenAI")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9200)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--completion-tokens", type=int, default=200)
+    parser.add_argument("--embedding-dim", type=int, default=1536)
+    args = parser.parse_args(argv)
+
+    import uvicorn
+
+    llm = FakeLLM(args.latency_ms, args.jitter_ms, args.completion_tokens, args.embedding_dim)
+    uvicorn.run(create_app(llm), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""Servidor local que emula as APIs de Meta, Twitter/X, LinkedIn, Google e GitHub.
+
+Permite medir concorrência, retries e pooling do `agente_publicador` e dos fluxos OAuth sem
+tocar nas plataformas reais. Latência, taxa de erro e limite de taxa (429 com Retry-After)
+são configuráveis por `MockConfig`.
+
+Uso:
+    python -m maestroia.devtools.mock_platforms --port 9100 --latency lognormal --latency-ms 120 --error-rate 0.05
+    MOCK_PLATFORMS_URL=http://127.0.0.1:9100  # no .env do MaestroIA
+
+`GET /_stats` devolve contagem de requisições por rota e status; `POST /_reset` zera contadores.
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from dataclasses import dataclass, asdict
+from typing import Optional
+from urllib.parse import parse_qs
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "lognormal")
+
+
+@dataclass
+class MockConfig:
+    latency: str = "fixed"  # fixed | uniform | lognormal
+    latency_ms: float = 0.0  # valor fixo, mínimo (uniform) ou mediana (lognormal)
+    latency_max_ms: float = 0.0  # máximo da distribuição uniforme
+    latency_sigma: float = 0.5  # dispersão da lognormal (cauda longa)
+    error_rate: float = 0.0  # fração de respostas 500/503
+    rate_limit: int = 0  # requisições por janela e por token; 0 desativa
+    rate_window_seconds: float = 60.0
+    seed: Optional[int] = None
+
+    def sample_latency(self, rng: random.Random) -> float:
+        """Latência em segundos segundo a distribuição configurada."""
+        if self.latency == "uniform":
+            ms = rng.uniform(self.latency_ms, max(self.latency_ms, self.latency_max_ms))
+        elif self.latency == "lognormal":
+            ms = rng.lognormvariate(math.log(self.latency_ms), self.latency_sigma) if self.latency_ms > 0 else 0.0
+        else:
+            ms = self.latency_ms
+        return ms / 1000.0
+
+
+class _RateLimiter:
+    """Janela fixa por (plataforma, token), como os limites por usuário das plataformas."""
+
+    def __init__(self, limit: int, window: float):
+        self.limit = limit
+        self.window = window
+        self._windows = {}
+        self._lock = threading.Lock()
+
+    def retry_after(self, key: tuple) -> float:
+        """0 se a requisição cabe na janela; senão, segundos até a próxima janela."""
+        if self.limit <= 0:
+            return 0.0
+        now = time.monotonic()
+        with self._lock:
+            start, count = self._windows.get(key, (now, 0))
+            if now - start >= self.window:
+                start, count = now, 0
+            if count >= self.limit:
+                return self.window - (now - start)
+            self._windows[key] = (start, count + 1)
+            return 0.0
+
+
+def _token(request: Request, form: dict) -> str:
+    auth = request.headers.get("authorization", "")
+    return auth.split(" ", 1)[-1] if auth else form.get("access_token", "anon")
+
+
+async def _form(request: Request) -> dict:
+    body = (await request.body()).decode("utf-8")
+    return {k: v[0] for k, v in parse_qs(body).items()}
+
+
+def create_app(config: Optional[MockConfig] = None) -> FastAPI:
+    config = config or MockConfig()
+    rng = random.Random(config.seed)
+    limiter = _RateLimiter(config.rate_limit, config.rate_window_seconds)
+    stats = defaultdict(Counter)
+    app = FastAPI(title="MaestroIA mock platforms", docs_url=None, redoc_url=None)
+    app.state.config = config
+
+    async def simulate(request: Request, plataforma: str, form: dict) -> Optional[JSONResponse]:
+        """Aplica latência, 429 e erros; retorna a resposta de falha ou None para seguir."""
+        await asyncio.sleep(config.sample_latency(rng))
+        rota = f"{request.method} {request.url.path}"
+        espera = limiter.retry_after((plataforma, _token(request, form)))
+        if espera:
+            stats[rota][429] += 1
+            return JSONResponse(
+                {"error": {"message": "Rate limit exceeded", "code": 429}},
+                status_code=429,
+                headers={"Retry-After": str(math.ceil(espera))},
+            )
+        if rng.random() < config.error_rate:
+            status = rng.choice((500, 503))
+            stats[rota][status] += 1
+            return JSONResponse({"error": {"message": "Simulated upstream failure", "code": status}}, status_code=status)
+        return None
+
+    def ok(request: Request, body, status: int = 200) -> JSONResponse:
+        stats[f"{request.method} {request.url.path}"][status] += 1
+        return JSONResponse(body, status_code=status)
+
+    # ---------- Meta Graph API ----------
+    @app.post("/me/feed")
+    @app.post("/{version}/me/feed")
+    async def meta_feed(request: Request, version: str = ""):
+        form = await _form(request)
+        falha = await simulate(request, "meta", form)
+        if falha:
+            return falha
+        if not form.get("message"):
+            return ok(request, {"error": {"message": "(#100) message is required", "code": 100}}, 400)
+        return ok(request, {"id": f"mock_{uuid.uuid4().hex[:12]}"})
+
+    @app.post("/")
+    async def meta_batch(request: Request):
+        form = await _form(request)
+        falha = await simulate(request, "meta", form)
+        if falha:
+            return falha
+        batch = json.loads(form.get("batch", "[]"))
+        itens = []
+        for _ in batch:
+            if rng.random() < config.error_rate:
+                itens.append({"code": 500, "body": json.dumps({"error": {"message": "Simulated item failure"}})})
+            else:
+                itens.append({"code": 200, "body": json.dumps({"id": f"mock_{uuid.uuid4().hex[:12]}"})})
+        return ok(request, itens)
+
+    @app.get("/{version}/oauth/access_token")
+    async def meta_oauth(request: Request, version: str):
+        falha = await simulate(request, "meta", dict(request.query_params))
+        if falha:
+            return falha
+        if not request.query_params.get("code"):
+            return ok(request, {"error": {"message": "Missing code", "code": 100}}, 400)
+        return ok(request, {"access_token": f"mock-meta-{uuid.uuid4().hex}", "token_type": "bearer", "expires_in": 5183944})
+
+    # ---------- LinkedIn ----------
+    @app.post("/v2/ugcPosts")
+    async def linkedin_post(request: Request):
+        falha = await simulate(request, "linkedin", {})
+        if falha:
+            return falha
+        return ok(request, {"id": f"urn:li:share:{rng.randint(10**15, 10**16)}"}, 201)
+
+    # ---------- Twitter/X ----------
+    @app.post("/2/tweets")
+    async def twitter_post(request: Request):
+        falha = await simulate(request, "twitter", {})
+        if falha:
+            return falha
+        payload = await request.json()
+        texto = payload.get("text", "")
+        if len(texto) > 280:
+            return ok(request, {"title": "Invalid Request", "detail": "Tweet text is too long"}, 400)
+        return ok(request, {"data": {"id": str(rng.randint(10**18, 10**19)), "text": texto}}, 201)
+
+    # ---------- Google OAuth ----------
+    @app.post("/token")
+    async def google_token(request: Request):
+        form = await _form(request)
+        falha = await simulate(request, "google", form)
+        if falha:
+            return falha
+        if not form.get("code"):
+            return ok(request, {"error": "invalid_grant"}, 400)
+        return ok(request, {"access_token": f"mock-google-{uuid.uuid4().hex}", "expires_in": 3599, "token_type": "Bearer"})
+
+    @app.get("/oauth2/v2/userinfo")
+    async def google_userinfo(request: Request):
+        falha = await simulate(request, "google", {})
+        if falha:
+            return falha
+        return ok(request, {"id": "1", "email": "mock.user@example.com", "name": "Mock User", "picture": ""})
+
+    # ---------- GitHub OAuth ----------
+    @app.post("/login/oauth/access_token")
+    async def github_token(request: Request):
+        form = await _form(request)
+        falha = await simulate(request, "github", form)
+        if falha:
+            return falha
+        if not form.get("code"):
+            return ok(request, {"error": "bad_verification_code"})
+        return ok(request, {"access_token": f"mock-github-{uuid.uuid4().hex}", "token_type": "bearer", "scope": "user:email"})
+
+    @app.get("/user")
+    async def github_user(request: Request):
+        falha = await simulate(request, "github", {})
+        if falha:
+            return falha
+        return ok(request, {"login": "mockuser", "name": "Mock User", "email": None, "avatar_url": ""})
+
+    @app.get("/user/emails")
+    async def github_emails(request: Request):
+        falha = await simulate(request, "github", {})
+        if falha:
+            return falha
+        return ok(request, [{"email": "mock.user@example.com", "primary": True, "verified": True}])
+
+    # ---------- Controle ----------
+    @app.get("/_stats")
+    def get_stats():
+        return {
+            "config": asdict(config),
+            "rotas": {rota: {str(k): v for k, v in contagem.items()} for rota, contagem in stats.items()},
+            "total": sum(sum(c.values()) for c in stats.values()),
+        }
+
+    @app.post("/_reset")
+    def reset_stats():
+        stats.clear()
+        limiter._windows.clear()
+        return {"ok": True}
+
+    return app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor local que emula as APIs das plataformas")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", choices=LATENCY_DISTRIBUTIONS, default="fixed")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--latency-max-ms", type=float, default=0.0)
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=int, default=0, help="requisições por janela e por token (0 = sem limite)")
+    parser.add_argument("--rate-window", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    import uvicorn
+
+    config = MockConfig(
+        latency=args.latency,
+        latency_ms=args.latency_ms,
+        latency_max_ms=args.latency_max_ms,
+        latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        rate_window_seconds=args.rate_window,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
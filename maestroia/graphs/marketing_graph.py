@@ -1,4 +1,8 @@
+import time
+from functools import wraps
+
 from langgraph.graph import StateGraph, END
+from maestroia.core import metrics, tracing
 from maestroia.core.state import MaestroState
 from maestroia.agents.pesquisador import agente_pesquisador
 from maestroia.agents.estrategista import agente_estrategista
@@ -7,15 +11,53 @@ from maestroia.agents.publicador import agente_publicador
 from maestroia.agents.otimizador import agente_otimizador
 from maestroia.agents.maestro import agente_maestro
 
+
+def _timed(name, node):
+    """Registra a duração do nó em `tempos_nos` e num span `no.<nome>`."""
+    @wraps(node)
+    def wrapper(state):
+        inicio = time.perf_counter()
+        with tracing.span(f"no.{name}", no=name):
+            result = node(state) or {}
+        duracao = time.perf_counter() - inicio
+        metrics.NODE_DURATION.observe(duracao, node=name)
+        return {**result, "tempos_nos": {name: round(duracao, 4)}}
+    return wrapper
+
+
+class _TracedGraph:
+    """Grafo compilado cujo `invoke` abre o trace raiz da campanha."""
+
+    def __init__(self, compiled):
+        self._compiled = compiled
+
+    def invoke(self, state, *args, **kwargs):
+        inicio = time.perf_counter()
+        status = "error"
+        try:
+            with tracing.trace("campanha", objetivo=str(state.get("objetivo", ""))[:80],
+                               canais=",".join(state.get("canais", []) or []),
+                               tenant=str(state.get("tenant_id") or "")):
+                result = self._compiled.invoke(state, *args, **kwargs)
+            status = "error" if result.get("erros") else "ok"
+            return result
+        finally:
+            metrics.GRAPH_RUNS.inc(status=status)
+            metrics.GRAPH_DURATION.observe(time.perf_counter() - inicio)
+
+    def __getattr__(self, name):
+        return getattr(self._compiled, name)
+
+
 def build_marketing_graph():
     graph = StateGraph(MaestroState)
 
-    graph.add_node("pesquisador", agente_pesquisador)
-    graph.add_node("estrategista", agente_estrategista)
-    graph.add_node("criador_conteudo", agente_criador_conteudo)
-    graph.add_node("publicador", agente_publicador)
-    graph.add_node("otimizador", agente_otimizador)
-    graph.add_node("maestro", agente_maestro)
+    graph.add_node("pesquisador", _timed("pesquisador", agente_pesquisador))
+    graph.add_node("estrategista", _timed("estrategista", agente_estrategista))
+    graph.add_node("criador_conteudo", _timed("criador_conteudo", agente_criador_conteudo))
+    graph.add_node("publicador", _timed("publicador", agente_publicador))
+    graph.add_node("otimizador", _timed("otimizador", agente_otimizador))
+    graph.add_node("maestro", _timed("maestro", agente_maestro))
 
     graph.set_entry_point("pesquisador")
     graph.add_edge("pesquisador", "estrategista")
@@ -25,4 +67,4 @@ def build_marketing_graph():
     graph.add_edge("otimizador", "maestro")
     graph.add_edge("maestro", END)
 
-    return graph.compile()
+    return _TracedGraph(graph.compile())
@@ -1,9 +1,11 @@
 import sys
 sys.path.append('.')
 
+from maestroia.core.database import init_db
 from maestroia.graphs.marketing_graph import build_marketing_graph
 
 if __name__ == "__main__":
+    init_db()
     graph = build_marketing_graph()
     initial_state = {
         "objetivo": "Lançar produto X para público feminino 25-40 anos",
@@ -1,4 +1,11 @@
+import threading
+import time
+from typing import Optional
+
+from maestroia.config import settings
+from maestroia.core import metrics, tracing
 from maestroia.memory.vector import VectorStore
+from maestroia.services.openai_service import is_fallback
 
 store = VectorStore()
 
@@ -7,3 +14,151 @@ def store_memory(text: str):
 
 def retrieve_memory(query: str):
     return store.search(query)
+
+
+# =========================
+# MEMÓRIA DE CAMPANHAS
+# =========================
+# Um índice por (tenant, tipo de saída) garante que a pesquisa de um cliente
+# nunca seja reaproveitada para outro. Sem tenant não há memória: nada é gravado
+# nem consultado (um índice "default" comum misturaria clientes).
+
+_campaign_stores = {}
+_stats_lock = threading.Lock()
+_stats = {
+    "consultas": 0,
+    "reusos": 0,
+    "deltas": 0,
+    "latencia_economizada_s": 0.0,
+}
+
+
+def _expired(meta: dict) -> bool:
+    return time.time() - meta["created_at"] > getattr(settings, "MEMORY_MAX_AGE_HOURS", 168) * 3600
+
+
+def _campaign_store(kind: str, tenant: str) -> VectorStore:
+    key = (kind, str(tenant))
+    with _stats_lock:
+        if key not in _campaign_stores:
+            _campaign_stores[key] = VectorStore(
+                max_items=getattr(settings, "MEMORY_MAX_ITEMS_PER_TENANT", 500), is_expired=_expired,
+            )
+        return _campaign_stores[key]
+
+
+def campaign_memory_text(inputs: dict) -> str:
+    """Texto canônico das entradas de uma campanha, usado como chave semântica."""
+    parts = []
+    for field in sorted(inputs):
+        value = inputs[field]
+        if isinstance(value, (list, tuple)):
+            value = ", ".join(sorted(str(v) for v in value))
+        parts.append(f"{field}: {str(value).strip().lower()}")
+    return "\n".join(parts)
+
+
+def store_campaign_memory(kind: str, tenant: str, inputs: dict, output: str, duration_s: float):
+    """Indexa uma saída finalizada (`pesquisa`, `estrategia`...) junto com suas entradas.
+
+    `duration_s` é o custo da análise completa, usado para estimar a latência economizada
+    quando a saída for reaproveitada.
+    """
+    if not getattr(settings, "MEMORY_REUSE_ENABLED", True) or not output or not tenant:
+        return
+    if is_fallback(output):
+        return  # aviso de falha do LLM, não uma pesquisa/estratégia pronta
+    _campaign_store(kind, tenant).add_document(
+        campaign_memory_text(inputs),
+        {"output": output, "inputs": dict(inputs), "duration_s": duration_s, "created_at": time.time()},
+    )
+
+
+def lookup_campaign_memory(kind: str, tenant: str, inputs: dict) -> Optional[dict]:
+    """Procura uma saída anterior do mesmo tenant com entradas próximas.
+
+    Retorna None (análise completa) ou um dicionário com `modo`:
+    - "reuso": entradas praticamente idênticas, a saída pode ser usada como está;
+    - "delta": entradas próximas, basta uma atualização barata sobre a saída anterior.
+    """
+    if not getattr(settings, "MEMORY_REUSE_ENABLED", True) or not tenant:
+        return None
+    with _stats_lock:
+        _stats["consultas"] += 1
+    memoria = _search_campaign_memory(kind, tenant, inputs)
+    resultado = {"reuso": "hit", "delta": "delta"}.get(memoria["modo"]) if memoria else "miss"
+    metrics.CACHE_LOOKUPS.inc(cache=f"memoria_{kind}", result=resultado)
+    return memoria
+
+
+def _search_campaign_memory(kind: str, tenant: str, inputs: dict) -> Optional[dict]:
+    vs = _campaign_store(kind, tenant)
+    if not len(vs):
+        return None
+
+    for _, meta, similarity in vs.search_with_scores(campaign_memory_text(inputs), k=5):
+        if _expired(meta) or is_fallback(meta["output"]):
+            continue
+        if similarity >= getattr(settings, "MEMORY_REUSE_THRESHOLD", 0.97):
+            modo = "reuso"
+        elif similarity >= getattr(settings, "MEMORY_DELTA_THRESHOLD", 0.90):
+            modo = "delta"
+        else:
+            return None
+        with _stats_lock:
+            _stats["reusos" if modo == "reuso" else "deltas"] += 1
+        return {
+            "modo": modo,
+            "output": meta["output"],
+            "inputs": meta["inputs"],
+            "similaridade": round(similarity, 4),
+            "duracao_original_s": meta["duration_s"],
+        }
+    return None
+
+
+def record_memory_savings(saved_s: float):
+    with _stats_lock:
+        _stats["latencia_economizada_s"] += max(0.0, saved_s)
+
+
+def memory_report(previous: Optional[dict], kind: str, memoria: Optional[dict], inicio: float) -> dict:
+    """Atualiza o relatório `reuso_memoria` do estado para o nó `kind`.
+
+    `memoria` é o retorno de `lookup_campaign_memory` (None = análise completa) e
+    `inicio` o `time.perf_counter()` do começo do nó.
+    """
+    report = dict(previous or {})
+    tracing.set_attribute("cache_hit", bool(memoria))
+    tracing.set_attribute("memoria_modo", memoria["modo"] if memoria else "completo")
+    if not memoria:
+        report[kind] = {"modo": "completo"}
+        return report
+    economizado = max(0.0, memoria["duracao_original_s"] - (time.perf_counter() - inicio))
+    record_memory_savings(economizado)
+    report[kind] = {
+        "modo": memoria["modo"],
+        "similaridade": memoria["similaridade"],
+        "latencia_economizada_s": round(economizado, 3),
+    }
+    return report
+
+
+def memory_stats() -> dict:
+    """Taxa de acerto e latência economizada pela memória de campanhas neste processo."""
+    with _stats_lock:
+        stats = dict(_stats)
+    acertos = stats["reusos"] + stats["deltas"]
+    stats["acertos"] = acertos
+    stats["taxa_acerto"] = round(acertos / stats["consultas"], 4) if stats["consultas"] else 0.0
+    stats["latencia_economizada_s"] = round(stats["latencia_economizada_s"], 3)
+    return stats
+
+
+metrics.CACHE_HIT_RATIO.set_function(lambda: memory_stats()["taxa_acerto"], cache="memoria_campanhas")
+
+
+def reset_campaign_memory():
+    with _stats_lock:
+        _campaign_stores.clear()
+        _stats.update({"consultas": 0, "reusos": 0, "deltas": 0, "latencia_economizada_s": 0.0})
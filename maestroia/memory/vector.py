@@ -1,21 +1,104 @@
-import faiss
+import threading
+from typing import Callable, Optional
+
 import numpy as np
 from maestroia.services.openai_service import get_embedding
 from maestroia.config import settings
 
+# FAISS é opcional: sem ele a busca cai para produto interno em numpy
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+_INITIAL_CAPACITY = 64
+
 
 class VectorStore:
-    def __init__(self):
-        dim = getattr(settings, 'DEFAULT_EMBEDDING_DIM', 1536)
-        self.index = faiss.IndexFlatL2(dim)  # Dimensão do embedding
+    """Índice de similaridade em memória.
+
+    Os vetores ficam numa matriz pré-alocada (capacidade dobra quando enche), então a busca
+    sem FAISS é um único produto matriz-vetor sobre as linhas ocupadas. Com `max_items`, ao
+    encher o índice descarta primeiro os documentos em que `is_expired(metadata)` é verdadeiro
+    e, se não bastar, os mais antigos.
+    """
+
+    def __init__(self, dim: Optional[int] = None, max_items: Optional[int] = None,
+                 is_expired: Optional[Callable[[dict], bool]] = None):
+        self.dim = dim or getattr(settings, 'DEFAULT_EMBEDDING_DIM', 1536)
+        self.max_items = max_items
+        self.is_expired = is_expired
+        # Vetores normalizados + produto interno = similaridade de cosseno
+        self.index = faiss.IndexFlatIP(self.dim) if faiss else None
+        self._matrix = np.zeros((0, self.dim), dtype=np.float32)
         self.documents = []
+        self.metadatas = []
+        self._lock = threading.Lock()
 
-    def add_document(self, text: str):
-        vector = np.array(get_embedding(text), dtype=np.float32)
-        self.index.add(np.array([vector]))
-        self.documents.append(text)
+    def _embed(self, text: str) -> np.ndarray:
+        vector = np.array(get_embedding(text), dtype=np.float32)[:self.dim]
+        if vector.shape[0] < self.dim:
+            vector = np.pad(vector, (0, self.dim - vector.shape[0]))
+        vector = np.nan_to_num(vector, nan=0.0, posinf=0.0, neginf=0.0)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def add_document(self, text: str, metadata: Optional[dict] = None):
+        vector = self._embed(text)
+        with self._lock:
+            if self.max_items and len(self.documents) >= self.max_items:
+                self._evict()
+            n = len(self.documents)
+            if n == self._matrix.shape[0]:
+                capacity = max(_INITIAL_CAPACITY, 2 * n)
+                if self.max_items:
+                    capacity = min(capacity, self.max_items)
+                grown = np.zeros((capacity, self.dim), dtype=np.float32)
+                grown[:n] = self._matrix[:n]
+                self._matrix = grown
+            self._matrix[n] = vector
+            if self.index is not None:
+                self.index.add(vector.reshape(1, -1))
+            self.documents.append(text)
+            self.metadatas.append(metadata or {})
+
+    def _evict(self):
+        """Com o lock: remove os expirados ou, se nenhum, o décimo mais antigo do índice."""
+        n = len(self.documents)
+        keep = [i for i, meta in enumerate(self.metadatas) if not (self.is_expired and self.is_expired(meta))]
+        if len(keep) == n:
+            keep = keep[max(1, n // 10):]
+        self._matrix[:len(keep)] = self._matrix[keep]
+        self.documents = [self.documents[i] for i in keep]
+        self.metadatas = [self.metadatas[i] for i in keep]
+        if self.index is not None:
+            self.index.reset()
+            if keep:
+                self.index.add(self._matrix[:len(keep)])
+
+    def search_with_scores(self, query: str, k=5) -> list:
+        """Retorna [(documento, metadata, similaridade)] ordenado por similaridade (cosseno)."""
+        vector = self._embed(query)
+        with self._lock:
+            if not self.documents:
+                return []
+            n = len(self.documents)
+            k = min(k, n)
+            if self.index is not None:
+                scores, indices = self.index.search(vector.reshape(1, -1), k)
+                pairs = zip(indices[0], scores[0])
+            else:
+                sims = self._matrix[:n] @ vector
+                top = np.argpartition(-sims, k - 1)[:k] if k < n else np.arange(n)
+                top = top[np.argsort(-sims[top])]
+                pairs = ((i, sims[i]) for i in top)
+            return [
+                (self.documents[i], self.metadatas[i], float(s))
+                for i, s in pairs if 0 <= i < len(self.documents)
+            ]
 
     def search(self, query: str, k=5):
-        vector = np.array(get_embedding(query), dtype=np.float32)
-        distances, indices = self.index.search(np.array([vector]), k)
-        return [self.documents[i] for i in indices[0] if i < len(self.documents)]
+        return [doc for doc, _, _ in self.search_with_scores(query, k)]
+
+    def __len__(self):
+        return len(self.documents)
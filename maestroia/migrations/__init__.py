@@ -0,0 +1 @@
+"""Migrações do schema (Alembic); aplicadas por `maestroia.core.database.init_db` ou `alembic upgrade head`."""
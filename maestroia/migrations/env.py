@@ -0,0 +1,51 @@
+"""Ambiente do Alembic: usa o engine da aplicação (DATABASE_URL + PRAGMAs) ou o que `init_db` passar."""
+from logging.config import fileConfig
+
+from alembic import context
+
+from maestroia.core.database import Base, engine, import_models
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+import_models()
+target_metadata = Base.metadata
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    # campaigns_fts* (FTS5) é criada por SQL na 0001 e não está no metadata: o autogenerate não pode removê-la
+    return not (type_ == "table" and name.startswith("campaigns_fts"))
+
+
+def run_migrations_offline() -> None:
+    context.configure(
+        url=str(engine.url),
+        target_metadata=target_metadata,
+        include_object=include_object,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=engine.dialect.name == "sqlite",
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    bind = config.attributes.get("engine", engine)
+    with bind.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+            # SQLite não tem ALTER TABLE completo: alterações viram cópia da tabela
+            render_as_batch=connection.dialect.name == "sqlite",
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
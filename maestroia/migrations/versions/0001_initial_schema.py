@@ -0,0 +1,201 @@
+"""Schema inicial
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+
+Baseline das tabelas que antes eram criadas no import (create_all e
+`__table__.create` espalhados pelos serviços). Bancos já existentes são
+adotados: tabelas presentes não são recriadas, só ganham as colunas
+anuláveis que faltarem (como fazia o antigo `add_missing_columns`).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _ensure_table(name, *columns, indexes=(), constraints=()):
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(name):
+        op.create_table(name, *columns, *constraints)
+    else:
+        existing = {c['name'] for c in inspector.get_columns(name)}
+        for column in columns:
+            if column.name not in existing:
+                op.add_column(name, column.copy())
+    existing_indexes = {i['name'] for i in sa.inspect(op.get_bind()).get_indexes(name)}
+    for index_name, index_columns, unique in indexes:
+        if index_name not in existing_indexes:
+            op.create_index(index_name, name, index_columns, unique=unique)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _ensure_table(
+        'users',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('email', sa.String()),
+        sa.Column('hashed_password', sa.String()),
+        sa.Column('display_name', sa.String(), nullable=True),
+        sa.Column('plano', sa.String(), nullable=True),
+        sa.Column('pago', sa.Boolean(), nullable=True),
+        sa.Column('campanhas_mes', sa.Integer(), nullable=True),
+        sa.Column('logged_in', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        indexes=[('ix_users_id', ['id'], False), ('ix_users_email', ['email'], True)],
+    )
+    _ensure_table(
+        'campaigns',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('user_id', sa.Integer()),
+        sa.Column('objetivo', sa.String()),
+        sa.Column('publico_alvo', sa.String()),
+        sa.Column('canais', sa.String()),
+        sa.Column('orcamento', sa.String()),
+        sa.Column('resultado', sa.String()),
+        sa.Column('resultado_ref', sa.String(), nullable=True),
+        indexes=[('ix_campaigns_id', ['id'], False)],
+    )
+    _ensure_table(
+        'result_blobs',
+        sa.Column('hash', sa.String(64), primary_key=True),
+        sa.Column('codec', sa.String()),
+        sa.Column('raw_size', sa.Integer()),
+        sa.Column('data', sa.LargeBinary()),
+        sa.Column('created_at', sa.DateTime()),
+    )
+    _ensure_table(
+        'bulk_jobs',
+        sa.Column('id', sa.String(), primary_key=True),
+        sa.Column('user_id', sa.Integer()),
+        sa.Column('status', sa.String()),
+        sa.Column('total', sa.Integer()),
+        sa.Column('ok', sa.Integer()),
+        sa.Column('failed', sa.Integer()),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime()),
+        indexes=[('ix_bulk_jobs_user_id', ['user_id'], False)],
+    )
+    _ensure_table(
+        'bulk_job_rows',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('job_id', sa.String()),
+        sa.Column('row_number', sa.Integer()),
+        sa.Column('spec', sa.Text()),
+        sa.Column('status', sa.String()),
+        sa.Column('campaign_id', sa.Integer(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('attempts', sa.Integer()),
+        sa.Column('updated_at', sa.DateTime()),
+        constraints=[sa.UniqueConstraint('job_id', 'row_number', name='uq_bulk_job_rows_job_row')],
+        indexes=[
+            ('ix_bulk_job_rows_id', ['id'], False),
+            ('ix_bulk_job_rows_job_id', ['job_id'], False),
+            ('ix_bulk_job_rows_status', ['status'], False),
+        ],
+    )
+    _ensure_table(
+        'publish_outbox',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('idempotency_key', sa.String()),
+        sa.Column('campaign_key', sa.String()),
+        sa.Column('channel', sa.String()),
+        sa.Column('content', sa.Text()),
+        sa.Column('content_hash', sa.String()),
+        sa.Column('status', sa.String()),
+        sa.Column('attempts', sa.Integer()),
+        sa.Column('next_attempt_at', sa.DateTime()),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('result', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime()),
+        indexes=[
+            ('ix_publish_outbox_id', ['id'], False),
+            ('ix_publish_outbox_idempotency_key', ['idempotency_key'], True),
+            ('ix_publish_outbox_campaign_key', ['campaign_key'], False),
+            ('ix_publish_outbox_status', ['status'], False),
+            ('ix_publish_outbox_next_attempt_at', ['next_attempt_at'], False),
+        ],
+    )
+    _ensure_table(
+        'scheduled_posts',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('tenant_id', sa.String()),
+        sa.Column('channel', sa.String()),
+        sa.Column('content', sa.Text()),
+        sa.Column('due_at', sa.DateTime()),
+        sa.Column('status', sa.String()),
+        sa.Column('outbox_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime()),
+        indexes=[
+            ('ix_scheduled_posts_id', ['id'], False),
+            ('ix_scheduled_posts_tenant_id', ['tenant_id'], False),
+            ('ix_scheduled_posts_channel', ['channel'], False),
+            ('ix_scheduled_posts_due_at', ['due_at'], False),
+            ('ix_scheduled_posts_status', ['status'], False),
+        ],
+    )
+    _ensure_table(
+        'accounts',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('user_id', sa.Integer()),
+        sa.Column('email', sa.String()),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('is_active', sa.Boolean()),
+        indexes=[
+            ('ix_accounts_id', ['id'], False),
+            ('ix_accounts_user_id', ['user_id'], False),
+            ('ix_accounts_email', ['email'], True),
+        ],
+    )
+    _ensure_table(
+        'wallets',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('account_id', sa.Integer(), sa.ForeignKey('accounts.id')),
+        sa.Column('currency', sa.String()),
+        sa.Column('balance', sa.Numeric(18, 6)),
+        sa.Column('metadata', sa.JSON(), nullable=True),
+        indexes=[('ix_wallets_id', ['id'], False), ('ix_wallets_currency', ['currency'], False)],
+    )
+    _ensure_table(
+        'transactions',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('reference', sa.String()),
+        sa.Column('timestamp', sa.DateTime()),
+        sa.Column('description', sa.String()),
+        sa.Column('metadata', sa.JSON(), nullable=True),
+        indexes=[('ix_transactions_id', ['id'], False), ('ix_transactions_reference', ['reference'], True)],
+    )
+    _ensure_table(
+        'entries',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('transaction_id', sa.Integer(), sa.ForeignKey('transactions.id')),
+        sa.Column('wallet_id', sa.Integer(), sa.ForeignKey('wallets.id')),
+        sa.Column('amount', sa.Numeric(18, 6)),
+        sa.Column('is_debit', sa.Boolean()),
+        sa.Column('timestamp', sa.DateTime()),
+        indexes=[('ix_entries_id', ['id'], False)],
+    )
+    if op.get_bind().dialect.name == 'sqlite':
+        # Busca textual (services/campaign_search.py); fora do SQLite a busca usa LIKE
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS campaigns_fts USING fts5("
+            "owner, objetivo, publico_alvo, pesquisa, estrategia, conteudos, "
+            "tokenize = 'unicode61 remove_diacritics 2')"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TABLE IF EXISTS campaigns_fts")
+    for name in ('entries', 'transactions', 'wallets', 'accounts', 'scheduled_posts', 'publish_outbox',
+                 'bulk_job_rows', 'bulk_jobs', 'result_blobs', 'campaigns', 'users'):
+        op.drop_table(name)
@@ -0,0 +1,50 @@
+"""Índices compostos das consultas quentes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+
+- campaigns (user_id, id DESC): histórico paginado; substitui os índices
+  (user_id) e (user_id, id), que viram prefixo redundante.
+- entries (wallet_id, timestamp): extrato de uma carteira por período.
+- wallets (account_id, currency): carteira da conta numa moeda.
+
+`python -m maestroia.core.query_plans` confere se essas consultas usam os índices.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _indexes(table):
+    return {i['name'] for i in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if 'ix_campaigns_user_id_id_desc' not in _indexes('campaigns'):
+        op.create_index('ix_campaigns_user_id_id_desc', 'campaigns', ['user_id', sa.text('id DESC')])
+    for redundant in ('ix_campaigns_user_id_id', 'ix_campaigns_user_id'):
+        if redundant in _indexes('campaigns'):
+            op.drop_index(redundant, table_name='campaigns')
+    if 'ix_entries_wallet_id_timestamp' not in _indexes('entries'):
+        op.create_index('ix_entries_wallet_id_timestamp', 'entries', ['wallet_id', 'timestamp'])
+    if 'ix_wallets_account_id_currency' not in _indexes('wallets'):
+        op.create_index('ix_wallets_account_id_currency', 'wallets', ['account_id', 'currency'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_wallets_account_id_currency', table_name='wallets')
+    op.drop_index('ix_entries_wallet_id_timestamp', table_name='entries')
+    op.create_index('ix_campaigns_user_id', 'campaigns', ['user_id'])
+    op.create_index('ix_campaigns_user_id_id', 'campaigns', ['user_id', 'id'])
+    op.drop_index('ix_campaigns_user_id_id_desc', table_name='campaigns')
@@ -0,0 +1,46 @@
+"""campaigns_fts contentless
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+
+O índice de busca deixa de guardar uma cópia do texto das campanhas (`content=''`):
+o texto já está comprimido em `result_blobs`, e os trechos da busca são montados a
+partir dele. A tabela é recriada e repovoada a partir de `campaigns`.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+from sqlalchemy.orm import Session
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _recreate(contentless: bool) -> None:
+    from maestroia.services import campaign_search
+
+    op.execute("DROP TABLE IF EXISTS campaigns_fts")
+    op.execute(
+        "CREATE VIRTUAL TABLE campaigns_fts USING fts5("
+        "owner, objetivo, publico_alvo, pesquisa, estrategia, conteudos, "
+        + ("content = '', " if contentless else "")
+        + "tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    campaign_search.rebuild(lambda: Session(bind=op.get_bind()))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == 'sqlite':
+        _recreate(contentless=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'sqlite':
+        _recreate(contentless=False)
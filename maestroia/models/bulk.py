@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, UniqueConstraint
+from maestroia.core.database import Base
+from datetime import datetime
+
+
+class BulkJob(Base):
+    """Envio em lote de campanhas (CSV/JSONL); as linhas com falha podem ser reprocessadas."""
+    __tablename__ = 'bulk_jobs'
+    id = Column(String, primary_key=True)
+    user_id = Column(Integer, index=True)
+    status = Column(String, default='running')  # running, done, interrupted
+    total = Column(Integer, default=0)
+    ok = Column(Integer, default=0)
+    failed = Column(Integer, default=0)  # failed + invalid
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class BulkJobRow(Base):
+    """Resultado de uma linha do arquivo: a campanha gravada ou o erro (com a especificação, para retry)."""
+    __tablename__ = 'bulk_job_rows'
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(String, index=True)
+    row_number = Column(Integer)
+    spec = Column(Text)
+    status = Column(String, index=True)  # ok, failed, invalid
+    campaign_id = Column(Integer, nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (UniqueConstraint('job_id', 'row_number', name='uq_bulk_job_rows_job_row'),)
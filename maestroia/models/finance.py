@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Numeric, ForeignKey, DateTime, Boolean, JSON
+from sqlalchemy import Column, Integer, String, Numeric, ForeignKey, DateTime, Boolean, JSON, Index
 from sqlalchemy.orm import relationship
 from maestroia.core.database import Base
 from datetime import datetime
@@ -19,9 +19,11 @@ class Wallet(Base):
     account_id = Column(Integer, ForeignKey('accounts.id'))
     currency = Column(String, index=True)  # e.g., BRL, CO2
     balance = Column(Numeric(18, 6), default=0)
-    metadata = Column(JSON, nullable=True)
+    meta = Column('metadata', JSON, nullable=True)  # `metadata` é reservado pelo declarative
     account = relationship('Account')
 
+    __table_args__ = (Index('ix_wallets_account_id_currency', 'account_id', 'currency'),)
+
 
 class Transaction(Base):
     __tablename__ = 'transactions'
@@ -29,7 +31,7 @@ class Transaction(Base):
     reference = Column(String, unique=True, index=True)
     timestamp = Column(DateTime, default=datetime.utcnow)
     description = Column(String)
-    metadata = Column(JSON, nullable=True)
+    meta = Column('metadata', JSON, nullable=True)  # `metadata` é reservado pelo declarative
 
 
 class Entry(Base):
@@ -41,3 +43,6 @@ class Entry(Base):
     is_debit = Column(Boolean)
     timestamp = Column(DateTime, default=datetime.utcnow)
     transaction = relationship('Transaction')
+
+    # Extrato de uma carteira por período
+    __table_args__ = (Index('ix_entries_wallet_id_timestamp', 'wallet_id', 'timestamp'),)
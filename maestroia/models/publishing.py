@@ -0,0 +1,35 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime
+from maestroia.core.database import Base
+from datetime import datetime
+
+
+class PublishOutbox(Base):
+    """Outbox transacional: cada publicação (campanha, canal, hash do conteúdo) é gravada
+    antes de ser entregue pelo dispatcher em background."""
+    __tablename__ = 'publish_outbox'
+    id = Column(Integer, primary_key=True, index=True)
+    idempotency_key = Column(String, unique=True, index=True)
+    campaign_key = Column(String, index=True)
+    channel = Column(String)
+    content = Column(Text)
+    content_hash = Column(String)
+    status = Column(String, index=True, default='pending')  # pending, sending, sent, skipped, failed
+    attempts = Column(Integer, default=0)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow, index=True)
+    last_error = Column(Text, nullable=True)
+    result = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class ScheduledPost(Base):
+    """Post agendado: ao vencer `due_at` é entregue ao outbox de publicações."""
+    __tablename__ = 'scheduled_posts'
+    id = Column(Integer, primary_key=True, index=True)
+    tenant_id = Column(String, index=True)
+    channel = Column(String, index=True)
+    content = Column(Text)
+    due_at = Column(DateTime, index=True)
+    status = Column(String, index=True, default='scheduled')  # scheduled, dispatched, cancelled
+    outbox_id = Column(Integer, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
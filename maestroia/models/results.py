@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, String, LargeBinary, DateTime
+from maestroia.core.database import Base
+from datetime import datetime
+
+
+class ResultBlob(Base):
+    """Seção de resultado de campanha, comprimida e endereçada pelo sha256 do conteúdo."""
+    __tablename__ = 'result_blobs'
+    hash = Column(String(64), primary_key=True)
+    codec = Column(String, default='zlib')  # zstd, zlib
+    raw_size = Column(Integer)
+    data = Column(LargeBinary)
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,382 @@
+"""Envio de campanhas em lote a partir de CSV ou JSONL.
+
+O arquivo é lido linha a linha (`parse_specs`) e cada campanha roda o grafo no pool do
+`CampaignRunner` (o mesmo das campanhas avulsas), com no máximo `concurrency` linhas do lote
+admitidas por vez; só entram novas linhas quando alguma termina, então nem o arquivo nem os
+resultados ficam inteiros em memória. Com o pool cheio o lote espera (back-pressure) em vez
+de falhar, e no máximo BULK_MAX_JOBS lotes rodam no processo (`reserve`; excedente = 503). O ritmo respeita
+BULK_CAMPAIGNS_PER_MINUTE e, quando o LLM começa a falhar (resposta de fallback, em geral
+429/timeout do provedor), o envio pausa com backoff exponencial e a linha fica como `failed`.
+
+Os resultados são gravados em lotes de BULK_COMMIT_EVERY linhas (campanha + status da linha
+numa transação) e cada linha gravada vira um evento do fluxo de progresso. As linhas `failed`
+guardam a especificação e podem ser reprocessadas com `retry_rows`. Se o cliente desconectar,
+o que já terminou é gravado, as linhas em execução ou ainda não lidas ficam `failed` e o lote
+fica `interrupted`, pronto para o retry.
+
+Do arquivo só entram no grafo os campos de entrada do MaestroState (SPEC_FIELDS); o tenant da
+memória de campanhas é sempre o dono do lote.
+"""
+import csv
+import json
+import re
+import tempfile
+import threading
+import time
+import uuid
+import weakref
+from concurrent.futures import FIRST_COMPLETED, wait
+from typing import Iterable, Iterator, Optional, TextIO
+
+from maestroia.config import settings
+from maestroia.core.database import SessionLocal
+from maestroia.models.bulk import BulkJob, BulkJobRow
+from maestroia.services import campaign_history
+from maestroia.services.campaign_runner import CampaignRunnerSaturated, get_campaign_runner
+from maestroia.services.openai_service import is_fallback
+from maestroia.services.rate_limits import TokenBucket
+
+
+FORMATS = ("csv", "jsonl")
+SPEC_FIELDS = ("objetivo", "publico_alvo", "canais", "orcamento")
+INTERRUPTED = "interrompida antes de concluir (cliente desconectou)"
+FLUSH_SECONDS = 2.0
+SATURATED_WAIT_SECONDS = 0.25
+_CHANNEL_SEP = re.compile(r"[;,|]")
+_SPOOL_MAX_MEMORY = 1024 * 1024
+
+
+class InvalidSpec(ValueError):
+    """Linha sem os campos obrigatórios ou com valores inválidos."""
+
+
+class BulkJobsSaturated(Exception):
+    """BULK_MAX_JOBS lotes já em execução neste processo."""
+
+
+def normalize_spec(raw: dict) -> dict:
+    """Linha do arquivo -> entradas do MaestroState; colunas fora de SPEC_FIELDS são ignoradas."""
+    spec = {k.strip(): v for k, v in raw.items() if k and k.strip() in SPEC_FIELDS and v not in (None, "")}
+    for field in ("objetivo", "publico_alvo"):
+        if not str(spec.get(field, "")).strip():
+            raise InvalidSpec(f"campo obrigatório ausente: {field}")
+        spec[field] = str(spec[field]).strip()
+    canais = spec.get("canais", [])
+    if isinstance(canais, str):
+        canais = [c.strip() for c in _CHANNEL_SEP.split(canais) if c.strip()]
+    spec["canais"] = list(canais)
+    if "orcamento" in spec:
+        try:
+            spec["orcamento"] = float(str(spec["orcamento"]).replace(",", "."))
+        except ValueError:
+            raise InvalidSpec(f"orçamento inválido: {spec['orcamento']}")
+    return spec
+
+
+def parse_specs(stream: TextIO, fmt: str) -> Iterator[tuple]:
+    """(nº da linha, especificação, erro) para cada campanha do arquivo, sem lê-lo inteiro."""
+    if fmt not in FORMATS:
+        raise ValueError(f"formato inválido: {fmt} (use {', '.join(FORMATS)})")
+    if fmt == "csv":
+        for row_number, raw in enumerate(csv.DictReader(stream), start=1):
+            try:
+                yield row_number, normalize_spec(raw), None
+            except InvalidSpec as e:
+                yield row_number, raw, str(e)
+        return
+    for row_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            raw = json.loads(line)
+            if not isinstance(raw, dict):
+                raise InvalidSpec("cada linha deve ser um objeto JSON")
+            yield row_number, normalize_spec(raw), None
+        except (ValueError, InvalidSpec) as e:
+            yield row_number, {"linha": line.strip()[:500]}, str(e)
+
+
+async def spool_body(chunks) -> tempfile.SpooledTemporaryFile:
+    """Copia o corpo da requisição para um arquivo temporário (memória até 1 MiB, depois disco)."""
+    spool = tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX_MEMORY)
+    async for chunk in chunks:
+        spool.write(chunk)
+    spool.seek(0)
+    return spool
+
+
+def _llm_fallback(result: dict) -> bool:
+    """O grafo não levanta erro quando o LLM falha: os nós devolvem o texto de fallback."""
+    return any(is_fallback(result.get(key)) for key in ("pesquisa", "estrategia"))
+
+
+_pace_bucket = None
+_pace_lock = threading.Lock()
+_job_slots = None
+
+
+def _get_pace_bucket() -> Optional[TokenBucket]:
+    """Ritmo compartilhado por todos os lotes do processo."""
+    global _pace_bucket
+    rate = settings.BULK_CAMPAIGNS_PER_MINUTE
+    if rate <= 0:
+        return None
+    with _pace_lock:
+        if _pace_bucket is None or _pace_bucket.rate != rate / 60.0:
+            _pace_bucket = TokenBucket(rate / 60.0, 1)
+        return _pace_bucket
+
+
+def _get_job_slots() -> threading.BoundedSemaphore:
+    global _job_slots
+    with _pace_lock:
+        if _job_slots is None:
+            _job_slots = threading.BoundedSemaphore(max(1, settings.BULK_MAX_JOBS))
+        return _job_slots
+
+
+class BulkRunner:
+    def __init__(self, graph, user_id: int, job_id: Optional[str] = None, concurrency: Optional[int] = None,
+                 session_factory=SessionLocal, commit_every: Optional[int] = None, campaign_runner=None):
+        self.graph = graph
+        self.campaign_runner = campaign_runner or get_campaign_runner()
+        self.user_id = user_id
+        self.job_id = job_id or uuid.uuid4().hex
+        limit = settings.BULK_MAX_CONCURRENCY
+        self.concurrency = max(1, min(concurrency or limit, limit))
+        self.session_factory = session_factory
+        self.commit_every = commit_every or settings.BULK_COMMIT_EVERY
+        self._backoff = 0.0
+        self._paused_until = 0.0
+        self._job_slot = None
+
+    def reserve(self):
+        """Ocupa uma das BULK_MAX_JOBS vagas de lote; levanta `BulkJobsSaturated`.
+
+        A vaga é devolvida ao fim de `run` (ou quando o runner é coletado sem ter rodado).
+        """
+        if self._job_slot is not None:
+            return
+        slots = _get_job_slots()
+        if not slots.acquire(blocking=False):
+            raise BulkJobsSaturated(f"{settings.BULK_MAX_JOBS} lotes em execução")
+        self._job_slot = weakref.finalize(self, slots.release)
+
+    # --- ritmo e backoff ---
+
+    def _wait_turn(self):
+        delay = self._paused_until - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        bucket = _get_pace_bucket()
+        while bucket is not None and not bucket.take_up_to(1):
+            time.sleep(bucket.wait_time())
+
+    def _throttled(self):
+        base = settings.BULK_BACKOFF_SECONDS
+        self._backoff = min(settings.BULK_MAX_BACKOFF_SECONDS, self._backoff * 2 if self._backoff else base)
+        self._paused_until = time.monotonic() + self._backoff
+
+    # --- persistência ---
+
+    def _ensure_job(self):
+        db = self.session_factory()
+        try:
+            if db.get(BulkJob, self.job_id) is None:
+                db.add(BulkJob(id=self.job_id, user_id=self.user_id))
+            else:
+                db.query(BulkJob).filter(BulkJob.id == self.job_id).update({"status": "running"})
+            db.commit()
+        finally:
+            db.close()
+
+    def _flush(self, done: list) -> list:
+        """Grava campanhas e status das linhas numa transação; retorna os eventos."""
+        if not done:
+            return []
+        db = self.session_factory()
+        try:
+            numbers = [row for row, _, _, _ in done]
+            existing = {
+                r.row_number: r
+                for r in db.query(BulkJobRow).filter(BulkJobRow.job_id == self.job_id,
+                                                     BulkJobRow.row_number.in_(numbers))
+            }
+            events = []
+            for row, spec, status, payload in done:
+                record = existing.get(row) or BulkJobRow(job_id=self.job_id, row_number=row, attempts=0)
+                record.spec = json.dumps(spec, ensure_ascii=False)
+                record.status = status
+                record.attempts = (record.attempts or 0) + (status != "invalid")
+                event = {"event": "row", "row": row, "status": status}
+                if status == "ok":
+                    campaign = campaign_history.save_campaign(db, self.user_id, spec, payload)
+                    record.campaign_id, record.error = campaign.id, None
+                    event["campaign_id"] = campaign.id
+                else:
+                    record.error = event["error"] = payload
+                db.add(record)
+                events.append(event)
+            db.commit()
+            done.clear()
+            return events
+        finally:
+            db.close()
+
+    def _finish(self, status: str = "done") -> dict:
+        db = self.session_factory()
+        try:
+            counts = {s: 0 for s in ("ok", "failed", "invalid")}
+            for row_status, in db.query(BulkJobRow.status).filter(BulkJobRow.job_id == self.job_id):
+                counts[row_status] = counts.get(row_status, 0) + 1
+            db.query(BulkJob).filter(BulkJob.id == self.job_id).update({
+                "status": status, "total": sum(counts.values()),
+                "ok": counts["ok"], "failed": counts["failed"] + counts["invalid"],
+            })
+            db.commit()
+            return {"event": "summary", "job_id": self.job_id, "total": sum(counts.values()), **counts}
+        finally:
+            db.close()
+
+    def _abort(self, rows: Iterator[tuple], in_flight: dict, done: list):
+        """Fluxo encerrado antes do fim: nenhuma linha do arquivo fica sem registro."""
+        for future, (row, spec) in in_flight.items():
+            if future.done() and not future.cancelled():
+                self._collect(future, row, spec, done)
+            else:
+                done.append((row, spec, "failed", INTERRUPTED))
+        self._flush(done)
+        try:
+            for row, spec, error in rows:
+                done.append((row, spec, "invalid", error) if error else (row, spec, "failed", INTERRUPTED))
+                if len(done) >= self.commit_every:
+                    self._flush(done)
+        except Exception:
+            pass  # arquivo ilegível a partir daqui: fica registrado o que deu para ler
+        self._flush(done)
+        self._finish("interrupted")
+
+    # --- execução ---
+
+    def _graph_input(self, row: int, spec: dict) -> dict:
+        state = {k: spec[k] for k in SPEC_FIELDS if k in spec}
+        state["tenant_id"] = str(self.user_id)
+        # Retomar o job não republica a linha; outro job com as mesmas entradas publica
+        state["campanha_id"] = f"bulk-{self.job_id}-{row}"
+        return state
+
+    def _collect(self, future, row: int, spec: dict, done: list):
+        try:
+            result = future.result()
+        except Exception as e:
+            self._throttled()
+            done.append((row, spec, "failed", f"{type(e).__name__}: {e}"))
+            return
+        if _llm_fallback(result):
+            self._throttled()
+            done.append((row, spec, "failed", "LLM indisponível (resposta de fallback)"))
+        else:
+            self._backoff = 0.0
+            done.append((row, spec, "ok", result))
+
+    def run(self, rows: Iterable[tuple]) -> Iterator[dict]:
+        """Executa as linhas e gera eventos: job, row (a cada lote gravado) e summary."""
+        self.reserve()
+        rows = iter(rows)
+        in_flight, done, held = {}, [], None  # held: linha já lida esperando vaga no pool
+        exhausted, completed, last_flush = False, False, time.monotonic()
+        try:
+            self._ensure_job()
+            yield {"event": "job", "job_id": self.job_id, "concurrency": self.concurrency}
+            while True:
+                while not exhausted and len(in_flight) < self.concurrency:
+                    if held is None:
+                        item = next(rows, None)
+                        if item is None:
+                            exhausted = True
+                            break
+                        row, spec, error = item
+                        if error:
+                            done.append((row, spec, "invalid", error))
+                            continue
+                        self._wait_turn()
+                        held = (row, spec)
+                    try:
+                        future = self.campaign_runner.submit_future(self.graph.invoke, self._graph_input(*held))
+                    except CampaignRunnerSaturated:
+                        break  # pool do processo cheio: espera alguma campanha terminar
+                    in_flight[future], held = held, None
+
+                if in_flight:
+                    finished, _ = wait(in_flight, timeout=FLUSH_SECONDS, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        self._collect(future, *in_flight.pop(future), done)
+                elif held is not None:
+                    time.sleep(SATURATED_WAIT_SECONDS)
+
+                finished_all = exhausted and not in_flight and held is None
+                if finished_all or len(done) >= self.commit_every or time.monotonic() - last_flush >= FLUSH_SECONDS:
+                    yield from self._flush(done)
+                    last_flush = time.monotonic()
+                if finished_all:
+                    break
+            summary = self._finish()
+            completed = True
+            yield summary
+        finally:
+            # Cliente desconectou ou erro: não inicia as linhas que ainda aguardavam vaga no pool
+            for future in in_flight:
+                future.cancel()
+            try:
+                if not completed:
+                    if held is not None:
+                        done.append((*held, "failed", INTERRUPTED))
+                    self._abort(rows, in_flight, done)
+            finally:
+                self._job_slot()
+
+
+def retry_rows(job_id: str, session_factory=SessionLocal) -> Iterator[tuple]:
+    """Linhas `failed` do lote, no formato de `parse_specs`, para rodar de novo."""
+    db = session_factory()
+    try:
+        rows = (
+            db.query(BulkJobRow.row_number, BulkJobRow.spec)
+            .filter(BulkJobRow.job_id == job_id, BulkJobRow.status == "failed")
+            .order_by(BulkJobRow.row_number)
+            .all()
+        )
+    finally:
+        db.close()
+    for row_number, spec in rows:
+        yield row_number, json.loads(spec), None
+
+
+def get_job(db, job_id: str, user_id: int) -> Optional[dict]:
+    job = db.query(BulkJob).filter(BulkJob.id == job_id, BulkJob.user_id == user_id).first()
+    if job is None:
+        return None
+    failed = (
+        db.query(BulkJobRow)
+        .filter(BulkJobRow.job_id == job_id, BulkJobRow.status.in_(("failed", "invalid")))
+        .order_by(BulkJobRow.row_number)
+        .all()
+    )
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "total": job.total,
+        "ok": job.ok,
+        "failed": job.failed,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "failed_rows": [
+            {"row": r.row_number, "status": r.status, "error": r.error, "attempts": r.attempts,
+             "spec": json.loads(r.spec) if r.spec else None}
+            for r in failed
+        ],
+    }
+
+
+def ndjson(events: Iterable[dict]) -> Iterator[bytes]:
+    for event in events:
+        yield (json.dumps(event, ensure_ascii=False) + "\n").encode("utf-8")
@@ -0,0 +1,100 @@
+"""Exportação em streaming do histórico de campanhas (NDJSON ou CSV, opcionalmente gzip).
+
+As linhas saem de um cursor do servidor (`stream_results` + `yield_per`), são serializadas
+uma a uma e agrupadas em blocos de ~EXPORT_CHUNK_BYTES antes de ir para o cliente; o gzip é
+aplicado no mesmo fluxo. Nenhum ponto guarda o histórico inteiro: a memória fica constante
+seja qual for o número de campanhas exportadas.
+"""
+import csv
+import io
+import json
+import zlib
+from typing import Iterator, Optional
+
+from sqlalchemy import select
+
+from maestroia.core.database import Campaign, SessionLocal
+from maestroia.services import result_store
+
+FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+COLUMNS = ("id", "objetivo", "publico_alvo", "canais", "orcamento")
+EXPORT_CHUNK_BYTES = 64 * 1024
+YIELD_PER = 500
+
+
+def _rows(user_id: int, include_result: bool, session_factory) -> Iterator[dict]:
+    columns = [getattr(Campaign, c) for c in COLUMNS]
+    if include_result:
+        columns += [Campaign.resultado_ref, Campaign.resultado]
+    db = session_factory()
+    try:
+        stmt = (
+            select(*columns)
+            .where(Campaign.user_id == user_id)
+            .order_by(Campaign.id)
+            .execution_options(stream_results=True, yield_per=YIELD_PER)
+        )
+        for row in db.execute(stmt):
+            item = {c: getattr(row, c) for c in COLUMNS}
+            item["canais"] = item["canais"].split(",") if item["canais"] else []
+            if include_result:
+                if row.resultado_ref:
+                    item["resultado"] = result_store.load_result(db, row.resultado_ref)
+                else:
+                    item["resultado"] = json.loads(row.resultado) if row.resultado else None
+            yield item
+    finally:
+        db.close()
+
+
+def _ndjson(items: Iterator[dict]) -> Iterator[str]:
+    for item in items:
+        yield json.dumps(item, ensure_ascii=False) + "\n"
+
+
+def _csv(items: Iterator[dict], include_result: bool) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    header = list(COLUMNS) + (["resultado"] if include_result else [])
+    writer.writerow(header)
+    for item in items:
+        values = [item[c] for c in COLUMNS]
+        values[COLUMNS.index("canais")] = ",".join(item["canais"])
+        if include_result:
+            values.append(json.dumps(item["resultado"], ensure_ascii=False))
+        writer.writerow(values)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()  # só o cabeçalho, se não houver campanhas
+
+
+def export_campaigns(user_id: int, fmt: str = "ndjson", include_result: bool = False,
+                     gzip: bool = False, session_factory=SessionLocal) -> Iterator[bytes]:
+    """Gerador de blocos de bytes para um `StreamingResponse`."""
+    if fmt not in FORMATS:
+        raise ValueError(f"formato inválido: {fmt} (use {', '.join(FORMATS)})")
+    items = _rows(user_id, include_result, session_factory)
+    lines = _ndjson(items) if fmt == "ndjson" else _csv(items, include_result)
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if gzip else None  # wbits=31: cabeçalho gzip
+
+    pending, size = [], 0
+    for line in lines:
+        pending.append(line)
+        size += len(line)
+        if size >= EXPORT_CHUNK_BYTES:
+            data = "".join(pending).encode("utf-8")
+            pending, size = [], 0
+            data = compressor.compress(data) if compressor else data
+            if data:
+                yield data
+    data = "".join(pending).encode("utf-8")
+    if compressor:
+        data = compressor.compress(data) + compressor.flush()
+    if data:
+        yield data
+
+
+def export_filename(fmt: str, gzip: bool, suffix: Optional[str] = None) -> str:
+    name = f"campanhas{'-' + suffix if suffix else ''}.{fmt}"
+    return name + ".gz" if gzip else name
@@ -0,0 +1,114 @@
+"""Gravação e consulta paginada do histórico de campanhas.
+
+A listagem usa paginação por chave (keyset) sobre `(user_id, id)`: cada página é um
+`WHERE user_id = ? AND id < ? ORDER BY id DESC LIMIT n` atendido pelo índice composto,
+então o custo não cresce com o tamanho do histórico. Só as colunas pedidas são lidas;
+o `resultado` (o blob JSON grande) fica de fora do resumo e sai apenas no detalhe.
+"""
+import base64
+import json
+from typing import Iterable, Optional
+
+from sqlalchemy.orm import Session
+
+from maestroia.core.database import Campaign
+from maestroia.services import campaign_search, result_store
+
+SUMMARY_FIELDS = ("id", "objetivo", "publico_alvo", "canais", "orcamento")
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+
+class InvalidQuery(ValueError):
+    """Cursor ou seleção de campos inválidos."""
+
+
+def save_campaign(db: Session, user_id: int, state: dict, result: dict) -> Campaign:
+    """Adiciona a campanha (resultado no result_store, texto no índice de busca); o commit é do chamador."""
+    canais = state.get("canais", [])
+    campaign = Campaign(
+        user_id=user_id,
+        objetivo=state.get("objetivo", ""),
+        publico_alvo=state.get("publico_alvo", ""),
+        canais=",".join(canais) if isinstance(canais, list) else str(canais),
+        orcamento=str(state.get("orcamento", "")),
+        resultado_ref=result_store.save_result(db, result),
+    )
+    db.add(campaign)
+    db.flush()
+    campaign_search.index_campaign(db, campaign.id, user_id, campaign.objetivo, campaign.publico_alvo, result)
+    return campaign
+
+
+def encode_cursor(campaign_id: int) -> str:
+    return base64.urlsafe_b64encode(str(campaign_id).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return int(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (ValueError, UnicodeDecodeError):
+        raise InvalidQuery("cursor inválido")
+
+
+def parse_fields(fields: Optional[str]) -> tuple:
+    """"objetivo,canais" -> ("id", "objetivo", "canais"); o id sempre vem (é o cursor)."""
+    if not fields:
+        return SUMMARY_FIELDS
+    pedidos = [f.strip() for f in fields.split(",") if f.strip()]
+    desconhecidos = sorted(set(pedidos) - set(SUMMARY_FIELDS))
+    if desconhecidos:
+        raise InvalidQuery(
+            f"campos desconhecidos: {', '.join(desconhecidos)} (disponíveis: {', '.join(SUMMARY_FIELDS)})"
+        )
+    return tuple(f for f in SUMMARY_FIELDS if f == "id" or f in pedidos)
+
+
+def _serialize(row, fields: Iterable[str]) -> dict:
+    item = {}
+    for field in fields:
+        value = getattr(row, field)
+        if field == "canais":
+            value = value.split(",") if value else []
+        item[field] = value
+    return item
+
+
+def list_history(db: Session, user_id: int, limit: int = DEFAULT_LIMIT,
+                 cursor: Optional[str] = None, fields: Optional[str] = None) -> dict:
+    """Uma página do histórico, da campanha mais recente para a mais antiga."""
+    selected = parse_fields(fields)
+    limit = max(1, min(limit, MAX_LIMIT))
+    query = db.query(*(getattr(Campaign, f) for f in selected)).filter(Campaign.user_id == user_id)
+    if cursor:
+        query = query.filter(Campaign.id < decode_cursor(cursor))
+    # Um registro a mais só para saber se existe próxima página
+    rows = query.order_by(Campaign.id.desc()).limit(limit + 1).all()
+    page = rows[:limit]
+    next_cursor = encode_cursor(page[-1].id) if len(rows) > limit else None
+    return {"history": [_serialize(r, selected) for r in page], "next_cursor": next_cursor}
+
+
+def get_campaign(db: Session, user_id: int, campaign_id: int,
+                 sections: Optional[Iterable[str]] = None) -> Optional[dict]:
+    """Campanha completa (com `resultado`) se pertencer ao usuário; senão None."""
+    campaign = (
+        db.query(Campaign)
+        .filter(Campaign.user_id == user_id, Campaign.id == campaign_id)
+        .first()
+    )
+    if campaign is None:
+        return None
+    item = _serialize(campaign, SUMMARY_FIELDS)
+    if campaign.resultado_ref:
+        item["resultado"] = result_store.load_result(db, campaign.resultado_ref, sections)
+    elif campaign.resultado:
+        # Linha anterior ao result_store (scripts/migrate_campaign_results.py converte)
+        resultado = json.loads(campaign.resultado)
+        if sections is not None and isinstance(resultado, dict):
+            resultado = {k: resultado[k] for k in sections if k in resultado}
+        item["resultado"] = resultado
+    else:
+        item["resultado"] = None
+    return item
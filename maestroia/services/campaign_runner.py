@@ -0,0 +1,88 @@
+"""Execução de campanhas fora do event loop, com limite de concorrência e back-pressure.
+
+`graph.invoke` e as gravações no banco são síncronos: rodá-los dentro de um endpoint
+`async def` trava todas as outras requisições do worker. O `CampaignRunner` executa cada
+campanha num pool dedicado de CAMPAIGN_MAX_CONCURRENCY threads, com até CAMPAIGN_QUEUE_SIZE
+campanhas aguardando; além disso `submit` recusa na hora (`CampaignRunnerSaturated`) e a
+API responde 503 com Retry-After, mantendo /token e /campaign/history rápidos. O envio em lote
+(/campaign/bulk) passa pelo mesmo pool via `submit_future`: lotes e campanhas avulsas dividem
+as mesmas vagas.
+"""
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import Optional
+
+from maestroia.config import settings
+from maestroia.core import metrics, tracing
+
+
+class CampaignRunnerSaturated(Exception):
+    """Todas as vagas (execução + fila) ocupadas."""
+
+
+class CampaignRunner:
+    def __init__(self, max_concurrency: Optional[int] = None, queue_size: Optional[int] = None):
+        self.max_concurrency = max_concurrency or settings.CAMPAIGN_MAX_CONCURRENCY
+        self.queue_size = settings.CAMPAIGN_QUEUE_SIZE if queue_size is None else queue_size
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="campanha")
+        self._slots = threading.BoundedSemaphore(self.max_concurrency + self.queue_size)
+        self._lock = threading.Lock()
+        self._admitted = 0
+
+    @property
+    def admitted(self) -> int:
+        """Campanhas em execução ou aguardando vaga no pool."""
+        return self._admitted
+
+    def _acquire(self):
+        if not self._slots.acquire(blocking=False):
+            raise CampaignRunnerSaturated(
+                f"{self.max_concurrency} campanhas em execução e {self.queue_size} na fila"
+            )
+        with self._lock:
+            self._admitted += 1
+
+    def _release(self):
+        with self._lock:
+            self._admitted -= 1
+        self._slots.release()
+
+    def submit_future(self, func, *args, **kwargs) -> Future:
+        """Admite `func` no pool e devolve o Future (para chamadores síncronos). Levanta `CampaignRunnerSaturated`."""
+        self._acquire()
+        try:
+            future = self._executor.submit(tracing.bind_context(partial(func, *args, **kwargs)))
+        except BaseException:
+            self._release()
+            raise
+        # A vaga só é devolvida quando a thread termina (ou o Future é cancelado antes de começar),
+        # mesmo se o cliente desconectar antes
+        future.add_done_callback(lambda _: self._release())
+        return future
+
+    async def submit(self, func, *args, **kwargs):
+        """Executa `func` no pool e aguarda sem bloquear o loop. Levanta `CampaignRunnerSaturated`."""
+        return await asyncio.wrap_future(self.submit_future(func, *args, **kwargs))
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def get_campaign_runner() -> CampaignRunner:
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = CampaignRunner()
+            runner = _runner
+            metrics.QUEUE_DEPTH.set_function(
+                lambda: max(0, runner.admitted - runner.max_concurrency), queue="campanhas"
+            )
+            metrics.QUEUE_DEPTH.set_function(lambda: min(runner.admitted, runner.max_concurrency),
+                                             queue="campanhas_em_execucao")
+        return _runner
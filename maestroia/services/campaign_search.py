@@ -0,0 +1,265 @@
+"""Busca textual no histórico de campanhas (SQLite FTS5).
+
+`campaigns_fts` indexa objetivo, público-alvo e o texto gerado (pesquisa, estratégia,
+conteúdos), com `rowid` = id da campanha. A tabela é contentless (`content=''`): guarda só
+as listas invertidas, não uma cópia do texto, que continua comprimido em `result_blobs`; os
+trechos da página são montados a partir do `result_store`. O dono vai numa coluna indexada
+(`owner`, "u<id>") e entra na própria consulta FTS (`owner:u42 AND ...`): o filtro por tenant
+é uma interseção de listas invertidas, não uma varredura das campanhas de todos os usuários.
+A indexação é incremental, na mesma transação que grava a campanha; `rebuild` reconstrói tudo.
+O ranking (bm25) considera todas as campanhas do usuário que casam com a busca.
+
+Fora do SQLite (sem FTS5) a busca cai para LIKE em objetivo/público-alvo.
+
+CLI:
+    python -m maestroia.services.campaign_search rebuild
+"""
+import argparse
+import base64
+import json
+import re
+import unicodedata
+from typing import Optional
+
+from sqlalchemy import or_, text
+from sqlalchemy.orm import Session
+
+from maestroia.config import settings
+from maestroia.core.database import Campaign, SessionLocal, engine, init_db
+from maestroia.services import result_store
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+MAX_TERMS = 16
+INDEXED_SECTIONS = ("pesquisa", "estrategia", "conteudos")
+# Pesos do bm25 na ordem das colunas: owner, objetivo, publico_alvo, pesquisa, estrategia, conteudos
+_WEIGHTS = "0.0, 10.0, 5.0, 1.0, 2.0, 1.0"
+_CONTENT_COLUMNS = "{objetivo publico_alvo pesquisa estrategia conteudos}"
+_TERM = re.compile(r"\w+", re.UNICODE)
+SNIPPET_TOKENS = 16
+
+
+class InvalidSearch(ValueError):
+    """Consulta vazia ou cursor inválido."""
+
+
+def fts_available(bind=engine) -> bool:
+    return bind.dialect.name == "sqlite"
+
+
+def create_index(bind=engine):
+    """Cria campaigns_fts (a migração 0003 faz o mesmo; usado nos testes com banco em memória)."""
+    if not fts_available(bind):
+        return
+    with bind.begin() as conn:
+        conn.execute(text(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS campaigns_fts USING fts5("
+            "owner, objetivo, publico_alvo, pesquisa, estrategia, conteudos, "
+            "content = '', tokenize = 'unicode61 remove_diacritics 2')"
+        ))
+
+
+def _flatten(value) -> str:
+    """Texto pesquisável de uma seção do resultado (str, lista ou dict aninhados)."""
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, dict):
+        return "\n".join(_flatten(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return "\n".join(_flatten(v) for v in value)
+    return str(value)
+
+
+def index_campaign(db: Session, campaign_id: int, user_id: int, objetivo: str, publico_alvo: str,
+                   result: Optional[dict]):
+    """Indexa uma campanha nova; roda na transação de quem grava, sem commit.
+
+    Índice contentless não apaga linhas avulsas: reindexar é com `rebuild`.
+    """
+    if not fts_available(db.get_bind()):
+        return
+    result = result or {}
+    db.execute(
+        text(
+            "INSERT INTO campaigns_fts (rowid, owner, objetivo, publico_alvo, pesquisa, estrategia, conteudos) "
+            "VALUES (:id, :owner, :objetivo, :publico_alvo, :pesquisa, :estrategia, :conteudos)"
+        ),
+        {
+            "id": campaign_id,
+            "owner": f"u{user_id}",
+            "objetivo": objetivo or "",
+            "publico_alvo": publico_alvo or "",
+            **{section: _flatten(result.get(section)) for section in INDEXED_SECTIONS},
+        },
+    )
+
+
+def _fold(value: str) -> str:
+    """Minúsculas sem acentos, como o tokenizer unicode61 com remove_diacritics."""
+    decomposed = unicodedata.normalize("NFKD", value.lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def _terms(query: str) -> list:
+    terms = [_fold(t) for t in _TERM.findall(query)][:MAX_TERMS]
+    if not terms:
+        raise InvalidSearch("informe ao menos um termo de busca")
+    return terms
+
+
+def _match_expression(terms: list, user_id: int) -> str:
+    """Termos -> expressão FTS5 segura: cada termo entre aspas, o último como prefixo."""
+    quoted = [f'"{t}"' for t in terms]
+    quoted[-1] += "*"
+    return f'owner:"u{int(user_id)}" AND {_CONTENT_COLUMNS}: ({" ".join(quoted)})'
+
+
+def _snippet(texts: list, terms: list) -> str:
+    """Trecho em torno do primeiro acerto, com os termos entre [ ]; mesma regra de casamento da busca."""
+    exact, prefix = set(terms[:-1]), terms[-1]
+
+    def hit(token: str) -> bool:
+        folded = _fold(token)
+        return folded in exact or folded.startswith(prefix)
+
+    for content in texts:
+        tokens = list(_TERM.finditer(content or ""))
+        first = next((i for i, t in enumerate(tokens) if hit(t.group())), None)
+        if first is None:
+            continue
+        start = max(0, first - SNIPPET_TOKENS // 4)
+        end = min(len(tokens), start + SNIPPET_TOKENS)
+        out, pos = ["…"] if start else [], tokens[start].start()
+        for token in tokens[start:end]:
+            out.append(content[pos:token.start()])
+            out.append(f"[{token.group()}]" if hit(token.group()) else token.group())
+            pos = token.end()
+        if end < len(tokens):
+            out.append("…")
+        return " ".join("".join(out).split())
+    return next((" ".join(t.split()[:SNIPPET_TOKENS]) for t in texts if t), "")
+
+
+def _encode_offset(offset: int) -> str:
+    return base64.urlsafe_b64encode(f"o{offset}".encode()).decode().rstrip("=")
+
+
+def _decode_offset(cursor: Optional[str]) -> int:
+    if not cursor:
+        return 0
+    try:
+        raw = base64.urlsafe_b64decode((cursor + "=" * (-len(cursor) % 4)).encode()).decode()
+        if not raw.startswith("o"):
+            raise ValueError(raw)
+        return max(0, int(raw[1:]))
+    except (ValueError, UnicodeDecodeError):
+        raise InvalidSearch("cursor inválido")
+
+
+def search(db: Session, user_id: int, query: str, limit: int = DEFAULT_LIMIT,
+           cursor: Optional[str] = None) -> dict:
+    """Campanhas do usuário que casam com `query`, mais relevantes primeiro, com trecho destacado."""
+    limit = max(1, min(limit, MAX_LIMIT))
+    offset = _decode_offset(cursor)
+    terms = _terms(query)
+    if not fts_available(db.get_bind()):
+        return _search_like(db, user_id, terms, limit, offset)
+
+    match = _match_expression(terms, user_id)
+    # Ranking dentro do FTS: bm25 de todas as campanhas que casam, só a página sai da consulta
+    ranked = db.execute(
+        text(f"SELECT rowid AS id, bm25(campaigns_fts, {_WEIGHTS}) AS score FROM campaigns_fts "
+             "WHERE campaigns_fts MATCH :match ORDER BY score LIMIT :limit OFFSET :offset"),
+        {"match": match, "limit": limit + 1, "offset": offset},
+    ).all()
+    page = ranked[:limit]
+    campaigns = {}
+    if page:
+        campaigns = {
+            c.id: c for c in db.query(Campaign).filter(Campaign.id.in_([int(r.id) for r in page]),
+                                                       Campaign.user_id == user_id)
+        }
+    results = []
+    for hit in page:
+        c = campaigns.get(hit.id)
+        if c is None:
+            continue
+        # Índice contentless: o texto do trecho vem do resultado comprimido, só para a página
+        result = _load_sections(db, c)
+        texts = [c.objetivo, c.publico_alvo] + [_flatten(result.get(s)) for s in ("estrategia", "pesquisa", "conteudos")]
+        results.append({
+            "id": c.id,
+            "objetivo": c.objetivo,
+            "publico_alvo": c.publico_alvo,
+            "canais": c.canais.split(",") if c.canais else [],
+            "trecho": _snippet(texts, terms),
+            "score": round(-hit.score, 4),  # bm25 do SQLite: menor é melhor
+        })
+    return {"results": results, "next_cursor": _encode_offset(offset + limit) if len(ranked) > limit else None}
+
+
+def _load_sections(db: Session, campaign: Campaign) -> dict:
+    """Seções indexadas do resultado: do `result_store` ou, em linhas legadas, do JSON inline."""
+    if campaign.resultado_ref:
+        return result_store.load_result(db, campaign.resultado_ref, INDEXED_SECTIONS) or {}
+    return json.loads(campaign.resultado) if campaign.resultado else {}
+
+
+def _search_like(db: Session, user_id: int, terms: list, limit: int, offset: int) -> dict:
+    q = db.query(Campaign.id, Campaign.objetivo, Campaign.publico_alvo, Campaign.canais).filter(
+        Campaign.user_id == user_id
+    )
+    for term in terms:
+        pattern = f"%{term}%"
+        q = q.filter(or_(Campaign.objetivo.ilike(pattern), Campaign.publico_alvo.ilike(pattern)))
+    rows = q.order_by(Campaign.id.desc()).offset(offset).limit(limit + 1).all()
+    page = rows[:limit]
+    return {
+        "results": [
+            {"id": r.id, "objetivo": r.objetivo, "publico_alvo": r.publico_alvo,
+             "canais": r.canais.split(",") if r.canais else [], "trecho": r.objetivo, "score": None}
+            for r in page
+        ],
+        "next_cursor": _encode_offset(offset + limit) if len(rows) > limit else None,
+    }
+
+
+def rebuild(session_factory=SessionLocal, batch_size: int = 200) -> int:
+    """Reconstrói o índice a partir de `campaigns` (inclusive linhas legadas)."""
+    db = session_factory()
+    try:
+        if not fts_available(db.get_bind()):
+            return 0
+        db.execute(text("INSERT INTO campaigns_fts (campaigns_fts) VALUES ('delete-all')"))
+        total, last_id = 0, 0
+        while True:
+            rows = (
+                db.query(Campaign).filter(Campaign.id > last_id).order_by(Campaign.id).limit(batch_size).all()
+            )
+            if not rows:
+                break
+            for c in rows:
+                index_campaign(db, c.id, c.user_id, c.objetivo, c.publico_alvo, _load_sections(db, c))
+            total += len(rows)
+            last_id = rows[-1].id
+        db.execute(text("INSERT INTO campaigns_fts (campaigns_fts) VALUES ('optimize')"))
+        db.commit()
+        return total
+    finally:
+        db.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Índice de busca das campanhas")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    sub.add_parser("rebuild", help="reconstrói campaigns_fts a partir de campaigns")
+    args = parser.parse_args(argv)
+    init_db()
+    if args.comando == "rebuild":
+        print(f"{rebuild()} campanhas indexadas")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,44 +1,127 @@
-from decimal import Decimal
+"""Razão em partidas dobradas: cada transação grava seus lançamentos e ajusta os saldos.
+
+O lançamento custa um número fixo de idas ao banco, qualquer que seja a quantidade de
+postings: tudo é validado antes de escrever (valores e fechamento débito = crédito), as
+carteiras envolvidas são lidas e travadas numa única consulta em ordem de id (a mesma ordem
+para todas as transações, o que evita deadlock entre duas que tocam as mesmas carteiras no
+Postgres) e os saldos mudam num único UPDATE relativo (`balance = balance + delta`).
+`post_transactions` faz o mesmo para um lote inteiro (usado pelo `ledger_writer`).
+"""
+import uuid
+from collections import defaultdict
+from decimal import Decimal, InvalidOperation
+
+from sqlalchemy import case, insert, select, update
+from sqlalchemy.orm import Session
+
 from maestroia.core.database import SessionLocal
 from maestroia.models.finance import Transaction, Entry, Wallet
-from sqlalchemy.orm import Session
-import uuid
 
 
-def create_transaction(description: str, postings: list, metadata: dict = None) -> dict:
+class LedgerError(ValueError):
+    """Transação inválida: não fecha, valor inválido ou carteira inexistente."""
+
+
+def validate_postings(postings: list) -> tuple:
+    """(postings normalizados, variação de saldo por carteira); nada é lido do banco.
+
+    postings: list of dict {wallet_id, amount (Decimal), is_debit (bool)}
+    """
+    if not postings:
+        raise LedgerError("Transaction has no postings")
+    normalized, deltas, total = [], defaultdict(Decimal), Decimal('0')
+    for p in postings:
+        try:
+            amt = Decimal(str(p['amount']))
+            wallet_id = int(p['wallet_id'])
+        except (KeyError, TypeError, ValueError, InvalidOperation):
+            raise LedgerError(f"Invalid posting: {p!r}")
+        if not amt.is_finite() or amt <= 0:
+            raise LedgerError(f"Invalid amount: {p['amount']!r}")
+        is_debit = bool(p.get('is_debit', False))
+        total += amt if is_debit else -amt
+        # debit reduces balance
+        deltas[wallet_id] += -amt if is_debit else amt
+        normalized.append({"wallet_id": wallet_id, "amount": amt, "is_debit": is_debit})
+    if total != 0:
+        raise LedgerError("Transaction not balanced")
+    return normalized, dict(deltas)
+
+
+def lock_wallets_statement(wallet_ids):
+    # Ordem canônica (id): duas transações nunca esperam uma pela outra em ordens opostas
+    return select(Wallet.id).where(Wallet.id.in_(sorted(wallet_ids))).order_by(Wallet.id).with_for_update()
+
+
+def post_transactions(db: Session, transactions: list) -> list:
+    """Grava várias transações (description, postings, metadata) na sessão de quem chama, sem commit.
+
+    Cada uma é validada sozinha; o lote inteiro custa quatro comandos: trava das carteiras,
+    INSERT das transações, INSERT dos lançamentos e um UPDATE com a soma das variações de
+    saldo. Retorna, na ordem, o id de cada transação gravada ou a LedgerError que a recusou.
+    """
+    results, accepted = [], []
+    for description, postings, metadata in transactions:
+        try:
+            normalized, deltas = validate_postings(postings)
+        except LedgerError as e:
+            results.append(e)
+        else:
+            results.append(None)
+            accepted.append((len(results) - 1, description, metadata, normalized, deltas))
+    wallet_ids = set().union(*(deltas for *_, deltas in accepted))
+    found = set(db.execute(lock_wallets_statement(wallet_ids)).scalars()) if wallet_ids else set()
+
+    valid = []
+    for item in accepted:
+        missing = sorted(set(item[4]) - found)
+        if missing:
+            results[item[0]] = LedgerError(f"Wallet {missing[0]} not found")
+        else:
+            valid.append(item)
+    if not valid:
+        return results
+
+    ids = db.execute(
+        insert(Transaction).returning(Transaction.id, sort_by_parameter_order=True),
+        [{"reference": str(uuid.uuid4()), "description": description, "meta": metadata}
+         for _, description, metadata, _, _ in valid],
+    ).scalars().all()
+    entries, totals = [], defaultdict(Decimal)
+    for tx_id, (index, _, _, normalized, deltas) in zip(ids, valid):
+        results[index] = tx_id
+        entries.extend({"transaction_id": tx_id, **p} for p in normalized)
+        for wallet_id, delta in deltas.items():
+            totals[wallet_id] += delta
+    db.execute(insert(Entry), entries)
+    db.execute(
+        update(Wallet)
+        .where(Wallet.id.in_(sorted(totals)))
+        .values(balance=Wallet.balance + case(dict(totals), value=Wallet.id))
+        .execution_options(synchronize_session=False)
+    )
+    return results
+
+
+def post_transaction(db: Session, description: str, postings: list, metadata: dict = None) -> int:
+    """Grava uma transação na sessão de quem chama, sem commit; retorna o id ou levanta LedgerError."""
+    result = post_transactions(db, [(description, postings, metadata)])[0]
+    if isinstance(result, LedgerError):
+        raise result
+    return result
+
+
+def create_transaction(description: str, postings: list, metadata: dict = None,
+                       session_factory=SessionLocal) -> dict:
     """Create a transaction with double-entry postings.
 
     postings: list of dict {wallet_id, amount (Decimal), is_debit (bool)}
     """
-    db: Session = SessionLocal()
+    db: Session = session_factory()
     try:
-        tx = Transaction(reference=str(uuid.uuid4()), description=description, metadata=metadata)
-        db.add(tx)
-        db.flush()
-
-        total = Decimal('0')
-        for p in postings:
-            amt = Decimal(p['amount'])
-            total += amt if p.get('is_debit', False) else -amt
-            entry = Entry(transaction_id=tx.id, wallet_id=p['wallet_id'], amount=amt, is_debit=p.get('is_debit', False))
-            db.add(entry)
-            # update wallet balance
-            wallet = db.query(Wallet).filter(Wallet.id == p['wallet_id']).with_for_update().first()
-            if not wallet:
-                db.rollback()
-                return {"status": "error", "message": f"Wallet {p['wallet_id']} not found"}
-            # debit reduces balance
-            if p.get('is_debit', False):
-                wallet.balance = wallet.balance - amt
-            else:
-                wallet.balance = wallet.balance + amt
-
-        if total != 0:
-            db.rollback()
-            return {"status": "error", "message": "Transaction not balanced"}
-
+        tx_id = post_transaction(db, description, postings, metadata)
         db.commit()
-        return {"status": "ok", "transaction_id": tx.id}
+        return {"status": "ok", "transaction_id": tx_id}
     except Exception as e:
         db.rollback()
         return {"status": "error", "message": str(e)}
@@ -0,0 +1,162 @@
+"""Gravação do razão em lote, com commit em grupo.
+
+`create_transaction` abre uma sessão e faz um commit (um fsync) por transação: cobrança por
+uso (por campanha, por token do LLM) gera muitas transações pequenas e o disco vira o
+gargalo. O `LedgerBatchWriter` enfileira as transações e uma thread as grava em grupos, com
+um commit a cada LEDGER_BATCH_MAX_SIZE transações ou LEDGER_BATCH_MAX_DELAY_MS, o que vier
+antes. Cada transação continua validada sozinha (valores, débito = crédito, carteiras
+existentes) e tem o seu Future: uma transação inválida falha sem derrubar o lote.
+
+O lote vai para `ledger.post_transactions`: carteiras travadas numa única consulta em ordem
+de id e um número fixo de comandos por lote, não por transação. Se o commit do grupo falhar
+por erro de banco, as transações do lote são refeitas uma a uma, para que só a culpada falhe.
+"""
+import atexit
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Optional
+
+from maestroia.config import settings
+from maestroia.core import metrics
+from maestroia.core.database import SessionLocal
+from maestroia.services import ledger
+
+_STOP = object()
+
+
+class LedgerWriterSaturated(Exception):
+    """Fila do gravador cheia (LEDGER_BATCH_MAX_PENDING transações aguardando)."""
+
+
+class _Pending:
+    __slots__ = ("description", "postings", "metadata", "future")
+
+    def __init__(self, description, postings, metadata):
+        self.description = description
+        self.postings = postings
+        self.metadata = metadata
+        self.future = Future()
+
+
+class LedgerBatchWriter:
+    def __init__(self, session_factory=SessionLocal, max_batch: Optional[int] = None,
+                 max_delay_ms: Optional[float] = None, max_pending: Optional[int] = None):
+        self.session_factory = session_factory
+        self.max_batch = max_batch or settings.LEDGER_BATCH_MAX_SIZE
+        self.max_delay = (settings.LEDGER_BATCH_MAX_DELAY_MS if max_delay_ms is None else max_delay_ms) / 1000
+        self.max_pending = settings.LEDGER_BATCH_MAX_PENDING if max_pending is None else max_pending
+        self._queue = queue.Queue(maxsize=self.max_pending)
+        self._lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._loop, name="ledger-writer", daemon=True)
+        self._thread.start()
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def submit(self, description: str, postings: list, metadata: dict = None) -> Future:
+        """Enfileira a transação; o Future resolve com o mesmo dict de `ledger.create_transaction`.
+
+        Transações que não fecham falham na hora, sem entrar na fila. Levanta
+        `LedgerWriterSaturated` com a fila cheia.
+        """
+        try:
+            ledger.validate_postings(postings)
+        except ledger.LedgerError as e:
+            future = Future()
+            future.set_result({"status": "error", "message": str(e)})
+            return future
+        item = _Pending(description, postings, metadata)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("LedgerBatchWriter encerrado")
+            try:
+                self._queue.put_nowait(item)
+            except queue.Full:
+                raise LedgerWriterSaturated(f"{self.max_pending} transações aguardando gravação")
+        return item.future
+
+    def post(self, description: str, postings: list, metadata: dict = None,
+             timeout: Optional[float] = None) -> dict:
+        """Versão síncrona de `submit`: espera o commit do lote."""
+        return self.submit(description, postings, metadata).result(timeout)
+
+    def close(self, timeout: Optional[float] = None):
+        """Grava o que estiver na fila e encerra a thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _loop(self):
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            self._write(batch)
+
+    def _write(self, batch: list):
+        batch = [item for item in batch if item.future.set_running_or_notify_cancel()]  # canceladas não gravam
+        if not batch:
+            return
+        metrics.LEDGER_BATCH_SIZE.observe(len(batch))
+        try:
+            results = self._commit_group(batch)
+        except Exception:
+            # Erro de banco no meio do lote: refaz uma a uma, cada uma com o seu commit
+            results = [
+                ledger.create_transaction(i.description, i.postings, i.metadata, session_factory=self.session_factory)
+                for i in batch
+            ]
+        for item, result in zip(batch, results):
+            item.future.set_result(result)
+
+    def _commit_group(self, batch: list) -> list:
+        db = self.session_factory()
+        try:
+            outcomes = ledger.post_transactions(db, [(i.description, i.postings, i.metadata) for i in batch])
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        # Recusadas na validação não chegaram a escrever nada: o resto do lote vale
+        return [
+            {"status": "error", "message": str(o)} if isinstance(o, ledger.LedgerError)
+            else {"status": "ok", "transaction_id": o}
+            for o in outcomes
+        ]
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_ledger_writer() -> LedgerBatchWriter:
+    """Gravador do processo; a fila é gravada antes de o interpretador sair."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = LedgerBatchWriter()
+            writer = _writer
+            atexit.register(writer.close)
+            metrics.QUEUE_DEPTH.set_function(lambda: writer.pending, queue="razao")
+        return _writer
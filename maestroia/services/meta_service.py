@@ -17,7 +17,7 @@ def exchange_code_for_token(code: str, redirect_uri: str) -> dict:
         return {"status": "fallback", "message": "META_APP_ID ou META_APP_SECRET não configurado"}
 
     token_url = (
-        f"https://graph.facebook.com/v16.0/oauth/access_token?client_id={app_id}"
+        f"{settings.META_GRAPH_URL}/v16.0/oauth/access_token?client_id={app_id}"
         f"&redirect_uri={redirect_uri}&client_secret={app_secret}&code={code}"
     )
     try:
@@ -1,10 +1,27 @@
+import time
 from typing import Optional
 from maestroia.config import settings
+from maestroia.core import metrics, tracing
 
 try:
     import openai
+except ImportError:
+    openai = None
+
+try:
     _provider = getattr(settings, "LLM_PROVIDER", "openai")
-    if _provider == "groq":
+    if _provider == "fake":
+        if settings.FAKE_LLM_URL:
+            client = openai.OpenAI(api_key="fake", base_url=settings.FAKE_LLM_URL)
+        else:
+            from maestroia.devtools.fake_llm import FakeLLM, FakeOpenAIClient
+            client = FakeOpenAIClient(FakeLLM(
+                latency_ms=settings.FAKE_LLM_LATENCY_MS,
+                jitter_ms=settings.FAKE_LLM_LATENCY_JITTER_MS,
+                completion_tokens=settings.FAKE_LLM_COMPLETION_TOKENS,
+                embedding_dim=settings.DEFAULT_EMBEDDING_DIM,
+            ))
+    elif _provider == "groq":
         client = openai.OpenAI(
             api_key=settings.GROQ_API_KEY,
             base_url=settings.GROQ_BASE_URL,
@@ -12,9 +29,15 @@ try:
     else:
         client = openai.OpenAI(api_key=settings.OPENAI_API_KEY) if settings.OPENAI_API_KEY else None
 except Exception:
-    openai = None
     client = None
 
+FALLBACK_PREFIX = "[FALLBACK"
+
+
+def is_fallback(text) -> bool:
+    """True para o texto de aviso que `chat` devolve quando o LLM falha (não é uma resposta)."""
+    return isinstance(text, str) and text.startswith(FALLBACK_PREFIX)
+
 
 def chat(prompt: str, model: Optional[str] = None, temperature: Optional[float] = None) -> str:
     """Enviar prompt para OpenAI (ChatCompletion). Retorna texto da resposta.
@@ -24,49 +47,71 @@ def chat(prompt: str, model: Optional[str] = None, temperature: Optional[float]
     model = model or settings.DEFAULT_LLM_MODEL
     temperature = temperature if temperature is not None else settings.DEFAULT_TEMPERATURE
     provider = getattr(settings, "LLM_PROVIDER", "openai")
-    try:
-        if not client:
-            raise RuntimeError(f"Cliente {provider.upper()} não inicializado")
+    with tracing.span("llm.chat", provider=provider, model=model) as span:
+        try:
+            if not client:
+                raise RuntimeError(f"Cliente {provider.upper()} não inicializado")
 
-        resp = client.chat.completions.create(
-            model=model,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=temperature,
-        )
-        return resp.choices[0].message.content
-    except Exception as e:
-        # Fallback: retornar prompt ecoado com aviso para ambiente de dev
-        label = "GROQ" if provider == "groq" else "OPENAI"
-        return f"[FALLBACK {label}] Não foi possível contatar {label}: {e}. Prompt: {prompt[:500]}"
+            inicio = time.perf_counter()
+            resp = client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=temperature,
+            )
+            metrics.LLM_LATENCY.observe(time.perf_counter() - inicio, provider=provider, model=model, kind="chat")
+            usage = getattr(resp, "usage", None)
+            if usage is not None:
+                prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+                completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+                metrics.LLM_TOKENS.inc(prompt_tokens, provider=provider, model=model, type="prompt")
+                metrics.LLM_TOKENS.inc(completion_tokens, provider=provider, model=model, type="completion")
+                if span is not None:
+                    span.set_attribute("prompt_tokens", prompt_tokens)
+                    span.set_attribute("completion_tokens", completion_tokens)
+            return resp.choices[0].message.content
+        except Exception as e:
+            metrics.LLM_FALLBACKS.inc(provider=provider, kind="chat")
+            tracing.set_attribute("fallback", True)
+            # Fallback: retornar prompt ecoado com aviso para ambiente de dev
+            label = "GROQ" if provider == "groq" else "OPENAI"
+            return f"{FALLBACK_PREFIX} {label}] Não foi possível contatar {label}: {e}. Prompt: {prompt[:500]}"
 
 
+@tracing.traced("llm.image")
 def generate_image(prompt: str, n: int = 1, size: str = "1024x1024") -> Optional[list]:
     try:
         if not client:
             raise RuntimeError("Cliente OpenAI não inicializado")
-        img_resp = client.images.generate(
-            prompt=prompt,
-            n=n,
-            size=size
-        )
+        with metrics.LLM_LATENCY.time(provider=settings.LLM_PROVIDER, model="image", kind="image"):
+            img_resp = client.images.generate(
+                prompt=prompt,
+                n=n,
+                size=size
+            )
         urls = [d.url for d in img_resp.data]
         return urls
     except Exception:
+        metrics.LLM_FALLBACKS.inc(provider=settings.LLM_PROVIDER, kind="image")
+        tracing.set_attribute("fallback", True)
         return None
 
 
+@tracing.traced("llm.embedding")
 def get_embedding(text: str) -> list:
     """Retorna embedding para `text`. Usa OpenAI Embeddings quando disponível; senão retorna vetor aleatório."""
     try:
-        _ensure_api_key()
-        if not openai:
-            raise RuntimeError("Biblioteca openai não encontrada")
+        if not client:
+            raise RuntimeError("Cliente OpenAI não inicializado")
         model = getattr(settings, 'DEFAULT_EMBEDDING_MODEL', 'text-embedding-3-small')
-        resp = openai.Embedding.create(model=model, input=text)
+        tracing.set_attribute("model", model)
+        with metrics.LLM_LATENCY.time(provider=settings.LLM_PROVIDER, model=model, kind="embedding"):
+            resp = client.embeddings.create(model=model, input=text)
         # A resposta pode variar de formato; compatibilizar com list de floats
         emb = resp.data[0].embedding
         return emb
     except Exception:
+        metrics.LLM_FALLBACKS.inc(provider=settings.LLM_PROVIDER, kind="embedding")
+        tracing.set_attribute("fallback", True)
         # fallback: vetor aleatório determinístico (hash) para estabilidade
         import hashlib
         import struct
@@ -0,0 +1,353 @@
+"""Outbox de publicações com entrega idempotente em background.
+
+`enqueue_publications` grava cada publicação (campanha, canal, hash do conteúdo) numa única
+transação e retorna imediatamente; o `OutboxDispatcher` entrega as pendentes pelo registro
+de publicadores, com retry e backoff exponencial para erros transitórios. A chave de
+idempotência impede que um novo processamento da mesma campanha publique em dobro.
+"""
+import hashlib
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy.exc import IntegrityError
+
+from maestroia.config import settings
+from maestroia.core import metrics, tracing
+from maestroia.core.database import SessionLocal
+from maestroia.models.publishing import PublishOutbox
+from maestroia.services.publishers import get_publisher, PublishError
+from maestroia.services.rate_limits import get_bucket
+
+
+def pending_count(session_factory=SessionLocal) -> int:
+    db = session_factory()
+    try:
+        return db.query(PublishOutbox).filter(PublishOutbox.status.in_(("pending", "sending"))).count()
+    finally:
+        db.close()
+
+
+metrics.QUEUE_DEPTH.set_function(pending_count, queue="outbox")
+
+
+def content_hash(conteudo: str) -> str:
+    return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+
+
+def idempotency_key(campaign_key: str, canal: str, chash: str) -> str:
+    raw = f"{campaign_key}|{canal.lower()}|{chash}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def campaign_key_for(state: dict) -> str:
+    """Identificador da campanha: `campanha_id` do estado ou hash das entradas.
+
+    Quem dispara uma execução passa um `campanha_id` por execução (API: X-Request-ID; bulk:
+    job + linha; Streamlit: um id por clique): repetir a mesma execução não duplica posts, e
+    uma nova execução com as mesmas entradas publica de novo. Sem `campanha_id`, entradas
+    idênticas geram a mesma chave e só publicam uma vez. A chave sempre leva o tenant: o mesmo
+    `campanha_id` em dois tenants são campanhas diferentes.
+    """
+    tenant = str(state.get("tenant_id") or "")
+    if state.get("campanha_id"):
+        return f"{tenant}:{state['campanha_id']}"
+    raw = "|".join([
+        tenant,
+        str(state.get("objetivo", "")),
+        str(state.get("publico_alvo", "")),
+        ",".join(state.get("canais", [])),
+    ])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def enqueue_publications(campaign_key: str, items: list, session_factory=SessionLocal) -> list:
+    """Grava publicações [(canal, conteudo)] no outbox numa única transação.
+
+    Retorna [{"canal", "id", "status", "nova"}]; itens já enfileirados antes
+    (mesma chave de idempotência) não são duplicados.
+    """
+    keyed = []
+    for canal, conteudo in items:
+        chash = content_hash(conteudo)
+        keyed.append((canal, conteudo, chash, idempotency_key(campaign_key, canal, chash)))
+
+    db = session_factory()
+    try:
+        try:
+            rows = _add_missing(db, campaign_key, keyed)
+            db.commit()
+        except IntegrityError:
+            # Outra execução gravou a mesma chave entre a leitura e o commit: já está enfileirada
+            db.rollback()
+            rows = _add_missing(db, campaign_key, keyed)
+            db.commit()
+        return [{"canal": canal, "id": row.id, "status": row.status, "nova": nova} for canal, row, nova in rows]
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def _add_missing(db, campaign_key: str, keyed: list) -> list:
+    existing = {
+        row.idempotency_key: row
+        for row in db.query(PublishOutbox).filter(
+            PublishOutbox.idempotency_key.in_([k for *_, k in keyed])
+        )
+    }
+    rows = []
+    for canal, conteudo, chash, key in keyed:
+        row = existing.get(key)
+        nova = row is None
+        if nova:
+            row = PublishOutbox(
+                idempotency_key=key,
+                campaign_key=campaign_key,
+                channel=canal,
+                content=conteudo,
+                content_hash=chash,
+                status="pending",
+                attempts=0,
+                next_attempt_at=datetime.utcnow(),
+            )
+            db.add(row)
+            existing[key] = row
+        rows.append((canal, row, nova))
+    db.flush()
+    return rows
+
+
+def outbox_status(campaign_key: str, session_factory=SessionLocal) -> list:
+    db = session_factory()
+    try:
+        rows = db.query(PublishOutbox).filter(PublishOutbox.campaign_key == campaign_key).order_by(PublishOutbox.id)
+        return [
+            {
+                "id": r.id,
+                "canal": r.channel,
+                "status": r.status,
+                "tentativas": r.attempts,
+                "resultado": r.result,
+                "erro": r.last_error,
+            }
+            for r in rows
+        ]
+    finally:
+        db.close()
+
+
+class OutboxDispatcher:
+    """Entrega publicações pendentes do outbox em background.
+
+    Cada ciclo reivindica (pending -> sending) as linhas vencidas, entrega em paralelo e grava
+    o status final. Erros transitórios voltam para `pending` com backoff exponencial e jitter;
+    após OUTBOX_MAX_ATTEMPTS a publicação fica `failed`. Linhas presas em `sending` (processo
+    morto ou travado no meio da entrega) voltam para a fila após OUTBOX_LEASE_SECONDS, contando
+    uma tentativa: um post que sempre derruba o worker também chega a `failed`.
+    """
+
+    def __init__(self, session_factory=SessionLocal, batch_size: Optional[int] = None):
+        self.session_factory = session_factory
+        self.batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+        self._executor = ThreadPoolExecutor(max_workers=settings.PUBLISH_MAX_WORKERS, thread_name_prefix="outbox")
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="outbox-dispatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def wake(self):
+        self._wake.set()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                processed = self.run_once()
+            except Exception as e:
+                # Banco fora do ar etc.: o laço continua, mas a falha aparece no /metrics
+                metrics.BACKGROUND_ERRORS.inc(worker="outbox", exception=type(e).__name__)
+                processed = 0
+            if processed == 0:
+                self._wake.wait(settings.OUTBOX_POLL_SECONDS)
+                self._wake.clear()
+
+    def _claim_due(self) -> list:
+        now = datetime.utcnow()
+        db = self.session_factory()
+        try:
+            lease_expired = now - timedelta(seconds=settings.OUTBOX_LEASE_SECONDS)
+            expirado = (PublishOutbox.status == "sending", PublishOutbox.updated_at < lease_expired)
+            reclaim = {"attempts": PublishOutbox.attempts + 1, "updated_at": now,
+                       "last_error": "lease expirado durante a entrega"}
+            db.query(PublishOutbox).filter(
+                *expirado, PublishOutbox.attempts + 1 >= settings.OUTBOX_MAX_ATTEMPTS
+            ).update({**reclaim, "status": "failed"}, synchronize_session=False)
+            db.query(PublishOutbox).filter(*expirado).update(
+                {**reclaim, "status": "pending"}, synchronize_session=False
+            )
+
+            due = (
+                db.query(PublishOutbox.id)
+                .filter(PublishOutbox.status == "pending", PublishOutbox.next_attempt_at <= now)
+                .order_by(PublishOutbox.next_attempt_at)
+                .limit(self.batch_size)
+                .all()
+            )
+            claimed = []
+            for (row_id,) in due:
+                # UPDATE condicional: só um dispatcher consegue reivindicar cada linha
+                updated = db.query(PublishOutbox).filter(
+                    PublishOutbox.id == row_id, PublishOutbox.status == "pending"
+                ).update({"status": "sending", "updated_at": now}, synchronize_session=False)
+                if updated:
+                    claimed.append(row_id)
+            db.commit()
+            if not claimed:
+                return []
+            rows = db.query(PublishOutbox).filter(PublishOutbox.id.in_(claimed)).all()
+            return [(r.id, r.channel, r.content, r.attempts) for r in rows]
+        finally:
+            db.close()
+
+    def run_once(self) -> int:
+        """Processa um lote de publicações vencidas. Retorna quantas foram processadas.
+
+        As linhas são agrupadas por canal: cada grupo consome fichas do balde de taxa da
+        (plataforma, credencial), o excedente é reagendado para quando houver fichas e,
+        se a plataforma aceita lotes, os posts liberados seguem numa única requisição.
+        """
+        claimed = self._claim_due()
+        grupos = {}
+        for item in claimed:
+            grupos.setdefault(item[1].lower(), []).append(item)
+
+        futures = []
+        for canal, items in grupos.items():
+            publisher = get_publisher(canal)
+            if publisher is None or not publisher.is_configured():
+                # Sem chamada à plataforma: não consome limite de taxa
+                futures += [self._executor.submit(self._deliver, *item) for item in items]
+                continue
+            bucket = get_bucket(publisher.name, publisher.credential())
+            liberados = bucket.take_up_to(len(items))
+            if liberados < len(items):
+                self._defer(items[liberados:], bucket)
+            items = items[:liberados]
+            if publisher.capabilities.batch:
+                tamanho = publisher.capabilities.max_batch_size
+                for i in range(0, len(items), tamanho):
+                    futures.append(self._executor.submit(self._deliver_batch, publisher, items[i:i + tamanho]))
+            else:
+                futures += [self._executor.submit(self._deliver, *item) for item in items]
+
+        for future in futures:
+            future.result()
+        return len(claimed)
+
+    def _deliver(self, row_id: int, canal: str, conteudo: str, attempts: int):
+        with tracing.trace("publicacao.outbox", canal=canal, outbox_id=row_id, tentativa=attempts + 1):
+            self._deliver_traced(row_id, canal, conteudo, attempts)
+
+    def _deliver_traced(self, row_id: int, canal: str, conteudo: str, attempts: int):
+        publisher = get_publisher(canal)
+        try:
+            if publisher is None:
+                raise PublishError(f"Publicação em {canal} não suportada ainda.", retryable=False)
+            if not publisher.is_configured():
+                update = {"attempts": attempts + 1, "status": "skipped",
+                          "result": publisher.setup_instructions(conteudo, canal)}
+            else:
+                update = self._outcome(attempts, publisher.publish(conteudo, canal))
+        except Exception as e:
+            update = self._outcome(attempts, e)
+        tracing.set_attribute("status", update["status"])
+        self._record(row_id, update)
+
+    def _deliver_batch(self, publisher, items: list):
+        canal = items[0][1]
+        with tracing.trace("publicacao.outbox.lote", canal=canal, plataforma=publisher.name, itens=len(items)):
+            try:
+                resultados = publisher.publish_batch([conteudo for _, _, conteudo, _ in items], canal)
+            except Exception as e:
+                resultados = [e] * len(items)
+        # Item sem resultado não pode ficar preso em `sending` até o lease expirar
+        faltando = PublishError(f"{publisher.name} não retornou resultado para o item do lote")
+        resultados = list(resultados) + [faltando] * (len(items) - len(resultados))
+        for (row_id, _, _, attempts), resultado in zip(items, resultados):
+            self._record(row_id, self._outcome(attempts, resultado))
+
+    def _outcome(self, attempts: int, resultado) -> dict:
+        """Status final ou retry de uma entrega (`resultado` é a mensagem ou a exceção)."""
+        update = {"attempts": attempts + 1}
+        if not isinstance(resultado, Exception):
+            update.update(status="sent", result=resultado, last_error=None)
+            return update
+        update["last_error"] = str(resultado)
+        if getattr(resultado, "retryable", True) and attempts + 1 < settings.OUTBOX_MAX_ATTEMPTS:
+            update.update(status="pending", next_attempt_at=datetime.utcnow() + self._backoff(attempts + 1))
+        else:
+            update["status"] = "failed"
+        return update
+
+    def _defer(self, items: list, bucket):
+        """Devolve à fila, espaçados pela taxa sustentável, os posts sem ficha disponível."""
+        now = datetime.utcnow()
+        db = self.session_factory()
+        try:
+            for posicao, (row_id, *_rest) in enumerate(items, 1):
+                db.query(PublishOutbox).filter(PublishOutbox.id == row_id).update(
+                    {
+                        "status": "pending",
+                        "next_attempt_at": now + timedelta(seconds=bucket.wait_time(posicao)),
+                        "updated_at": now,
+                    },
+                    synchronize_session=False,
+                )
+            db.commit()
+        finally:
+            db.close()
+
+    @staticmethod
+    def _backoff(attempt: int) -> timedelta:
+        base = settings.OUTBOX_BACKOFF_SECONDS * (2 ** (attempt - 1))
+        return timedelta(seconds=min(base, settings.OUTBOX_MAX_BACKOFF_SECONDS) * random.uniform(0.8, 1.2))
+
+    def _record(self, row_id: int, update: dict):
+        db = self.session_factory()
+        try:
+            update["updated_at"] = datetime.utcnow()
+            db.query(PublishOutbox).filter(PublishOutbox.id == row_id).update(update, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher() -> OutboxDispatcher:
+    """Dispatcher do processo, iniciado na primeira chamada."""
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = OutboxDispatcher()
+            _dispatcher.start()
+            executor = _dispatcher._executor
+            metrics.QUEUE_DEPTH.set_function(lambda: metrics.executor_queue_depth(executor), queue="outbox_entregas")
+        return _dispatcher
@@ -0,0 +1,500 @@
+"""Registro de publicadores por plataforma.
+
+Cada plataforma é uma classe `Publisher` registrada com `@register_publisher`, que declara
+suas capacidades e mantém uma sessão HTTP de longa duração (pool de conexões + TLS
+reaproveitados entre publicações). Para adicionar uma plataforma basta registrar uma nova
+classe; `agente_publicador` encontra o publicador pelo nome do canal.
+"""
+import json
+import threading
+from dataclasses import dataclass
+from typing import Optional
+from urllib.parse import urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from maestroia.config import settings
+
+try:
+    import tweepy
+except ImportError:
+    tweepy = None
+
+
+class PublishError(Exception):
+    """Falha ao publicar. `retryable` indica erro transitório (rede, 429, 5xx)."""
+
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+@dataclass(frozen=True)
+class Capabilities:
+    batch: bool = False  # a plataforma aceita várias publicações numa única requisição
+    media: bool = False  # aceita imagem/vídeo junto do texto
+    max_batch_size: int = 1  # itens por requisição de lote
+    max_chars: Optional[int] = None
+    # Limites de taxa: tabela PLATFORM_RATE_LIMITS em services/rate_limits.py, pela chave `name`
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter com timeout padrão: requests.Session não tem timeout próprio."""
+
+    def __init__(self, *args, timeout: Optional[float] = None, **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
+
+def build_session(headers: Optional[dict] = None, session: Optional[requests.Session] = None) -> requests.Session:
+    """Sessão com pool dimensionado para o pool de publicação e timeout por plataforma."""
+    session = session or requests.Session()
+    adapter = TimeoutHTTPAdapter(
+        timeout=settings.PUBLISH_TIMEOUT_SECONDS,
+        pool_connections=4,
+        pool_maxsize=settings.PUBLISH_MAX_WORKERS,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if headers:
+        session.headers.update(headers)
+    return session
+
+
+def _response_error(platform: str, response) -> PublishError:
+    retryable = response.status_code == 429 or response.status_code >= 500
+    return PublishError(f"{platform} respondeu {response.status_code}: {response.text}", retryable=retryable)
+
+
+class Publisher:
+    """Base dos publicadores. Subclasses definem `name`, `channels` e `publish`."""
+
+    name = ""
+    channels: tuple = ()  # nomes de canal (minúsculos) atendidos por este publicador
+    capabilities = Capabilities()
+
+    def __init__(self):
+        self._session = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = self.create_session()
+        return self._session
+
+    def create_session(self) -> requests.Session:
+        return build_session()
+
+    def is_configured(self) -> bool:
+        return True
+
+    def setup_instructions(self, conteudo: str, canal: str) -> str:
+        return f"⚠️ Integração com {canal} não configurada.\n\nConteúdo pronto para publicação: {conteudo[:100]}..."
+
+    def publish(self, conteudo: str, canal: str) -> str:
+        """Publica `conteudo` e retorna a mensagem de sucesso. Levanta `PublishError` em falha."""
+        raise NotImplementedError
+
+    def credential(self) -> Optional[str]:
+        """Credencial usada nas chamadas; define o balde de limite de taxa."""
+        return None
+
+    def publish_batch(self, conteudos: list, canal: str) -> list:
+        """Publica vários conteúdos; retorna, por item, a mensagem de sucesso ou a `PublishError`.
+
+        Sem suporte nativo a lote, publica um a um na mesma sessão. Qualquer exceção vale só
+        para o seu item: os anteriores já foram publicados.
+        """
+        resultados = []
+        for conteudo in conteudos:
+            try:
+                resultados.append(self.publish(conteudo, canal))
+            except Exception as e:
+                resultados.append(e)
+        return resultados
+
+    def close(self):
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+_registry = {}
+
+
+def register_publisher(cls):
+    """Decorador: registra uma instância (única, com sessão compartilhada) para cada canal da classe."""
+    instance = cls()
+    for canal in cls.channels:
+        _registry[canal.lower()] = instance
+    return cls
+
+
+def get_publisher(canal: str) -> Optional[Publisher]:
+    return _registry.get(canal.lower())
+
+
+def registered_publishers() -> dict:
+    return dict(_registry)
+
+
+def close_publishers():
+    for publisher in set(_registry.values()):
+        publisher.close()
+
+
+@register_publisher
+class MetaPublisher(Publisher):
+    """Instagram/Facebook via Meta Graph API."""
+
+    name = "meta"
+    channels = ("instagram", "facebook")
+    capabilities = Capabilities(batch=True, media=True, max_batch_size=50, max_chars=63206)
+
+    def is_configured(self) -> bool:
+        return bool(settings.META_ACCESS_TOKEN)
+
+    def credential(self) -> Optional[str]:
+        return settings.META_ACCESS_TOKEN
+
+    def setup_instructions(self, conteudo: str, canal: str) -> str:
+        return f"""⚠️ Integração com {canal} não configurada.
+
+**Como configurar:**
+1. Acesse https://developers.facebook.com/
+2. Crie um app e obtenha Access Token
+3. Configure permissões: pages_manage_posts, publish_to_groups
+4. Adicione META_ACCESS_TOKEN no arquivo .env
+5. Para Instagram: Configure Instagram Business Account
+
+Conteúdo pronto para publicação: {conteudo[:100]}..."""
+
+    def publish(self, conteudo: str, canal: str) -> str:
+        if canal.lower() == "instagram":
+            # Instagram requer Instagram Business Account vinculada
+            return f"""⚠️ Instagram requer configuração avançada.
+
+**Como configurar Instagram:**
+1. Conecte sua conta Instagram Business ao Facebook
+2. Use Instagram Basic Display API ou Graph API
+3. Obtenha long-lived access token
+4. Configure webhooks para notificações
+
+Conteúdo pronto: {conteudo[:100]}..."""
+
+        try:
+            response = self.session.post(
+                f"{settings.META_GRAPH_URL}/me/feed",
+                data={"message": conteudo, "access_token": settings.META_ACCESS_TOKEN},
+            )
+        except requests.RequestException as e:
+            raise PublishError(str(e))
+        if response.status_code != 200:
+            raise _response_error("Facebook", response)
+        return f"Publicado no Facebook com sucesso (ID: {response.json().get('id')})"
+
+    def publish_batch(self, conteudos: list, canal: str) -> list:
+        """Facebook: até 50 posts numa única requisição de batch da Graph API."""
+        if canal.lower() != "facebook" or len(conteudos) == 1:
+            return super().publish_batch(conteudos, canal)
+        batch = [
+            {"method": "POST", "relative_url": "me/feed", "body": urlencode({"message": conteudo})}
+            for conteudo in conteudos
+        ]
+        try:
+            response = self.session.post(
+                settings.META_GRAPH_URL,
+                data={"batch": json.dumps(batch), "access_token": settings.META_ACCESS_TOKEN},
+            )
+        except requests.RequestException as e:
+            return [PublishError(str(e)) for _ in conteudos]
+        if response.status_code != 200:
+            erro = _response_error("Facebook", response)
+            return [erro for _ in conteudos]
+
+        try:
+            itens = response.json()
+        except ValueError:
+            itens = None
+        if not isinstance(itens, list):
+            itens = []
+        resultados = []
+        for item in itens[:len(conteudos)]:
+            # Itens podem vir nulos quando a Graph API interrompe o batch (timeout interno)
+            item = item if isinstance(item, dict) else {}
+            code = item.get("code", 503)
+            body = item.get("body") or "{}"
+            if code == 200:
+                try:
+                    post_id = json.loads(body).get("id")
+                except (ValueError, AttributeError):
+                    post_id = None  # publicado mesmo sem id legível: não pode voltar para a fila
+                resultados.append(f"Publicado no Facebook com sucesso (ID: {post_id})")
+            else:
+                resultados.append(PublishError(
+                    f"Facebook respondeu {code}: {body}", retryable=code == 429 or code >= 500
+                ))
+        # Resposta ilegível ou mais curta que o lote: um resultado por item, sempre
+        faltando = PublishError("Facebook não retornou resultado para o item do lote")
+        resultados += [faltando] * (len(conteudos) - len(resultados))
+        return resultados
+
+
+@register_publisher
+class GoogleAdsPublisher(Publisher):
+    name = "google_ads"
+    channels = ("google ads",)
+    capabilities = Capabilities(media=True)
+
+    def is_configured(self) -> bool:
+        return bool(settings.GOOGLE_ADS_CUSTOMER_ID and settings.GOOGLE_ADS_DEVELOPER_TOKEN)
+
+    def setup_instructions(self, conteudo: str, canal: str) -> str:
+        return f"""⚠️ Integração com Google Ads não configurada.
+
+**Como configurar:**
+1. Acesse https://ads.google.com/
+2. Configure conta de desenvolvedor em https://console.developers.google.com/
+3. Obtenha Developer Token e Customer ID
+4. Configure OAuth 2.0 credentials
+5. Adicione no .env: GOOGLE_ADS_CUSTOMER_ID, GOOGLE_ADS_DEVELOPER_TOKEN, etc.
+
+Campanha pronta: {conteudo[:100]}..."""
+
+    def publish(self, conteudo: str, canal: str) -> str:
+        # TODO: Implementar Google Ads API
+        return f"Campanha Google Ads criada com sucesso (API Google): {conteudo[:100]}..."
+
+
+@register_publisher
+class TwitterPublisher(Publisher):
+    """Twitter/X (API v2) com assinatura OAuth 1.0a do tweepy sobre a sessão do publicador."""
+
+    name = "twitter"
+    channels = ("twitter/x", "twitter")
+    capabilities = Capabilities(media=True, max_chars=280)
+
+    def __init__(self):
+        super().__init__()
+        self._auth = None
+
+    def is_configured(self) -> bool:
+        return all([
+            settings.TWITTER_API_KEY,
+            settings.TWITTER_API_SECRET,
+            settings.TWITTER_ACCESS_TOKEN,
+            settings.TWITTER_ACCESS_TOKEN_SECRET,
+        ])
+
+    def credential(self) -> Optional[str]:
+        return settings.TWITTER_ACCESS_TOKEN
+
+    def setup_instructions(self, conteudo: str, canal: str) -> str:
+        return f"""⚠️ Integração com Twitter/X não configurada.
+
+**Como configurar:**
+1. Acesse https://developer.twitter.com/
+2. Crie um projeto e app
+3. Obtenha API Key, API Secret, Access Token e Access Secret
+4. Configure permissões de escrita
+5. Adicione no .env: TWITTER_API_KEY, TWITTER_API_SECRET, etc.
+
+Tweet pronto: {conteudo[:100]}..."""
+
+    @property
+    def auth(self):
+        if self._auth is None:
+            with self._lock:
+                if self._auth is None:
+                    if tweepy is None:
+                        raise PublishError("Biblioteca tweepy não instalada", retryable=False)
+                    self._auth = tweepy.OAuth1UserHandler(
+                        settings.TWITTER_API_KEY,
+                        settings.TWITTER_API_SECRET,
+                        settings.TWITTER_ACCESS_TOKEN,
+                        settings.TWITTER_ACCESS_TOKEN_SECRET,
+                    ).apply_auth()
+        return self._auth
+
+    def publish(self, conteudo: str, canal: str) -> str:
+        try:
+            response = self.session.post(
+                f"{settings.TWITTER_API_URL}/2/tweets",
+                json={"text": conteudo[:self.capabilities.max_chars]},
+                auth=self.auth,
+            )
+        except requests.RequestException as e:
+            raise PublishError(str(e))
+        if response.status_code != 201:
+            raise _response_error("Twitter/X", response)
+        try:
+            tweet_id = response.json()["data"]["id"]
+        except (ValueError, KeyError, TypeError):
+            # 201: o tweet saiu, só a resposta é ilegível; repetir publicaria em dobro
+            raise PublishError(f"Twitter/X respondeu {response.status_code} sem id do tweet: {response.text}",
+                               retryable=False)
+        return f"Tweet publicado com sucesso (ID: {tweet_id})"
+
+    def close(self):
+        super().close()
+        self._auth = None
+
+
+@register_publisher
+class LinkedInPublisher(Publisher):
+    name = "linkedin"
+    channels = ("linkedin",)
+    capabilities = Capabilities(media=True, max_chars=3000)
+
+    def is_configured(self) -> bool:
+        return bool(settings.LINKEDIN_ACCESS_TOKEN)
+
+    def credential(self) -> Optional[str]:
+        return settings.LINKEDIN_ACCESS_TOKEN
+
+    def setup_instructions(self, conteudo: str, canal: str) -> str:
+        return f"""⚠️ Integração com LinkedIn não configurada.
+
+**Como configurar:**
+1. Acesse https://developer.linkedin.com/
+2. Crie uma aplicação
+3. Configure OAuth 2.0 e obtenha Access Token
+4. Solicite permissões: w_member_social, w_organization_social
+5. Adicione LINKEDIN_ACCESS_TOKEN no .env
+
+Post profissional pronto: {conteudo[:100]}..."""
+
+    def create_session(self) -> requests.Session:
+        return build_session(headers={
+            "Authorization": f"Bearer {settings.LINKEDIN_ACCESS_TOKEN}",
+            "Content-Type": "application/json",
+        })
+
+    def publish(self, conteudo: str, canal: str) -> str:
+        # Para post de texto simples
+        data = {
+            "author": "urn:li:person:YOUR_PERSON_URN",  # Precisa do URN do usuário
+            "lifecycleState": "PUBLISHED",
+            "specificContent": {
+                "com.linkedin.ugc.ShareContent": {
+                    "shareCommentary": {
+                        "text": conteudo
+                    },
+                    "shareMediaCategory": "NONE"
+                }
+            },
+            "visibility": {
+                "com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"
+            }
+        }
+        try:
+            response = self.session.post(f"{settings.LINKEDIN_API_URL}/v2/ugcPosts", json=data)
+        except requests.RequestException as e:
+            raise PublishError(str(e))
+        if response.status_code != 201:
+            raise _response_error("LinkedIn", response)
+        return "Post publicado no LinkedIn com sucesso"
+
+
+@register_publisher
+class TikTokPublisher(Publisher):
+    name = "tiktok"
+    channels = ("tiktok",)
+    capabilities = Capabilities(media=True)
+
+    def is_configured(self) -> bool:
+        return bool(settings.TIKTOK_ACCESS_TOKEN)
+
+    def setup_instructions(self, conteudo: str, canal: str) -> str:
+        return f"""⚠️ Integração com TikTok não configurada.
+
+**Como configurar:**
+1. Acesse https://developers.tiktok.com/
+2. Crie uma aplicação
+3. Configure Research API ou Creator Marketplace
+4. Obtenha Access Token
+5. Adicione TIKTOK_ACCESS_TOKEN no .env
+
+Vídeo curto pronto: {conteudo[:100]}..."""
+
+    def publish(self, conteudo: str, canal: str) -> str:
+        # TODO: Implementar TikTok API
+        return f"Vídeo publicado no TikTok com sucesso (API TikTok): {conteudo[:100]}..."
+
+
+@register_publisher
+class YouTubePublisher(Publisher):
+    name = "youtube"
+    channels = ("youtube",)
+    capabilities = Capabilities(media=True)
+
+    def is_configured(self) -> bool:
+        return bool(settings.YOUTUBE_API_KEY)
+
+    def setup_instructions(self, conteudo: str, canal: str) -> str:
+        return f"""⚠️ Integração com YouTube não configurada.
+
+**Como configurar:**
+1. Acesse https://console.developers.google.com/
+2. Crie um projeto e habilite YouTube Data API v3
+3. Obtenha API Key
+4. Configure OAuth para uploads
+5. Adicione YOUTUBE_API_KEY no .env
+
+Vídeo pronto: {conteudo[:100]}..."""
+
+    def publish(self, conteudo: str, canal: str) -> str:
+        # TODO: Implementar YouTube Data API
+        return f"Vídeo publicado no YouTube com sucesso (API YouTube): {conteudo[:100]}..."
+
+
+@register_publisher
+class PinterestPublisher(Publisher):
+    name = "pinterest"
+    channels = ("pinterest",)
+    capabilities = Capabilities(media=True, max_chars=500)
+
+    def is_configured(self) -> bool:
+        return bool(settings.PINTEREST_ACCESS_TOKEN)
+
+    def setup_instructions(self, conteudo: str, canal: str) -> str:
+        return f"""⚠️ Integração com Pinterest não configurada.
+
+**Como configurar:**
+1. Acesse https://developers.pinterest.com/
+2. Crie uma aplicação
+3. Configure OAuth e obtenha Access Token
+4. Adicione PINTEREST_ACCESS_TOKEN no .env
+
+Pin visual pronto: {conteudo[:100]}..."""
+
+    def publish(self, conteudo: str, canal: str) -> str:
+        # TODO: Implementar Pinterest API
+        return f"Pin publicado no Pinterest com sucesso (API Pinterest): {conteudo[:100]}..."
+
+
+@register_publisher
+class SnapchatPublisher(Publisher):
+    name = "snapchat"
+    channels = ("snapchat",)
+    capabilities = Capabilities(media=True)
+
+    def is_configured(self) -> bool:
+        return bool(settings.SNAPCHAT_ACCESS_TOKEN)
+
+    def setup_instructions(self, conteudo: str, canal: str) -> str:
+        return f"Story/Snap publicado no Snapchat com sucesso (simulado): {conteudo[:100]}..."
+
+    def publish(self, conteudo: str, canal: str) -> str:
+        # TODO: Implementar Snapchat API
+        return f"Story publicado no Snapchat com sucesso (API Snapchat): {conteudo[:100]}..."
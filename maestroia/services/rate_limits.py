@@ -0,0 +1,89 @@
+"""Limites de publicação por plataforma e por credencial (token buckets).
+
+`PLATFORM_RATE_LIMITS` é a tabela de limites sustentáveis de cada plataforma; pode ser
+sobrescrita por PUBLISH_RATE_LIMITS (JSON) no .env. Cada par (plataforma, credencial) tem
+seu próprio balde, consultado pelo dispatcher do outbox antes de entregar um lote.
+"""
+import hashlib
+import json
+import threading
+import time
+from typing import Optional
+
+from maestroia.config import settings
+
+# posts: quantidade permitida a cada `per_seconds`; burst: rajada máxima
+PLATFORM_RATE_LIMITS = {
+    # X API v2 POST /2/tweets: 200 req/15 min por usuário; mantemos folga
+    "twitter": {"posts": 50, "per_seconds": 900, "burst": 5},
+    # Graph API: ~200 chamadas/hora por usuário; um batch conta como uma chamada por item
+    "meta": {"posts": 200, "per_seconds": 3600, "burst": 10},
+    # LinkedIn: ~150 shares/dia por membro
+    "linkedin": {"posts": 150, "per_seconds": 86400, "burst": 5},
+    "default": {"posts": 60, "per_seconds": 3600, "burst": 5},
+}
+
+
+def _load_overrides() -> dict:
+    raw = getattr(settings, "PUBLISH_RATE_LIMITS", "")
+    if not raw:
+        return {}
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return {}
+
+
+def rate_limit_for(platform: str) -> dict:
+    limits = {**PLATFORM_RATE_LIMITS, **_load_overrides()}
+    return limits.get(platform, limits["default"])
+
+
+class TokenBucket:
+    def __init__(self, rate_per_second: float, capacity: float):
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take_up_to(self, n: int) -> int:
+        """Consome até `n` fichas disponíveis agora e retorna quantas conseguiu."""
+        with self._lock:
+            self._refill()
+            taken = min(n, int(self.tokens))
+            self.tokens -= taken
+            return taken
+
+    def wait_time(self, n: int = 1) -> float:
+        """Segundos até haver `n` fichas (sem consumi-las)."""
+        with self._lock:
+            self._refill()
+            return max(0.0, (n - self.tokens) / self.rate)
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def get_bucket(platform: str, credential: Optional[str] = None) -> TokenBucket:
+    """Balde do par (plataforma, credencial); a credencial é guardada só como hash."""
+    cred = hashlib.sha256((credential or "").encode("utf-8")).hexdigest()[:16]
+    key = (platform, cred)
+    with _buckets_lock:
+        bucket = _buckets.get(key)
+        if bucket is None:
+            limit = rate_limit_for(platform)
+            bucket = TokenBucket(limit["posts"] / limit["per_seconds"], limit["burst"])
+            _buckets[key] = bucket
+        return bucket
+
+
+def reset_buckets():
+    with _buckets_lock:
+        _buckets.clear()
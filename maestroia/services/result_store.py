@@ -0,0 +1,120 @@
+"""Armazenamento comprimido e deduplicado dos resultados de campanha.
+
+Cada seção de primeiro nível do resultado (estrategia, pesquisa, conteudo...) é serializada
+de forma canônica, endereçada pelo sha256 e gravada comprimida (zstd, ou zlib sem o pacote
+zstandard) em `result_blobs` — uma pesquisa reaproveitada entre campanhas é gravada uma vez.
+O resultado vira um manifesto {seção: hash}, também guardado como blob, e o `campaigns`
+guarda só o hash do manifesto (`resultado_ref`). Seções pequenas vão inline no manifesto.
+Nada é descomprimido até alguém pedir o detalhe, e só as seções pedidas.
+"""
+import hashlib
+import json
+import threading
+import zlib
+from typing import Iterable, Optional
+
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from maestroia.config import settings
+from maestroia.models.results import ResultBlob
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+MANIFEST_VERSION = 1
+_local = threading.local()  # compressores zstd não são thread-safe
+_INSERT_IGNORE = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}
+
+
+def _canonical(value) -> bytes:
+    return json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+def _codec() -> str:
+    if settings.RESULT_COMPRESSION == "zstd" and zstandard is not None:
+        return "zstd"
+    return "zlib"
+
+
+def compress(raw: bytes) -> tuple:
+    """(codec, dados) conforme RESULT_COMPRESSION."""
+    if _codec() == "zstd":
+        if not hasattr(_local, "zstd"):
+            _local.zstd = zstandard.ZstdCompressor(level=3)
+        return "zstd", _local.zstd.compress(raw)
+    return "zlib", zlib.compress(raw, 6)
+
+
+def decompress(codec: str, data: bytes) -> bytes:
+    if codec == "zlib":
+        return zlib.decompress(data)
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("blob em zstd, mas o pacote zstandard não está instalado")
+        return zstandard.ZstdDecompressor().decompress(data)
+    raise ValueError(f"codec desconhecido: {codec}")
+
+
+def _put_blobs(db: Session, blobs: dict):
+    """Grava os blobs {hash: bruto} que ainda não existem (sem commit)."""
+    if not blobs:
+        return
+    existing = {h for (h,) in db.query(ResultBlob.hash).filter(ResultBlob.hash.in_(list(blobs)))}
+    rows = []
+    for digest, raw in blobs.items():
+        if digest not in existing:
+            codec, data = compress(raw)
+            rows.append({"hash": digest, "codec": codec, "raw_size": len(raw), "data": data})
+    if not rows:
+        return
+    insert = _INSERT_IGNORE.get(db.get_bind().dialect.name)
+    if insert is not None:
+        # Outra campanha pode gravar o mesmo blob entre o SELECT e o INSERT
+        db.execute(insert(ResultBlob).values(rows).on_conflict_do_nothing(index_elements=["hash"]))
+    else:
+        db.add_all(ResultBlob(**row) for row in rows)
+
+
+def save_result(db: Session, result: dict) -> str:
+    """Grava o resultado e retorna a referência (hash do manifesto). O commit é do chamador."""
+    sections, blobs = {}, {}
+    for key, value in result.items():
+        raw = _canonical(value)
+        if len(raw) <= settings.RESULT_INLINE_MAX_BYTES:
+            sections[key] = {"v": value}
+        else:
+            digest = hashlib.sha256(raw).hexdigest()
+            blobs[digest] = raw
+            sections[key] = {"h": digest}
+    manifest = _canonical({"v": MANIFEST_VERSION, "sections": sections})
+    ref = hashlib.sha256(manifest).hexdigest()
+    blobs[ref] = manifest
+    _put_blobs(db, blobs)
+    return ref
+
+
+def _get_raw(db: Session, hashes: Iterable[str]) -> dict:
+    rows = db.query(ResultBlob.hash, ResultBlob.codec, ResultBlob.data).filter(ResultBlob.hash.in_(list(hashes)))
+    return {digest: decompress(codec, data) for digest, codec, data in rows}
+
+
+def load_result(db: Session, ref: str, sections: Optional[Iterable[str]] = None) -> Optional[dict]:
+    """Reconstrói o resultado; com `sections`, só essas seções são lidas e descomprimidas."""
+    raw = _get_raw(db, [ref]).get(ref)
+    if raw is None:
+        return None
+    manifest = json.loads(raw)["sections"]
+    wanted = manifest if sections is None else [s for s in sections if s in manifest]
+    needed = {manifest[k]["h"] for k in wanted if "h" in manifest[k]}
+    raws = _get_raw(db, needed) if needed else {}
+    result = {}
+    for key in wanted:
+        entry = manifest[key]
+        result[key] = entry["v"] if "v" in entry else json.loads(raws[entry["h"]])
+    return result
+
@@ -0,0 +1,251 @@
+"""Agendador de posts persistente.
+
+Os posts ficam na tabela `scheduled_posts` (SQLite); em memória o agendador mantém apenas um
+heap de (horário, id), com inserção O(log n), e a thread de despacho dorme até o próximo post
+vencer (ou até um agendamento mais cedo acordá-la). Ao reiniciar, os posts pendentes são
+recarregados do banco. Posts vencidos são entregues ao outbox de publicações.
+"""
+import heapq
+import threading
+from datetime import datetime, timedelta, time as dtime
+from typing import Optional
+
+from maestroia.config import settings
+from maestroia.core import metrics
+from maestroia.core.database import SessionLocal
+from maestroia.models.publishing import ScheduledPost
+from maestroia.services import publish_outbox
+
+
+# Janelas de maior engajamento por plataforma (futuramente integrar com analytics reais)
+HORARIOS_IDEAIS = {
+    "Instagram": ["08:00-10:00", "18:00-20:00", "12:00-14:00"],
+    "Facebook": ["13:00-15:00", "19:00-21:00", "09:00-11:00"],
+    "Twitter/X": ["12:00-14:00", "18:00-20:00", "08:00-10:00"],
+    "LinkedIn": ["07:00-09:00", "12:00-14:00", "17:00-19:00"],
+    "TikTok": ["18:00-22:00", "12:00-14:00", "08:00-10:00"],
+    "YouTube": ["14:00-16:00", "19:00-21:00", "11:00-13:00"]
+}
+HORARIOS_PADRAO = ["09:00-11:00", "18:00-20:00"]
+
+
+def _parse_window(janela: str) -> tuple:
+    inicio, fim = janela.split("-")
+    h1, m1 = map(int, inicio.split(":"))
+    h2, m2 = map(int, fim.split(":"))
+    return dtime(h1, m1), dtime(h2, m2)
+
+
+def ideal_windows(canal: str) -> list:
+    for plataforma, janelas in HORARIOS_IDEAIS.items():
+        if plataforma.lower() == canal.lower():
+            return sorted(_parse_window(j) for j in janelas)
+    return sorted(_parse_window(j) for j in HORARIOS_PADRAO)
+
+
+class PostScheduler:
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+        self._heap = []
+        self._live = set()  # ids no heap ainda não cancelados (a remoção do heap é preguiçosa)
+        self._cond = threading.Condition()
+        self._stop = False
+        self._thread = None
+
+    # -------------------------
+    # Ciclo de vida
+    # -------------------------
+    def start(self):
+        """Recarrega os posts pendentes do banco e inicia a thread de despacho."""
+        if self._thread and self._thread.is_alive():
+            return
+        db = self.session_factory()
+        try:
+            rows = db.query(ScheduledPost.id, ScheduledPost.due_at).filter(ScheduledPost.status == "scheduled").all()
+        finally:
+            db.close()
+        with self._cond:
+            self._heap = [(due_at.timestamp(), post_id) for post_id, due_at in rows]
+            heapq.heapify(self._heap)
+            self._live = {post_id for post_id, _ in rows}
+            self._stop = False
+        self._thread = threading.Thread(target=self._loop, name="post-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def pending_count(self) -> int:
+        with self._cond:
+            return len(self._live)
+
+    # -------------------------
+    # Agendamento
+    # -------------------------
+    def next_ideal_slot(self, tenant_id: str, canal: str, after: Optional[datetime] = None) -> datetime:
+        """Próximo horário livre dentro das janelas ideais do canal.
+
+        Cada janela comporta até SCHEDULER_POSTS_PER_WINDOW posts do tenant no canal,
+        distribuídos em intervalos iguais dentro da janela.
+        """
+        after = after or datetime.now()
+        por_janela = max(1, settings.SCHEDULER_POSTS_PER_WINDOW)
+        db = self.session_factory()
+        try:
+            for dia in range(settings.SCHEDULER_LOOKAHEAD_DAYS):
+                data = after.date() + timedelta(days=dia)
+                for inicio, fim in ideal_windows(canal):
+                    janela_inicio = datetime.combine(data, inicio)
+                    janela_fim = datetime.combine(data, fim)
+                    if janela_fim <= after:
+                        continue
+                    ocupados = db.query(ScheduledPost.id).filter(
+                        ScheduledPost.tenant_id == tenant_id,
+                        ScheduledPost.channel == canal,
+                        ScheduledPost.status == "scheduled",
+                        ScheduledPost.due_at >= janela_inicio,
+                        ScheduledPost.due_at < janela_fim,
+                    ).count()
+                    passo = (janela_fim - janela_inicio) / por_janela
+                    for i in range(ocupados, por_janela):
+                        slot = janela_inicio + passo * i
+                        if slot > after:
+                            return slot
+        finally:
+            db.close()
+        return after + timedelta(days=settings.SCHEDULER_LOOKAHEAD_DAYS)
+
+    def schedule(self, tenant_id: str, canal: str, conteudo: str, when: Optional[datetime] = None) -> dict:
+        """Agenda um post. Sem `when`, usa o próximo horário ideal do canal."""
+        automatico = when is None
+        if automatico:
+            when = self.next_ideal_slot(tenant_id, canal)
+        db = self.session_factory()
+        try:
+            post = ScheduledPost(tenant_id=tenant_id, channel=canal, content=conteudo, due_at=when, status="scheduled")
+            db.add(post)
+            db.commit()
+            post_id = post.id
+        finally:
+            db.close()
+        with self._cond:
+            heapq.heappush(self._heap, (when.timestamp(), post_id))
+            self._live.add(post_id)
+            # Só acorda o despacho se o novo post passou a ser o próximo
+            if self._heap[0][1] == post_id:
+                self._cond.notify()
+        return {"id": post_id, "canal": canal, "horario": when, "automatico": automatico}
+
+    def cancel(self, tenant_id: str, post_id: int) -> bool:
+        """Cancela um post do tenant; False se não existe, é de outro tenant ou já saiu."""
+        db = self.session_factory()
+        try:
+            updated = db.query(ScheduledPost).filter(
+                ScheduledPost.id == post_id,
+                ScheduledPost.tenant_id == tenant_id,
+                ScheduledPost.status == "scheduled",
+            ).update({"status": "cancelled"}, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+        if updated:
+            # Remoção preguiçosa: a entrada fica no heap e é descartada ao vencer
+            with self._cond:
+                self._live.discard(post_id)
+        return bool(updated)
+
+    def list_scheduled(self, tenant_id: str, limit: int = 50) -> list:
+        db = self.session_factory()
+        try:
+            rows = (
+                db.query(ScheduledPost)
+                .filter(ScheduledPost.tenant_id == tenant_id, ScheduledPost.status == "scheduled")
+                .order_by(ScheduledPost.due_at)
+                .limit(limit)
+                .all()
+            )
+            return [{"id": r.id, "canal": r.channel, "horario": r.due_at, "conteudo": r.content} for r in rows]
+        finally:
+            db.close()
+
+    # -------------------------
+    # Despacho
+    # -------------------------
+    def _pop_due(self) -> list:
+        """Espera até haver posts vencidos e os retira do heap (chamado com o lock)."""
+        while not self._stop:
+            if not self._heap:
+                self._cond.wait()
+                continue
+            espera = self._heap[0][0] - datetime.now().timestamp()
+            if espera > 0:
+                self._cond.wait(timeout=espera)
+                continue
+            now = datetime.now().timestamp()
+            due = []
+            while self._heap and self._heap[0][0] <= now and len(due) < settings.OUTBOX_BATCH_SIZE:
+                post_id = heapq.heappop(self._heap)[1]
+                if post_id in self._live:
+                    self._live.discard(post_id)
+                    due.append(post_id)
+            if due:
+                return due
+        return []
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                due = self._pop_due()
+                if self._stop:
+                    return
+            try:
+                self.dispatch(due)
+            except Exception:
+                # Devolve ao heap para nova tentativa; posts já despachados são ignorados
+                with self._cond:
+                    retry_at = datetime.now().timestamp() + settings.OUTBOX_BACKOFF_SECONDS
+                    for post_id in due:
+                        heapq.heappush(self._heap, (retry_at, post_id))
+                        self._live.add(post_id)
+
+    def dispatch(self, post_ids: list) -> int:
+        """Entrega posts vencidos ao outbox. Retorna quantos foram despachados."""
+        if not post_ids:
+            return 0
+        db = self.session_factory()
+        try:
+            posts = db.query(ScheduledPost).filter(
+                ScheduledPost.id.in_(post_ids), ScheduledPost.status == "scheduled"
+            ).all()
+            for post in posts:
+                # Chave por post: reenviar após falha não duplica a publicação
+                item = publish_outbox.enqueue_publications(
+                    f"agendado-{post.id}", [(post.channel, post.content)], session_factory=self.session_factory
+                )[0]
+                post.status = "dispatched"
+                post.outbox_id = item["id"]
+            db.commit()
+        finally:
+            db.close()
+        if posts and self.session_factory is SessionLocal:
+            publish_outbox.get_dispatcher().wake()
+        return len(posts)
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> PostScheduler:
+    """Agendador do processo, iniciado (e recuperado do banco) na primeira chamada."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = PostScheduler()
+            _scheduler.start()
+            metrics.QUEUE_DEPTH.set_function(_scheduler.pending_count, queue="agendamentos")
+        return _scheduler
@@ -1,10 +1,15 @@
 from typing import List
 
+from maestroia.core import tracing
+
+
+@tracing.traced("trends.fetch")
 def get_trends_summary(keywords: List[str], timeframe: str = "today 12-m", geo: str = "") -> str:
     """Tenta buscar dados do Google Trends via pytrends; em falha retorna summary simulado.
 
     Retorna um texto resumido pronto para inserção em prompts.
     """
+    tracing.set_attribute("keywords", ", ".join(keywords))
     try:
         from pytrends.request import TrendReq
 
@@ -32,4 +37,5 @@ def get_trends_summary(keywords: List[str], timeframe: str = "today 12-m", geo:
 
         return "Dados do Google Trends: " + "; ".join(parts)
     except Exception as e:
+        tracing.set_attribute("fallback", True)
         return f"Dados simulados do Google Trends: interesse crescente em {', '.join(keywords)} (fallback). Erro: {e}"
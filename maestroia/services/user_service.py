@@ -1,3 +1,203 @@
+"""Contas de usuário do app Streamlit, na tabela `users` (a mesma da API).
+
+Substitui o users.json, que era lido e regravado inteiro a cada login, cadastro e campanha
+executada: cada operação agora atualiza só a linha do usuário, e o contador de campanhas é
+incrementado no próprio UPDATE, sem ler-modificar-gravar entre sessões concorrentes.
+
+As leituras passam por um cache em memória com TTL (USER_CACHE_TTL_SECONDS). Toda escrita
+feita por este módulo invalida a entrada; mudanças feitas por outro processo (webhook de
+pagamento na API) aparecem no app em até um TTL.
+"""
+import hashlib
+import hmac
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import func, update
+from sqlalchemy.exc import IntegrityError
+
+from maestroia.config import settings
+from maestroia.core import metrics, passwords
+from maestroia.core.database import SessionLocal, User
+
+
+def _user_dict(user: User) -> dict:
+    """Mesmo formato das entradas do antigo users.json (sem o hash da senha)."""
+    return {
+        "id": user.id,
+        "email": user.email,
+        "display_name": user.display_name or user.email,
+        "plano": user.plano or "free",
+        "pago": bool(user.pago),
+        "campanhas_mes": user.campanhas_mes or 0,
+        "logged_in": bool(user.logged_in),
+        "created_at": (user.created_at or datetime.now()).isoformat(),
+    }
+
+
+def _is_legacy_hash(hashed: str) -> bool:
+    return len(hashed) == 64 and not hashed.startswith("$")
+
+
+class UserRepository:
+    def __init__(self, session_factory=None, ttl_seconds: Optional[float] = None, max_entries: int = 10000):
+        self.session_factory = session_factory or SessionLocal
+        self.ttl_seconds = settings.USER_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.max_entries = max_entries
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    # Cache
+
+    def _cached(self, email: str):
+        with self._lock:
+            entry = self._cache.get(email)
+            if entry is not None and entry[1] > time.monotonic():
+                self._cache.move_to_end(email)
+                return entry[0]
+            self._cache.pop(email, None)
+            return None
+
+    def _remember(self, email: str, data: dict):
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._cache[email] = (data, time.monotonic() + self.ttl_seconds)
+            self._cache.move_to_end(email)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def invalidate(self, email: str):
+        with self._lock:
+            self._cache.pop(email, None)
+
+    # Leitura
+
+    def get(self, email: str) -> Optional[dict]:
+        data = self._cached(email)
+        if data is not None:
+            metrics.CACHE_LOOKUPS.inc(cache="ui_users", result="hit")
+            return dict(data)
+        metrics.CACHE_LOOKUPS.inc(cache="ui_users", result="miss")
+        db = self.session_factory()
+        try:
+            user = db.query(User).filter(User.email == email).first()
+            if user is None:
+                return None
+            data = _user_dict(user)
+        finally:
+            db.close()
+        self._remember(email, data)
+        return dict(data)
+
+    def exists(self, email: str) -> bool:
+        return self.get(email) is not None
+
+    def find_logged_in(self) -> Optional[dict]:
+        """Primeiro usuário marcado como logado (login persistente do app)."""
+        db = self.session_factory()
+        try:
+            user = db.query(User).filter(User.logged_in.is_(True)).order_by(User.id).first()
+            return _user_dict(user) if user is not None else None
+        finally:
+            db.close()
+
+    # Escrita
+
+    def create(self, email: str, password: str, display_name: str,
+               created_at: Optional[datetime] = None) -> Optional[dict]:
+        """Cria a conta; None se o email já estiver cadastrado."""
+        db = self.session_factory()
+        try:
+            user = User(
+                email=email,
+                hashed_password=passwords.hash_sync(password),
+                display_name=display_name,
+                plano="free",
+                pago=False,
+                campanhas_mes=0,
+                logged_in=False,
+                created_at=created_at or datetime.now(),
+            )
+            db.add(user)
+            try:
+                db.commit()
+            except IntegrityError:
+                db.rollback()
+                return None
+            data = _user_dict(user)
+        finally:
+            db.close()
+        self.invalidate(email)
+        return data
+
+    def authenticate(self, email: str, password: str) -> Optional[dict]:
+        """Confere a senha; hashes sha256 do users.json (ou bcrypt com custo antigo) são regravados."""
+        db = self.session_factory()
+        try:
+            user = db.query(User).filter(User.email == email).first()
+            if user is None or not user.hashed_password:
+                return None
+            if _is_legacy_hash(user.hashed_password):
+                legacy = hashlib.sha256(password.encode()).hexdigest()
+                valid = hmac.compare_digest(legacy, user.hashed_password)
+                new_hash = passwords.hash_sync(password) if valid else None
+            else:
+                valid, new_hash = passwords.verify_sync(password, user.hashed_password)
+            if not valid:
+                return None
+            if new_hash:
+                user.hashed_password = new_hash
+                db.commit()
+            return _user_dict(user)
+        finally:
+            db.close()
+
+    def update(self, email: str, **fields) -> bool:
+        """UPDATE só da linha do usuário; False se ele não existir."""
+        unknown = set(fields) - {"display_name", "plano", "pago", "campanhas_mes", "logged_in"}
+        if unknown:
+            raise ValueError(f"Campos não editáveis: {', '.join(sorted(unknown))}")
+        return self._execute(email, update(User).where(User.email == email).values(**fields))
+
+    def set_logged_in(self, email: str, logged_in: bool) -> bool:
+        return self.update(email, logged_in=logged_in)
+
+    def increment_campaigns(self, email: str, amount: int = 1) -> bool:
+        """Incremento atômico: duas sessões executando campanhas ao mesmo tempo não perdem contagem."""
+        stmt = (
+            update(User)
+            .where(User.email == email)
+            .values(campanhas_mes=func.coalesce(User.campanhas_mes, 0) + amount)
+        )
+        return self._execute(email, stmt)
+
+    def _execute(self, email: str, stmt) -> bool:
+        db = self.session_factory()
+        try:
+            rowcount = db.execute(stmt.execution_options(synchronize_session=False)).rowcount
+            db.commit()
+        finally:
+            db.close()
+        self.invalidate(email)
+        return rowcount > 0
+
+
+_repository = None
+_repository_lock = threading.Lock()
+
+
+def get_user_repository() -> UserRepository:
+    global _repository
+    with _repository_lock:
+        if _repository is None:
+            _repository = UserRepository()
+        return _repository
+
+
 # Placeholder para gerenciamento de usuários
 def get_user_campaigns(user_id: str):
     return []
@@ -0,0 +1,15 @@
+"""Configuração do pytest: a suíte nunca usa o maestroia.db versionado.
+
+Roda antes de qualquer teste importar `settings`, então `SessionLocal`, `init_db` e os
+serviços apontam para um banco temporário (ou para TEST_DATABASE_URL, se definido), e os
+clientes da OpenAI podem ser criados sem chave real.
+"""
+import atexit
+import os
+import shutil
+import tempfile
+
+_tmp = tempfile.mkdtemp(prefix="maestroia-tests-")
+atexit.register(shutil.rmtree, _tmp, ignore_errors=True)
+os.environ.setdefault("OPENAI_API_KEY", "sk-test-placeholder")
+os.environ["DATABASE_URL"] = os.getenv("TEST_DATABASE_URL") or f"sqlite:///{os.path.join(_tmp, 'maestroia.db')}"
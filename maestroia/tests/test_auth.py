@@ -0,0 +1,78 @@
+import time
+import unittest
+from unittest.mock import patch
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from maestroia.core import auth
+from maestroia.core.database import Base, User
+
+
+class TestAuthCache(unittest.TestCase):
+    def setUp(self):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=engine)
+        self.queries = []
+        event.listen(engine, "before_cursor_execute", lambda *a: self.queries.append(a[2]))
+        self.session_factory = sessionmaker(bind=engine)
+        db = self.session_factory()
+        self.user = User(email="ana@x.com", hashed_password="x")
+        db.add(self.user)
+        db.commit()
+        self.user_id = self.user.id
+        db.close()
+
+        cache = auth.PrincipalCache(ttl_seconds=60, max_entries=2)
+        patcher = patch.multiple(auth, SessionLocal=self.session_factory, principal_cache=cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _token(self, **claims):
+        return auth.create_access_token({"sub": "ana@x.com", **claims})
+
+    def test_segunda_requisicao_nao_consulta_o_banco(self):
+        token = self._token(uid=self.user_id)
+        primeiro = auth.get_current_user(token)
+        self.assertEqual((primeiro.id, primeiro.email), (self.user_id, "ana@x.com"))
+        consultas = len(self.queries)
+        self.assertIs(auth.get_current_user(token), primeiro)
+        self.assertEqual(len(self.queries), consultas)
+
+    def test_token_antigo_sem_uid_continua_valido(self):
+        self.assertEqual(auth.get_current_user(self._token()).id, self.user_id)
+
+    def test_invalidacao_e_usuario_removido(self):
+        token = self._token(uid=self.user_id)
+        auth.get_current_user(token)
+        db = self.session_factory()
+        db.query(User).delete()
+        db.commit()
+        db.close()
+
+        auth.get_current_user(token)  # ainda no cache (TTL)
+        auth.invalidate_user("ana@x.com")
+        with self.assertRaises(HTTPException) as ctx:
+            auth.get_current_user(token)
+        self.assertEqual(ctx.exception.status_code, 401)
+
+    def test_uid_de_outro_usuario_e_rejeitado(self):
+        with self.assertRaises(HTTPException):
+            auth.get_current_user(self._token(uid=self.user_id + 1))
+        with self.assertRaises(HTTPException):
+            auth.get_current_user(self._token(uid="abc"))
+
+    def test_ttl_e_limite_de_entradas(self):
+        cache = auth.PrincipalCache(ttl_seconds=0.05, max_entries=2)
+        for i in range(3):
+            cache.put(f"u{i}@x.com", auth.Principal(id=i, email=f"u{i}@x.com"))
+        self.assertIsNone(cache.get("u0@x.com"))  # o mais antigo saiu pelo limite
+        self.assertEqual(cache.get("u2@x.com").id, 2)
+        time.sleep(0.06)
+        self.assertIsNone(cache.get("u2@x.com"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,181 @@
+import io
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from maestroia.core.database import Base, Campaign
+from maestroia.models.bulk import BulkJobRow
+from maestroia.services import campaign_bulk, campaign_search
+from maestroia.services.campaign_runner import CampaignRunner
+
+
+class _GrafoFalso:
+    """Falha nas campanhas cujo objetivo começa com "erro" enquanto `falhar` estiver ligado."""
+
+    def __init__(self):
+        self.falhar = True
+        self.simultaneas = 0
+        self.pico = 0
+        self._lock = threading.Lock()
+
+    def invoke(self, state):
+        self.ultimo_estado = state
+        with self._lock:
+            self.simultaneas += 1
+            self.pico = max(self.pico, self.simultaneas)
+        try:
+            time.sleep(0.02)
+            if self.falhar and state["objetivo"].startswith("erro"):
+                raise RuntimeError("timeout do provedor")
+            if self.falhar and state["objetivo"].startswith("limite"):
+                return {**state, "estrategia": "[FALLBACK OPENAI] Não foi possível contatar OPENAI: 429"}
+            return {**state, "estrategia": f"estratégia para {state['objetivo']}"}
+        finally:
+            with self._lock:
+                self.simultaneas -= 1
+
+
+CSV = """objetivo,publico_alvo,canais,orcamento
+vender tênis,jovens,instagram;email,"1500,50"
+erro na api,adultos,linkedin,100
+,sem objetivo,email,10
+lançar curso,profissionais,linkedin,abc
+limite do llm,jovens,email,
+crescer marca,jovens,tiktok|instagram,300
+"""
+
+
+class TestCampaignBulk(unittest.TestCase):
+    def setUp(self):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=engine)
+        campaign_search.create_index(engine)
+        self.session_factory = sessionmaker(bind=engine)
+        self.graph = _GrafoFalso()
+        patcher = patch.multiple(campaign_bulk.settings, BULK_MAX_CONCURRENCY=2, BULK_BACKOFF_SECONDS=0.01,
+                                 BULK_CAMPAIGNS_PER_MINUTE=0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _runner(self, **kwargs):
+        return campaign_bulk.BulkRunner(self.graph, 1, session_factory=self.session_factory, **kwargs)
+
+    def test_leitura_de_csv_e_jsonl(self):
+        linhas = list(campaign_bulk.parse_specs(io.StringIO(CSV), "csv"))
+        self.assertEqual(linhas[0], (1, {"objetivo": "vender tênis", "publico_alvo": "jovens",
+                                         "canais": ["instagram", "email"], "orcamento": 1500.5}, None))
+        self.assertEqual(linhas[5][1]["canais"], ["tiktok", "instagram"])
+        self.assertIn("objetivo", linhas[2][2])
+        self.assertIn("orçamento", linhas[3][2])
+
+        jsonl = '{"objetivo": "a", "publico_alvo": "b", "canais": ["email"]}\n\n[1, 2]\n{quebrado\n'
+        linhas = list(campaign_bulk.parse_specs(io.StringIO(jsonl), "jsonl"))
+        self.assertEqual([(n, e is None) for n, _, e in linhas], [(1, True), (3, False), (4, False)])
+
+    def test_so_campos_de_entrada_e_tenant_do_dono(self):
+        jsonl = ('{"objetivo": "a", "publico_alvo": "b", "tenant_id": "outro", '
+                 '"campanha_id": "c-9", "pesquisa": "injetada"}\n')
+        [(_, spec, erro)] = campaign_bulk.parse_specs(io.StringIO(jsonl), "jsonl")
+        self.assertIsNone(erro)
+        self.assertEqual(spec, {"objetivo": "a", "publico_alvo": "b", "canais": []})
+
+        # Spec antiga gravada com campos extras também não passa adiante no retry
+        runner = self._runner()
+        list(runner.run([(1, {**spec, "tenant_id": "outro"}, None)]))
+        self.assertEqual(self.graph.ultimo_estado,
+                         {"objetivo": "a", "publico_alvo": "b", "canais": [], "tenant_id": "1",
+                          "campanha_id": f"bulk-{runner.job_id}-1"})
+
+    def test_executa_grava_em_lotes_e_reprocessa_falhas(self):
+        runner = self._runner(commit_every=2)
+        eventos = list(runner.run(campaign_bulk.parse_specs(io.StringIO(CSV), "csv")))
+
+        self.assertEqual(eventos[0]["event"], "job")
+        por_linha = {e["row"]: e for e in eventos if e["event"] == "row"}
+        self.assertEqual({n: e["status"] for n, e in por_linha.items()},
+                         {1: "ok", 2: "failed", 3: "invalid", 4: "invalid", 5: "failed", 6: "ok"})
+        self.assertIn("timeout do provedor", por_linha[2]["error"])
+        self.assertIn("fallback", por_linha[5]["error"])
+        self.assertEqual(eventos[-1], {"event": "summary", "job_id": runner.job_id, "total": 6,
+                                       "ok": 2, "failed": 2, "invalid": 2})
+        self.assertLessEqual(self.graph.pico, 2)
+
+        db = self.session_factory()
+        self.addCleanup(db.close)
+        self.assertEqual(db.query(Campaign).count(), 2)
+        self.assertEqual(db.get(Campaign, por_linha[1]["campaign_id"]).canais, "instagram,email")
+
+        # Reprocessa só as falhas: as inválidas continuam esperando correção no arquivo
+        self.graph.falhar = False
+        retry = self._runner(job_id=runner.job_id)
+        eventos = list(retry.run(campaign_bulk.retry_rows(runner.job_id, self.session_factory)))
+        self.assertEqual(sorted(e["row"] for e in eventos if e["event"] == "row"), [2, 5])
+        self.assertEqual(eventos[-1]["ok"], 4)
+        self.assertEqual(eventos[-1]["failed"], 0)
+        self.assertEqual(db.query(Campaign).count(), 4)
+        linha = db.query(BulkJobRow).filter_by(job_id=runner.job_id, row_number=2).one()
+        self.assertEqual((linha.status, linha.attempts), ("ok", 2))
+
+        job = campaign_bulk.get_job(db, runner.job_id, 1)
+        self.assertEqual([r["row"] for r in job["failed_rows"]], [3, 4])
+        self.assertIsNone(campaign_bulk.get_job(db, runner.job_id, 2))
+
+    def test_fluxo_interrompido_nao_inicia_as_linhas_restantes(self):
+        specs = ((n, {"objetivo": f"campanha {n}", "publico_alvo": "x", "canais": []}, None) for n in range(1, 101))
+        eventos = self._runner(commit_every=1).run(specs)
+        next(eventos)  # job
+        next(eventos)  # primeira linha gravada
+        eventos.close()
+        time.sleep(0.1)
+        db = self.session_factory()
+        self.addCleanup(db.close)
+        self.assertLess(db.query(Campaign).count(), 10)
+
+        # Nenhuma linha fica sem registro: as não concluídas ficam `failed` para o retry
+        linhas = db.query(BulkJobRow).all()
+        self.assertEqual(sorted(r.row_number for r in linhas), list(range(1, 101)))
+        self.assertEqual({r.status for r in linhas} - {"ok"}, {"failed"})
+        job_id = linhas[0].job_id
+        job = campaign_bulk.get_job(db, job_id, 1)
+        self.assertEqual(job["status"], "interrupted")
+        self.assertEqual(job["ok"] + job["failed"], 100)
+
+        eventos = list(self._runner(job_id=job_id).run(campaign_bulk.retry_rows(job_id, self.session_factory)))
+        self.assertEqual(eventos[-1]["ok"], 100)
+        self.assertEqual(db.query(Campaign).count(), 100)
+
+    def test_divide_o_pool_das_campanhas_e_espera_vaga(self):
+        pool = CampaignRunner(max_concurrency=1, queue_size=0)
+        self.addCleanup(pool.shutdown)
+        liberar = threading.Event()
+        avulsa = pool.submit_future(liberar.wait, 5)  # campanha da API ocupando a única vaga
+        specs = [(n, {"objetivo": f"campanha {n}", "publico_alvo": "x", "canais": []}, None) for n in (1, 2, 3)]
+        runner = self._runner(campaign_runner=pool)
+        threading.Timer(0.3, liberar.set).start()
+
+        eventos = list(runner.run(specs))
+        self.assertTrue(avulsa.result(1))
+        self.assertEqual(eventos[-1]["ok"], 3)
+        self.assertEqual(self.graph.pico, 1)  # nunca passou da vaga do pool compartilhado
+        self.assertEqual(pool.admitted, 0)
+
+    def test_limite_de_lotes_simultaneos(self):
+        with patch.object(campaign_bulk, "_job_slots", None), \
+                patch.object(campaign_bulk.settings, "BULK_MAX_JOBS", 1):
+            primeiro, segundo = self._runner(), self._runner()
+            primeiro.reserve()
+            with self.assertRaises(campaign_bulk.BulkJobsSaturated):
+                segundo.reserve()
+            list(primeiro.run([]))  # terminar o lote devolve a vaga
+            segundo.reserve()
+            del segundo  # runner descartado sem rodar também devolve
+            self._runner().reserve()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import csv
+import gzip
+import io
+import json
+import tracemalloc
+import unittest
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from maestroia.core.database import Base, Campaign
+from maestroia.services import campaign_export, result_store
+
+
+class TestCampaignExport(unittest.TestCase):
+    def setUp(self):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=engine)
+        self.engine = engine
+        self.session_factory = sessionmaker(bind=engine)
+
+    def _popular(self, n, user_id=1):
+        with self.engine.begin() as conn:
+            conn.execute(Campaign.__table__.insert(), [
+                {"user_id": user_id, "objetivo": f"objetivo {i}, com vírgula", "publico_alvo": "jovens",
+                 "canais": "email,instagram", "orcamento": "100", "resultado": json.dumps({"n": i})}
+                for i in range(n)
+            ])
+
+    def _exportar(self, **kwargs):
+        return list(campaign_export.export_campaigns(1, session_factory=self.session_factory, **kwargs))
+
+    def test_ndjson_com_resultado_do_blob_e_legado(self):
+        self._popular(2)
+        db = self.session_factory()
+        ref = result_store.save_result(db, {"estrategia": "x" * 1000})
+        db.add(Campaign(user_id=1, objetivo="nova", canais="email", resultado_ref=ref))
+        db.add(Campaign(user_id=2, objetivo="de outro usuário", canais="email"))
+        db.commit()
+        db.close()
+
+        linhas = b"".join(self._exportar(include_result=True)).decode().splitlines()
+        itens = [json.loads(linha) for linha in linhas]
+        self.assertEqual([i["objetivo"] for i in itens], ["objetivo 0, com vírgula", "objetivo 1, com vírgula", "nova"])
+        self.assertEqual(itens[0]["canais"], ["email", "instagram"])
+        self.assertEqual(itens[1]["resultado"], {"n": 1})
+        self.assertEqual(itens[2]["resultado"], {"estrategia": "x" * 1000})
+        self.assertNotIn("resultado", json.loads(b"".join(self._exportar()).decode().splitlines()[0]))
+
+    def test_csv_gzip_em_blocos(self):
+        self._popular(5000)
+        blocos = self._exportar(fmt="csv", gzip=True)
+        self.assertGreater(len(blocos), 1)
+        linhas = list(csv.reader(io.StringIO(gzip.decompress(b"".join(blocos)).decode("utf-8"))))
+        self.assertEqual(linhas[0], list(campaign_export.COLUMNS))
+        self.assertEqual(len(linhas), 5001)
+        self.assertEqual(linhas[1][1:4], ["objetivo 0, com vírgula", "jovens", "email,instagram"])
+
+    def test_csv_vazio_tem_cabecalho_e_formato_invalido(self):
+        self.assertEqual(b"".join(self._exportar(fmt="csv")).decode().strip(), ",".join(campaign_export.COLUMNS))
+        with self.assertRaises(ValueError):
+            self._exportar(fmt="xml")
+
+    def test_memoria_nao_cresce_com_o_historico(self):
+        def pico(n):
+            with self.engine.begin() as conn:
+                conn.execute(Campaign.__table__.delete())
+            self._popular(n)
+            tracemalloc.start()
+            for _ in campaign_export.export_campaigns(1, include_result=True, session_factory=self.session_factory):
+                pass
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            return peak
+
+        pico(100)  # aquece caches de compilação do SQLAlchemy
+        pequeno, grande = pico(1000), pico(10000)
+        self.assertLess(grande, pequeno * 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
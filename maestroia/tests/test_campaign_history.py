@@ -0,0 +1,61 @@
+import json
+import unittest
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from maestroia.core.database import Base, Campaign
+from maestroia.services import campaign_history
+
+
+class TestCampaignHistory(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+        self.addCleanup(self.db.close)
+        for i in range(1, 26):
+            self.db.add(Campaign(user_id=1 if i % 5 else 2, objetivo=f"obj {i}", publico_alvo="jovens",
+                                 canais="instagram,email", orcamento="100",
+                                 resultado=json.dumps({"estrategia": "x" * 1000, "n": i})))
+        self.db.commit()
+
+    def test_percorre_todas_as_paginas_sem_repetir(self):
+        ids, cursor = [], None
+        while True:
+            page = campaign_history.list_history(self.db, 1, limit=7, cursor=cursor)
+            ids.extend(item["id"] for item in page["history"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        esperados = [i for i in range(25, 0, -1) if i % 5]
+        self.assertEqual(ids, esperados)
+
+    def test_resumo_nao_traz_resultado_e_respeita_campos(self):
+        page = campaign_history.list_history(self.db, 1, limit=2, fields="objetivo,canais")
+        self.assertEqual(page["history"][0], {"id": 24, "objetivo": "obj 24", "canais": ["instagram", "email"]})
+        with self.assertRaises(campaign_history.InvalidQuery):
+            campaign_history.list_history(self.db, 1, fields="resultado")
+        with self.assertRaises(campaign_history.InvalidQuery):
+            campaign_history.list_history(self.db, 1, cursor="%%%")
+
+    def test_detalhe_somente_do_dono(self):
+        detalhe = campaign_history.get_campaign(self.db, 1, 3)
+        self.assertEqual(detalhe["resultado"]["n"], 3)
+        self.assertIsNone(campaign_history.get_campaign(self.db, 2, 3))
+
+    def test_pagina_e_busca_por_indice_sem_ordenacao(self):
+        with self.engine.connect() as conn:
+            plano = conn.execute(text(
+                "EXPLAIN QUERY PLAN SELECT id, objetivo FROM campaigns "
+                "WHERE user_id = 1 AND id < 20 ORDER BY id DESC LIMIT 21"
+            )).fetchall()
+        detalhes = " ".join(str(linha[-1]) for linha in plano)
+        # No SQLite o id é o rowid: tanto ix_campaigns_user_id quanto o composto servem ao keyset
+        self.assertIn("SEARCH campaigns USING INDEX ix_campaigns_user_id", detalhes)
+        self.assertNotIn("TEMP B-TREE", detalhes)
+
+
+if __name__ == "__main__":
+    unittest.main()
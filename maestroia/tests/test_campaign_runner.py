@@ -0,0 +1,55 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from maestroia.services.campaign_runner import CampaignRunner, CampaignRunnerSaturated
+
+
+class TestCampaignRunner(unittest.TestCase):
+    def setUp(self):
+        self.runner = CampaignRunner(max_concurrency=2, queue_size=1)
+        self.addCleanup(self.runner.shutdown)
+
+    def test_event_loop_continua_livre_durante_a_campanha(self):
+        async def cenario():
+            campanha = asyncio.ensure_future(self.runner.submit(time.sleep, 0.3))
+            inicio = time.perf_counter()
+            await asyncio.sleep(0.01)  # um endpoint leve atendido no meio da campanha
+            latencia_leve = time.perf_counter() - inicio
+            await campanha
+            return latencia_leve
+
+        self.assertLess(asyncio.run(cenario()), 0.1)
+
+    def test_recusa_quando_execucao_e_fila_estao_cheias(self):
+        liberar = threading.Event()
+
+        async def cenario():
+            ocupadas = [asyncio.ensure_future(self.runner.submit(liberar.wait, 5)) for _ in range(3)]
+            await asyncio.sleep(0.05)
+            self.assertEqual(self.runner.admitted, 3)
+            with self.assertRaises(CampaignRunnerSaturated):
+                await self.runner.submit(lambda: None)
+            liberar.set()
+            await asyncio.gather(*ocupadas)
+            # Vagas devolvidas: volta a aceitar
+            return await self.runner.submit(lambda: "ok")
+
+        self.assertEqual(asyncio.run(cenario()), "ok")
+        self.assertEqual(self.runner.admitted, 0)
+
+    def test_erro_da_campanha_propaga_e_libera_a_vaga(self):
+        def falha():
+            raise ValueError("grafo falhou")
+
+        async def cenario():
+            with self.assertRaises(ValueError):
+                await self.runner.submit(falha)
+
+        asyncio.run(cenario())
+        self.assertEqual(self.runner.admitted, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import time
+import unittest
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from maestroia.core.database import Base, Campaign
+from maestroia.services import campaign_history, campaign_search
+
+
+class TestCampaignSearch(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=self.engine)
+        campaign_search.create_index(self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+        self.addCleanup(self.db.close)
+
+    def _add(self, user_id, objetivo, publico="adultos", **result):
+        state = {"objetivo": objetivo, "publico_alvo": publico, "canais": ["email"]}
+        return campaign_history.save_campaign(self.db, user_id, state, result).id
+
+    def test_relevancia_trecho_e_isolamento_por_usuario(self):
+        so_pesquisa = self._add(1, "lançar app", pesquisa="o mercado de tênis de corrida cresceu")
+        no_objetivo = self._add(1, "vender tênis de corrida", estrategia="foco em maratonistas")
+        self._add(2, "vender tênis", conteudos=["post sobre tênis"])
+        self.db.commit()
+
+        page = campaign_search.search(self.db, 1, "tenis corr")  # sem acento e com prefixo
+        self.assertEqual([r["id"] for r in page["results"]], [no_objetivo, so_pesquisa])
+        self.assertIn("[tênis]", page["results"][0]["trecho"])
+        self.assertIn("[tênis]", page["results"][1]["trecho"])
+        self.assertNotIn("u1", page["results"][1]["trecho"])
+
+        self.assertEqual(campaign_search.search(self.db, 2, "maratonistas")["results"], [])
+        # Termo igual ao marcador do dono não vaza campanhas de outro usuário
+        self.assertEqual(campaign_search.search(self.db, 2, "u1")["results"], [])
+        # Índice contentless: o texto fica só no result_store
+        self.assertIsNone(self.db.execute(text("SELECT pesquisa FROM campaigns_fts LIMIT 1")).scalar())
+
+    def test_campanha_antiga_relevante_nao_fica_fora_do_ranking(self):
+        antiga = self._add(1, "tênis tênis tênis de corrida", estrategia="tênis para maratona")
+        for i in range(1500):
+            self._add(1, f"campanha {i}", conteudos=[f"post {i} com um tênis de brinde no rodapé do texto"])
+        self.db.commit()
+
+        page = campaign_search.search(self.db, 1, "tenis")
+        self.assertEqual(page["results"][0]["id"], antiga)
+
+    def test_rebuild_reindexa_a_partir_do_result_store(self):
+        campanha = self._add(1, "lançar app", pesquisa="tênis de corrida")
+        self.db.commit()
+        self.db.execute(text("INSERT INTO campaigns_fts (campaigns_fts) VALUES ('delete-all')"))
+        self.db.commit()
+        self.assertEqual(campaign_search.search(self.db, 1, "tenis")["results"], [])
+
+        self.assertEqual(campaign_search.rebuild(sessionmaker(bind=self.engine)), 1)
+        page = campaign_search.search(self.db, 1, "tenis")
+        self.assertEqual([r["id"] for r in page["results"]], [campanha])
+        self.assertIn("[tênis]", page["results"][0]["trecho"])
+
+    def test_paginacao_e_consultas_invalidas(self):
+        for i in range(7):
+            self._add(1, f"campanha de verão {i}")
+        self.db.commit()
+
+        ids, cursor = [], None
+        while True:
+            page = campaign_search.search(self.db, 1, "verao", limit=3, cursor=cursor)
+            ids.extend(r["id"] for r in page["results"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        self.assertEqual(sorted(ids), list(range(1, 8)))
+
+        for consulta in ("", '"*) (', "  -- "):
+            with self.assertRaises(campaign_search.InvalidSearch):
+                campaign_search.search(self.db, 1, consulta)
+        self.assertEqual(campaign_search.search(self.db, 1, 'verão" OR owner:u2')["results"], [])
+
+    def test_milhares_de_campanhas_por_usuario(self):
+        palavras = "marca produto cliente venda oferta loja desconto frete cupom lançamento".split()
+        campanhas, indice = [], []
+        for i in range(1, 40001):
+            user_id = i % 4
+            objetivo = f"{palavras[i % 10]} {palavras[(i * 7) % 10]} {i}"
+            pesquisa = " ".join(palavras[(i * j) % 10] for j in range(3, 40))
+            campanhas.append({"id": i, "user_id": user_id, "objetivo": objetivo, "canais": "email"})
+            indice.append({"id": i, "owner": f"u{user_id}", "objetivo": objetivo, "publico_alvo": "",
+                           "pesquisa": pesquisa, "estrategia": "", "conteudos": ""})
+        with self.engine.begin() as conn:
+            conn.execute(Campaign.__table__.insert(), campanhas)
+            conn.exec_driver_sql(
+                "INSERT INTO campaigns_fts (rowid, owner, objetivo, publico_alvo, pesquisa, estrategia, conteudos) "
+                "VALUES (:id, :owner, :objetivo, :publico_alvo, :pesquisa, :estrategia, :conteudos)", indice
+            )
+
+        tempos = []
+        for _ in range(21):
+            inicio = time.perf_counter()
+            page = campaign_search.search(self.db, 1, "cupom frete")
+            tempos.append(time.perf_counter() - inicio)
+        self.assertEqual(len(page["results"]), campaign_search.DEFAULT_LIMIT)
+        self.assertTrue(all(r["id"] % 4 == 1 for r in page["results"]))
+        self.assertLess(sorted(tempos)[10], 0.05)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import tempfile
+import unittest
+
+from sqlalchemy import text
+from sqlalchemy.pool import QueuePool, StaticPool
+
+from maestroia.core.database import make_engine
+
+
+class TestMakeEngine(unittest.TestCase):
+    def test_sqlite_em_arquivo_recebe_os_pragmas(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = make_engine(f"sqlite:///{tmp}/teste.db")
+            try:
+                with engine.connect() as conn:
+                    pragma = lambda nome: conn.execute(text(f"PRAGMA {nome}")).scalar()
+                    self.assertEqual(pragma("journal_mode"), "wal")
+                    self.assertEqual(pragma("synchronous"), 1)  # NORMAL
+                    self.assertGreater(pragma("busy_timeout"), 0)
+                    self.assertLess(pragma("cache_size"), 0)  # em KiB
+                self.assertIsInstance(engine.pool, QueuePool)
+            finally:
+                engine.dispose()
+
+    def test_sqlite_em_memoria_usa_uma_conexao(self):
+        engine = make_engine("sqlite://")
+        self.assertIsInstance(engine.pool, StaticPool)
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE t (x INTEGER)"))
+        with engine.connect() as conn:
+            self.assertEqual(conn.execute(text("SELECT count(*) FROM t")).scalar(), 0)
+
+    def test_pool_do_postgres(self):
+        try:
+            engine = make_engine("postgresql+psycopg2://u:p@localhost/maestroia", pool_size=3)
+        except ImportError:
+            self.skipTest("psycopg2 não instalado")
+        self.assertEqual(engine.pool.size(), 3)
+        self.assertTrue(engine.pool._pre_ping)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import subprocess
+import sys
+import unittest
+
+from fastapi.testclient import TestClient
+
+from maestroia.devtools.fake_llm import FakeLLM, FakeOpenAIClient, create_app
+
+
+class TestFakeLLM(unittest.TestCase):
+    def test_respostas_deterministicas_no_formato_do_agente(self):
+        client = FakeOpenAIClient(FakeLLM(completion_tokens=120))
+        prompt = "Você é um estrategista de marketing digital sênior.\nObjetivo: Vender yoga\nCanais: Instagram"
+        primeira = client.chat.completions.create(model="fake-gpt", messages=[{"role": "user", "content": prompt}])
+        segunda = client.chat.completions.create(model="fake-gpt", messages=[{"role": "user", "content": prompt}])
+
+        texto = primeira.choices[0].message.content
+        self.assertEqual(texto, segunda.choices[0].message.content)
+        self.assertIn("**Posicionamento:**", texto)
+        self.assertIn("KPIs", texto)
+        self.assertAlmostEqual(primeira.usage.completion_tokens, 120, delta=5)
+
+    def test_embeddings_aproximam_textos_parecidos(self):
+        llm = FakeLLM(embedding_dim=256)
+        base = llm.embed("cursos de yoga para mulheres")
+        parecido = llm.embed("cursos de yoga para mulheres iniciantes")
+        diferente = llm.embed("consultoria tributária para indústrias")
+
+        def cos(a, b):
+            return sum(x * y for x, y in zip(a, b))
+
+        self.assertGreater(cos(base, parecido), 0.8)
+        self.assertLess(cos(base, diferente), 0.3)
+
+    def test_servidor_http_compativel_com_openai(self):
+        client = TestClient(create_app(FakeLLM(completion_tokens=50)))
+        resposta = client.post("/v1/chat/completions", json={
+            "model": "fake-gpt", "messages": [{"role": "user", "content": "Otimize com base em métricas"}],
+        }).json()
+        self.assertEqual(resposta["object"], "chat.completion")
+        self.assertTrue(resposta["choices"][0]["message"]["content"].startswith("1. Realocar"))
+
+        embeddings = client.post("/v1/embeddings", json={"input": ["a", "b"]}).json()
+        self.assertEqual(len(embeddings["data"]), 2)
+        self.assertEqual(len(embeddings["data"][0]["embedding"]), 1536)
+
+    def test_grafo_completo_sem_chaves_de_api(self):
+        env = {k: v for k, v in os.environ.items() if k not in ("OPENAI_API_KEY", "GROQ_API_KEY")}
+        env.update(LLM_PROVIDER="fake", PUBLISH_MODE="direct", MEMORY_REUSE_ENABLED="false")
+        script = (
+            "from maestroia.graphs.marketing_graph import build_marketing_graph\n"
+            "r = build_marketing_graph().invoke({'objetivo': 'Vender yoga', 'publico_alvo': 'Mulheres',"
+            " 'canais': ['Instagram'], 'orcamento': 100})\n"
+            "assert '## Tendências' in r['pesquisa'] and r['conteudos'], r\n"
+        )
+        result = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True, timeout=120)
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
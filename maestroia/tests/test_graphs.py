@@ -0,0 +1,25 @@
+import unittest
+
+from langgraph.graph import StateGraph, END
+
+from maestroia.core.state import MaestroState
+from maestroia.graphs.marketing_graph import _timed
+
+
+class TestMarketingGraph(unittest.TestCase):
+    def test_tempos_por_no_acumulam_no_estado(self):
+        graph = StateGraph(MaestroState)
+        graph.add_node("pesquisador", _timed("pesquisador", lambda state: {"pesquisa": "p"}))
+        graph.add_node("estrategista", _timed("estrategista", lambda state: {"estrategia": state["pesquisa"] + "e"}))
+        graph.set_entry_point("pesquisador")
+        graph.add_edge("pesquisador", "estrategista")
+        graph.add_edge("estrategista", END)
+
+        result = graph.compile().invoke({"objetivo": "x"})
+        self.assertEqual(result["estrategia"], "pe")
+        self.assertEqual(set(result["tempos_nos"]), {"pesquisador", "estrategista"})
+        self.assertTrue(all(t >= 0 for t in result["tempos_nos"].values()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,12 +1,7 @@
-import os
 import unittest
 
 
 class TestIntegrationsFallbacks(unittest.TestCase):
-    def setUp(self):
-        # Garantir que settings não quebre por ausência de chave real
-        os.environ.setdefault("OPENAI_API_KEY", "sk-test-placeholder")
-
     def test_openai_service_fallback(self):
         from maestroia.services import openai_service
 
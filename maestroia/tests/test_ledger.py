@@ -0,0 +1,88 @@
+import unittest
+from decimal import Decimal
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from maestroia.core.database import Base, import_models
+from maestroia.services import ledger
+
+import_models()
+from maestroia.models.finance import Account, Entry, Transaction, Wallet  # noqa: E402
+
+
+class TestLedger(unittest.TestCase):
+    def setUp(self):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=engine)
+        self.queries = []
+        event.listen(engine, "before_cursor_execute", lambda *a: self.queries.append(a[2]))
+        self.session_factory = sessionmaker(bind=engine)
+        db = self.session_factory()
+        db.add(Account(id=1, email="ana@x.com"))
+        db.add_all(Wallet(id=i, account_id=1, currency="BRL", balance=100) for i in range(1, 13))
+        db.commit()
+        db.close()
+
+    def _criar(self, postings, **kwargs):
+        self.queries.clear()
+        return ledger.create_transaction("teste", postings, session_factory=self.session_factory, **kwargs)
+
+    def _saldos(self):
+        db = self.session_factory()
+        try:
+            return {w.id: Decimal(str(w.balance)) for w in db.query(Wallet)}
+        finally:
+            db.close()
+
+    def test_lanca_e_ajusta_os_saldos(self):
+        resultado = self._criar([
+            {"wallet_id": 1, "amount": "30", "is_debit": True},
+            {"wallet_id": 2, "amount": "20"},
+            {"wallet_id": 2, "amount": "10"},
+        ], metadata={"origem": "campanha"})
+        self.assertEqual(resultado["status"], "ok")
+        saldos = self._saldos()
+        self.assertEqual((saldos[1], saldos[2]), (Decimal("70"), Decimal("130")))
+        db = self.session_factory()
+        self.addCleanup(db.close)
+        self.assertEqual(db.query(Entry).count(), 3)
+        self.assertEqual(db.get(Transaction, resultado["transaction_id"]).meta, {"origem": "campanha"})
+
+    def test_transacao_invalida_nao_toca_no_banco(self):
+        for postings, mensagem in [
+            ([{"wallet_id": 1, "amount": "30", "is_debit": True}, {"wallet_id": 2, "amount": "20"}], "not balanced"),
+            ([{"wallet_id": 1, "amount": "-5", "is_debit": True}, {"wallet_id": 2, "amount": "-5"}], "Invalid amount"),
+            ([], "no postings"),
+        ]:
+            resultado = self._criar(postings)
+            self.assertEqual(resultado["status"], "error")
+            self.assertIn(mensagem, resultado["message"])
+            self.assertEqual(self.queries, [])
+
+    def test_carteira_inexistente_nao_grava_nada(self):
+        resultado = self._criar([{"wallet_id": 1, "amount": "5", "is_debit": True},
+                                 {"wallet_id": 99, "amount": "5"}])
+        self.assertEqual(resultado, {"status": "error", "message": "Wallet 99 not found"})
+        self.assertFalse([q for q in self.queries if not q.lstrip().upper().startswith("SELECT")])
+        self.assertEqual(set(self._saldos().values()), {Decimal("100")})
+
+    def test_idas_ao_banco_nao_crescem_com_os_postings(self):
+        self._criar([{"wallet_id": 1, "amount": "2", "is_debit": True}, {"wallet_id": 2, "amount": "2"}])
+        duas = len(self.queries)
+        postings = [{"wallet_id": 1, "amount": "11", "is_debit": True}]
+        postings += [{"wallet_id": i, "amount": "1"} for i in range(2, 13)]
+        self.assertEqual(self._criar(postings)["status"], "ok")
+        self.assertEqual(len(self.queries), duas)
+        self.assertEqual(self._saldos()[12], Decimal("101"))
+
+    def test_trava_as_carteiras_em_ordem_de_id(self):
+        sql = str(ledger.lock_wallets_statement({7, 3, 5}).compile(dialect=postgresql.dialect()))
+        self.assertIn("ORDER BY wallets.id", sql)
+        self.assertTrue(sql.rstrip().endswith("FOR UPDATE"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import tempfile
+import threading
+import unittest
+from decimal import Decimal
+
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from maestroia.core.database import Base, import_models, make_engine
+from maestroia.services.ledger_writer import LedgerBatchWriter, LedgerWriterSaturated
+
+import_models()
+from maestroia.models.finance import Account, Entry, Wallet  # noqa: E402
+
+
+def _par(debito, credito, valor="1"):
+    return [{"wallet_id": debito, "amount": valor, "is_debit": True}, {"wallet_id": credito, "amount": valor}]
+
+
+class TestLedgerBatchWriter(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        engine = make_engine(f"sqlite:///{tmp.name}/razao.db")
+        self.addCleanup(engine.dispose)
+        Base.metadata.create_all(bind=engine)
+        self.commits = []
+        event.listen(engine, "commit", lambda conn: self.commits.append(1))
+        self.session_factory = sessionmaker(bind=engine)
+        db = self.session_factory()
+        db.add(Account(id=1, email="ana@x.com"))
+        db.add_all(Wallet(id=i, account_id=1, currency="BRL", balance=100) for i in range(1, 5))
+        db.commit()
+        db.close()
+        self.commits.clear()
+
+    def _writer(self, **kwargs):
+        kwargs.setdefault("max_delay_ms", 50)
+        writer = LedgerBatchWriter(self.session_factory, **kwargs)
+        self.addCleanup(writer.close)
+        return writer
+
+    def _saldos(self):
+        db = self.session_factory()
+        try:
+            return {w.id: Decimal(str(w.balance)) for w in db.query(Wallet)}
+        finally:
+            db.close()
+
+    def _travar_gravacao(self, writer):
+        """Segura a thread do gravador até o evento ser liberado, para a fila encher."""
+        parado, liberar = threading.Event(), threading.Event()
+        original = writer._commit_group
+
+        def lento(batch):
+            parado.set()
+            liberar.wait(5)
+            return original(batch)
+
+        writer._commit_group = lento
+        writer.submit("aquecimento", _par(1, 2))
+        self.assertTrue(parado.wait(5))
+        return liberar
+
+    def test_lote_grava_com_um_commit(self):
+        writer = self._writer()
+        liberar = self._travar_gravacao(writer)
+        futuros = [writer.submit("uso", _par(1, 2)) for _ in range(10)]
+        liberar.set()
+        resultados = [f.result(5) for f in futuros]
+        self.assertTrue(all(r["status"] == "ok" for r in resultados))
+        self.assertEqual(len({r["transaction_id"] for r in resultados}), 10)
+        self.assertEqual(len(self.commits), 2)  # aquecimento + o lote
+        saldos = self._saldos()
+        self.assertEqual((saldos[1], saldos[2]), (Decimal("89"), Decimal("111")))
+
+    def test_transacao_invalida_falha_sozinha(self):
+        writer = self._writer()
+        nao_fecha = writer.submit("uso", [{"wallet_id": 1, "amount": "5", "is_debit": True}])
+        self.assertTrue(nao_fecha.done())
+        self.assertIn("not balanced", nao_fecha.result()["message"])
+
+        liberar = self._travar_gravacao(writer)
+        boa = writer.submit("uso", _par(3, 4, "7"))
+        sem_carteira = writer.submit("uso", _par(3, 99, "7"))
+        liberar.set()
+        self.assertEqual(boa.result(5)["status"], "ok")
+        self.assertEqual(sem_carteira.result(5), {"status": "error", "message": "Wallet 99 not found"})
+        saldos = self._saldos()
+        self.assertEqual((saldos[3], saldos[4]), (Decimal("93"), Decimal("107")))
+        db = self.session_factory()
+        self.addCleanup(db.close)
+        self.assertEqual(db.query(Entry).count(), 4)  # aquecimento + a boa
+
+    def test_fila_cheia_levanta_saturacao(self):
+        writer = self._writer(max_pending=2)
+        liberar = self._travar_gravacao(writer)
+        self.addCleanup(liberar.set)
+        writer.submit("uso", _par(1, 2))
+        writer.submit("uso", _par(1, 2))
+        with self.assertRaises(LedgerWriterSaturated):
+            writer.submit("uso", _par(1, 2))
+
+    def test_close_grava_o_que_estava_na_fila(self):
+        writer = self._writer(max_delay_ms=10_000)
+        futuros = [writer.submit("uso", _par(2, 1)) for _ in range(3)]
+        writer.close(5)
+        self.assertTrue(all(f.result(0)["status"] == "ok" for f in futuros))
+        self.assertEqual(self._saldos()[1], Decimal("103"))
+        with self.assertRaises(RuntimeError):
+            writer.submit("uso", _par(2, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
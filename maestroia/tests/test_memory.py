@@ -0,0 +1,120 @@
+import time
+import unittest
+from unittest.mock import patch
+
+
+def _bag_of_words(text, dims=64):
+    # Embedding determinístico: textos com as mesmas palavras ficam próximos
+    vec = [0.0] * dims
+    for word in text.lower().split():
+        vec[sum(map(ord, word)) % dims] += 1.0
+    return vec
+
+
+class TestCampaignMemory(unittest.TestCase):
+    def setUp(self):
+        from maestroia.memory import store
+        store.reset_campaign_memory()
+        self.store = store
+        patcher = patch("maestroia.memory.vector.get_embedding", _bag_of_words)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_lookup_is_isolated_per_tenant(self):
+        inputs = {"objetivo": "Vender cursos de yoga", "publico_alvo": "Mulheres 30-45"}
+        self.store.store_campaign_memory("pesquisa", "cliente-a", inputs, "pesquisa A", 12.0)
+
+        self.assertIsNone(self.store.lookup_campaign_memory("pesquisa", "cliente-b", inputs))
+        hit = self.store.lookup_campaign_memory("pesquisa", "cliente-a", inputs)
+        self.assertEqual(hit["modo"], "reuso")
+        self.assertEqual(hit["output"], "pesquisa A")
+
+    def test_sem_tenant_nao_grava_nem_consulta(self):
+        inputs = {"objetivo": "Vender cursos de yoga", "publico_alvo": "Mulheres 30-45"}
+        self.store.store_campaign_memory("pesquisa", None, inputs, "pesquisa sem dono", 12.0)
+        self.store.store_campaign_memory("pesquisa", "cliente-a", inputs, "pesquisa A", 12.0)
+
+        self.assertIsNone(self.store.lookup_campaign_memory("pesquisa", None, inputs))
+        self.assertIsNone(self.store.lookup_campaign_memory("pesquisa", "", inputs))
+        self.assertEqual(self.store.lookup_campaign_memory("pesquisa", "cliente-a", inputs)["output"], "pesquisa A")
+
+    def test_pesquisador_reuses_prior_research(self):
+        from maestroia.agents import pesquisador
+
+        state = {"objetivo": "Vender cursos de yoga", "publico_alvo": "Mulheres 30-45", "tenant_id": "t1"}
+        with patch.object(pesquisador, "openai_chat", return_value="análise completa") as chat, \
+                patch.object(pesquisador, "get_trends_summary", return_value="Dados do Google Trends"):
+            first = pesquisador.agente_pesquisador(state)
+            calls_first = chat.call_count
+            second = pesquisador.agente_pesquisador(state)
+
+        self.assertEqual(first["reuso_memoria"]["pesquisa"]["modo"], "completo")
+        self.assertEqual(second["reuso_memoria"]["pesquisa"]["modo"], "reuso")
+        self.assertEqual(second["pesquisa"], "análise completa")
+        self.assertEqual(chat.call_count, calls_first)
+
+        stats = self.store.memory_stats()
+        self.assertEqual(stats["reusos"], 1)
+        self.assertEqual(stats["taxa_acerto"], 0.5)
+
+    def test_resposta_de_fallback_nao_vira_memoria(self):
+        from maestroia.agents import pesquisador
+
+        state = {"objetivo": "Vender cursos de yoga", "publico_alvo": "Mulheres 30-45", "tenant_id": "t1"}
+        aviso = "[FALLBACK OPENAI] Não foi possível contatar OPENAI: timeout. Prompt: ..."
+        with patch.object(pesquisador, "openai_chat", return_value=aviso), \
+                patch.object(pesquisador, "get_trends_summary", return_value="Dados do Google Trends"):
+            pesquisador.agente_pesquisador(state)
+            segunda = pesquisador.agente_pesquisador(state)
+        self.assertEqual(segunda["reuso_memoria"]["pesquisa"]["modo"], "completo")
+        self.assertIsNone(self.store.lookup_campaign_memory("pesquisa", "t1", state))
+
+        # Entrada antiga gravada antes do filtro também não é servida
+        entradas = {"objetivo": state["objetivo"], "publico_alvo": state["publico_alvo"]}
+        self.store._campaign_store("pesquisa", "t1").add_document(
+            self.store.campaign_memory_text(entradas),
+            {"output": aviso, "inputs": entradas, "duration_s": 1.0, "created_at": time.time()},
+        )
+        self.assertIsNone(self.store.lookup_campaign_memory("pesquisa", "t1", entradas))
+
+
+def _um_por_numero(text, dims=64):
+    # "campanha 7" -> vetor canônico 7: documentos distintos sem colisão
+    vec = [0.0] * dims
+    vec[int(text.split()[-1])] = 1.0
+    return vec
+
+
+class TestVectorStore(unittest.TestCase):
+    def setUp(self):
+        patcher = patch("maestroia.memory.vector.get_embedding", _um_por_numero)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _stores(self, **kwargs):
+        from maestroia.memory.vector import VectorStore
+        com_indice, numpy = VectorStore(dim=64, **kwargs), VectorStore(dim=64, **kwargs)
+        numpy.index = None  # caminho sem FAISS
+        return com_indice, numpy
+
+    def test_cheio_descarta_os_mais_antigos(self):
+        for vs in self._stores(max_items=20):
+            for i in range(25):
+                vs.add_document(f"campanha {i}", {"n": i})
+            self.assertLessEqual(len(vs), 20)
+            self.assertNotIn(0, [m["n"] for m in vs.metadatas])
+            doc, meta, sim = vs.search_with_scores("campanha 24", k=1)[0]
+            self.assertEqual(meta["n"], 24)
+            self.assertAlmostEqual(sim, 1.0, places=5)
+
+    def test_cheio_descarta_primeiro_os_expirados(self):
+        for vs in self._stores(max_items=4, is_expired=lambda meta: meta["velho"]):
+            for i, velho in enumerate([False, True, False, True]):
+                vs.add_document(f"campanha {i}", {"n": i, "velho": velho})
+            vs.add_document("campanha 4", {"n": 4, "velho": False})
+            self.assertEqual([m["n"] for m in vs.metadatas], [0, 2, 4])
+            self.assertEqual(vs.search_with_scores("campanha 2", k=1)[0][1]["n"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import threading
+import unittest
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from maestroia.core import metrics
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.registry = metrics.Registry()
+
+    def test_contador_soma_os_shards_de_todas_as_threads(self):
+        counter = metrics.Counter("t_total", "teste", ("rota",), registry=self.registry)
+
+        def worker():
+            for _ in range(1000):
+                counter.inc(rota="/a")
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(counter.value(rota="/a"), 8000)
+        self.assertIn('t_total{rota="/a"} 8000', self.registry.render())
+
+    def test_shard_de_thread_encerrada_vai_para_o_total_base(self):
+        counter = metrics.Counter("t_total", "teste", registry=self.registry)
+        hist = metrics.Histogram("t_seconds", "teste", buckets=(1.0,), registry=self.registry)
+
+        def worker():
+            counter.inc()
+            hist.observe(0.5)
+
+        for _ in range(200):
+            t = threading.Thread(target=worker)
+            t.start()
+            t.join()
+
+        self.assertLessEqual(len(counter._shards), 1)
+        self.assertLessEqual(len(hist._shards), 1)
+        self.assertEqual(counter.value(), 200)
+        self.assertEqual(hist.count(), 200)
+        self.assertIn('t_seconds_bucket{le="1"} 200', self.registry.render())
+
+    def test_histograma_no_formato_prometheus(self):
+        hist = metrics.Histogram("t_seconds", "teste", ("no",), buckets=(0.1, 1.0), registry=self.registry)
+        for value in (0.05, 0.1, 0.5, 3.0):
+            hist.observe(value, no="pesquisador")
+
+        texto = self.registry.render()
+        self.assertIn("# TYPE t_seconds histogram", texto)
+        self.assertIn('t_seconds_bucket{no="pesquisador",le="0.1"} 2', texto)
+        self.assertIn('t_seconds_bucket{no="pesquisador",le="1"} 3', texto)
+        self.assertIn('t_seconds_bucket{no="pesquisador",le="+Inf"} 4', texto)
+        self.assertIn('t_seconds_count{no="pesquisador"} 4', texto)
+        self.assertIn('t_seconds_sum{no="pesquisador"} 3.65', texto)
+
+    def test_gauge_por_callback_e_escape_de_rotulos(self):
+        gauge = metrics.Gauge("t_fila", "teste", ("queue",), registry=self.registry)
+        gauge.set_function(lambda: 7, queue='out"box')
+        gauge.set_function(lambda: 1 / 0, queue="quebrada")
+        texto = self.registry.render()
+        self.assertIn('t_fila{queue="out\\"box"} 7', texto)
+        self.assertNotIn("quebrada", texto)
+
+    def test_endpoint_metrics_e_middleware(self):
+        app = FastAPI()
+        metrics.install_fastapi(app, "teste")
+
+        @app.get("/item/{item_id}")
+        def item(item_id: int):
+            return {"id": item_id}
+
+        client = TestClient(app)
+        client.get("/item/1")
+        client.get("/item/2")
+        resposta = client.get("/metrics")
+
+        self.assertEqual(resposta.status_code, 200)
+        self.assertTrue(resposta.headers["content-type"].startswith("text/plain"))
+        self.assertGreaterEqual(
+            metrics.HTTP_REQUESTS.value(app="teste", method="GET", route="/item/{item_id}", status=200), 2
+        )
+        self.assertIn("maestroia_http_request_duration_seconds_bucket", resposta.text)
+
+    def test_query_com_erro_nao_deixa_estado_na_conexao(self):
+        from sqlalchemy import create_engine, text
+        from sqlalchemy.exc import OperationalError
+
+        engine = metrics.instrument_engine(create_engine("sqlite://"))
+        self.addCleanup(engine.dispose)
+        antes = metrics.DB_QUERY_DURATION.count(operation="SELECT")
+        with engine.connect() as conn:
+            for _ in range(3):
+                with self.assertRaises(OperationalError):
+                    conn.execute(text("SELECT * FROM tabela_que_nao_existe"))
+            conn.execute(text("SELECT 1"))
+            self.assertEqual([k for k in conn.info if k.startswith("maestroia")], [])
+        self.assertEqual(metrics.DB_QUERY_DURATION.count(operation="SELECT"), antes + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from sqlalchemy import inspect, text
+
+from maestroia.core.database import make_engine, init_db
+from maestroia.core.query_plans import check_query_plans
+
+
+class TestMigrations(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "maestroia.db")
+
+    def _engine(self):
+        engine = make_engine(f"sqlite:///{self.path}")
+        self.addCleanup(engine.dispose)
+        return engine
+
+    def test_banco_novo_vai_ate_a_ultima_revisao_e_usa_os_indices(self):
+        engine = self._engine()
+        init_db(engine)
+        with engine.connect() as conn:
+            self.assertEqual(conn.execute(text("SELECT version_num FROM alembic_version")).scalar(), "0003")
+        tabelas = set(inspect(engine).get_table_names())
+        self.assertTrue({"users", "campaigns", "wallets", "entries", "campaigns_fts"} <= tabelas)
+        self.assertEqual(check_query_plans(engine), {})
+
+    def test_adota_banco_criado_pelo_create_all_antigo(self):
+        conn = sqlite3.connect(self.path)
+        conn.executescript("""
+            CREATE TABLE users (id INTEGER NOT NULL, email VARCHAR, hashed_password VARCHAR, PRIMARY KEY (id));
+            CREATE UNIQUE INDEX ix_users_email ON users (email);
+            CREATE TABLE campaigns (id INTEGER NOT NULL, user_id INTEGER, objetivo VARCHAR, publico_alvo VARCHAR,
+                                    canais VARCHAR, orcamento VARCHAR, resultado VARCHAR, PRIMARY KEY (id));
+            CREATE INDEX ix_campaigns_user_id ON campaigns (user_id);
+            CREATE INDEX ix_campaigns_user_id_id ON campaigns (user_id, id);
+            INSERT INTO users (email, hashed_password) VALUES ('ana@x.com', 'h');
+            INSERT INTO campaigns (user_id, objetivo) VALUES (1, 'vender');
+        """)
+        conn.close()
+
+        engine = self._engine()
+        init_db(engine)
+        inspector = inspect(engine)
+        self.assertIn("campanhas_mes", {c["name"] for c in inspector.get_columns("users")})
+        self.assertIn("resultado_ref", {c["name"] for c in inspector.get_columns("campaigns")})
+        indices = {i["name"] for i in inspector.get_indexes("campaigns")}
+        self.assertIn("ix_campaigns_user_id_id_desc", indices)
+        self.assertFalse({"ix_campaigns_user_id", "ix_campaigns_user_id_id"} & indices)
+        with engine.connect() as conn:
+            self.assertEqual(conn.execute(text("SELECT objetivo FROM campaigns")).scalar(), "vender")
+
+    def test_aponta_consulta_que_cai_em_varredura(self):
+        engine = self._engine()
+        init_db(engine)
+        with engine.begin() as conn:
+            conn.execute(text("DROP INDEX ix_entries_wallet_id_timestamp"))
+        problemas = check_query_plans(engine)
+        self.assertEqual(list(problemas), ["extrato_carteira"])
+        self.assertTrue(problemas["extrato_carteira"][0].startswith("SCAN entries"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import socket
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+import uvicorn
+from fastapi.testclient import TestClient
+
+from maestroia.devtools.mock_platforms import MockConfig, create_app
+from maestroia.services import publishers
+
+
+class TestMockPlatforms(unittest.TestCase):
+    def test_limite_de_taxa_responde_429_com_retry_after(self):
+        client = TestClient(create_app(MockConfig(rate_limit=2, rate_window_seconds=30)))
+        headers = {"Authorization": "Bearer tok-a"}
+        codigos = [client.post("/v2/ugcPosts", json={}, headers=headers).status_code for _ in range(3)]
+        self.assertEqual(codigos, [201, 201, 429])
+
+        bloqueada = client.post("/v2/ugcPosts", json={}, headers=headers)
+        self.assertGreater(int(bloqueada.headers["Retry-After"]), 0)
+        # O limite é por token
+        self.assertEqual(client.post("/v2/ugcPosts", json={}, headers={"Authorization": "Bearer tok-b"}).status_code, 201)
+
+    def test_taxa_de_erro_e_latencia(self):
+        client = TestClient(create_app(MockConfig(error_rate=1.0, latency="fixed", latency_ms=50, seed=1)))
+        inicio = time.perf_counter()
+        resposta = client.post("/me/feed", data={"message": "oi"})
+        self.assertIn(resposta.status_code, (500, 503))
+        self.assertGreaterEqual(time.perf_counter() - inicio, 0.05)
+        self.assertEqual(client.get("/_stats").json()["total"], 1)
+
+    def test_distribuicoes_de_latencia(self):
+        import random
+        rng = random.Random(0)
+        uniforme = MockConfig(latency="uniform", latency_ms=10, latency_max_ms=20)
+        self.assertTrue(all(0.01 <= uniforme.sample_latency(rng) <= 0.02 for _ in range(100)))
+        lognormal = MockConfig(latency="lognormal", latency_ms=100, latency_sigma=0.5)
+        amostras = sorted(lognormal.sample_latency(rng) for _ in range(1000))
+        self.assertAlmostEqual(amostras[500], 0.1, delta=0.02)
+
+
+class TestPublicadoresContraMock(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+        cls.server = uvicorn.Server(uvicorn.Config(create_app(), host="127.0.0.1", port=port, log_level="error"))
+        cls.thread = threading.Thread(target=cls.server.run, daemon=True)
+        cls.thread.start()
+        while not cls.server.started:
+            time.sleep(0.01)
+        cls.url = f"http://127.0.0.1:{port}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.should_exit = True
+        cls.thread.join(5)
+
+    def test_meta_e_linkedin_publicam_no_servidor_local(self):
+        with patch.multiple(publishers.settings, META_GRAPH_URL=self.url, LINKEDIN_API_URL=self.url,
+                            META_ACCESS_TOKEN="tok", LINKEDIN_ACCESS_TOKEN="tok"):
+            meta = publishers.MetaPublisher()
+            linkedin = publishers.LinkedInPublisher()
+            self.assertIn("ID: mock_", meta.publish("post", "Facebook"))
+            lote = meta.publish_batch(["a", "b", "c"], "Facebook")
+            self.assertEqual(len(lote), 3)
+            self.assertTrue(all("sucesso" in r for r in lote))
+            self.assertIn("LinkedIn", linkedin.publish("post", "LinkedIn"))
+            meta.close()
+            linkedin.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
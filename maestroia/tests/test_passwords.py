@@ -0,0 +1,98 @@
+import threading
+import time
+import unittest
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from maestroia.api import routes
+from maestroia.core import passwords
+from maestroia.core.database import Base, User, get_db
+
+
+class _PoolParado:
+    """Executor cujo worker nunca responde (ou já morreu, com `erro`)."""
+
+    def __init__(self, erro=None):
+        self.erro = erro
+
+    def submit(self, func, *args):
+        future = Future()
+        if self.erro is not None:
+            future.set_exception(self.erro)
+        return future
+
+
+class TestPasswords(unittest.TestCase):
+    def setUp(self):
+        patcher = patch.object(passwords.settings, "BCRYPT_ROUNDS", 4)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_pool_de_processos_faz_hash_e_verifica(self):
+        hasher = passwords.PasswordHasher(workers=2, max_pending=2, inline=False)
+        self.addCleanup(hasher.shutdown)
+        hashed = hasher.hash("segredo")
+        self.assertTrue(hashed.startswith("$2b$04$"))
+        self.assertEqual(hasher.verify("segredo", hashed), (True, None))
+        self.assertEqual(hasher.verify("errada", hashed), (False, None))
+        self.assertEqual(hasher.admitted, 0)
+
+    def test_rehash_quando_o_custo_muda(self):
+        hasher = passwords.PasswordHasher(workers=1, max_pending=0, inline=True)
+        hashed = hasher.hash("segredo")
+        with patch.object(passwords.settings, "BCRYPT_ROUNDS", 5):
+            valid, new_hash = hasher.verify("segredo", hashed)
+        self.assertTrue(valid)
+        self.assertTrue(new_hash.startswith("$2b$05$"))
+        self.assertEqual(hasher.verify("segredo", "não é um hash"), (False, None))
+
+    def test_recusa_quando_workers_e_fila_estao_ocupados(self):
+        hasher = passwords.PasswordHasher(workers=1, max_pending=0, inline=True)
+        liberar = threading.Event()
+        ocupado = threading.Thread(target=hasher._run, args=(liberar.wait, 5))
+        ocupado.start()
+        time.sleep(0.05)
+        with self.assertRaises(passwords.PasswordPoolSaturated):
+            hasher.hash("segredo")
+        liberar.set()
+        ocupado.join()
+        self.assertTrue(hasher.hash("segredo"))
+
+    def test_worker_parado_ou_pool_quebrado_viram_503(self):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine)
+        with Session() as db:
+            db.add(User(email="ana@x.com", hashed_password=passwords.hash_sync("segredo", 4)))
+            db.commit()
+
+        def get_test_db():
+            with Session() as db:
+                yield db
+
+        routes.app.dependency_overrides[get_db] = get_test_db
+        self.addCleanup(routes.app.dependency_overrides.clear)
+        client = TestClient(routes.app)
+
+        for erro in (None, BrokenProcessPool("worker morto")):
+            hasher = passwords.PasswordHasher(workers=1, max_pending=4, inline=False)
+            hasher._pool = lambda erro=erro: _PoolParado(erro)
+            with patch.object(routes, "get_password_hasher", return_value=hasher), \
+                    patch.object(passwords.settings, "PASSWORD_HASH_TIMEOUT_SECONDS", 0.05):
+                respostas = [
+                    client.post("/register", params={"email": "bia@x.com", "password": "segredo"}),
+                    client.post("/token", data={"username": "ana@x.com", "password": "segredo"}),
+                ]
+            for resposta in respostas:
+                self.assertEqual(resposta.status_code, 503, resposta.text)
+                self.assertEqual(resposta.headers["Retry-After"], str(routes.PASSWORD_RETRY_AFTER_SECONDS))
+
+
+if __name__ == "__main__":
+    unittest.main()
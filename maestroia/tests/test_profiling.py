@@ -0,0 +1,66 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from maestroia.core import profiling
+
+
+def _trabalho_lento():
+    fim = time.perf_counter() + 0.15
+    while time.perf_counter() < fim:
+        sum(range(1000))
+
+
+class TestProfiling(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        patcher = patch.multiple(profiling.settings, PROFILING_DIR=tmp.name, PROFILING_INTERVAL_MS=2,
+                                 ADMIN_EMAILS="admin@x.com", PROFILING_SAMPLE_RATE=0.0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_perfil_gravado_por_request_id(self):
+        with profiling.profile("req-1", rota="/campaign/run"):
+            _trabalho_lento()
+
+        collapsed = profiling.load_profile("req-1")
+        self.assertIn("_trabalho_lento", collapsed)
+        self.assertTrue(all(linha.rsplit(" ", 1)[1].isdigit() for linha in collapsed.splitlines()))
+
+        speedscope = profiling.load_profile("req-1", "speedscope")
+        self.assertEqual(speedscope["profiles"][0]["type"], "sampled")
+        self.assertEqual(len(speedscope["profiles"][0]["samples"]), len(speedscope["profiles"][0]["weights"]))
+        json.dumps(speedscope)
+
+        [meta] = profiling.list_profiles()
+        self.assertEqual(meta["request_id"], "req-1")
+        self.assertEqual(meta["rota"], "/campaign/run")
+        self.assertGreater(meta["samples"], 0)
+
+    def test_desligado_nao_inicia_profiler(self):
+        with patch.object(profiling, "SamplingProfiler") as profiler:
+            with profiling.profile("req-2", enabled=False) as p:
+                self.assertIsNone(p)
+        profiler.assert_not_called()
+        self.assertIsNone(profiling.load_profile("req-2"))
+
+    def test_pedido_explicito_so_vale_para_admin(self):
+        self.assertTrue(profiling.should_profile(True, "Admin@x.com"))
+        self.assertFalse(profiling.should_profile(True, "cliente@x.com"))
+        self.assertFalse(profiling.should_profile(False, "admin@x.com"))
+        with patch.object(profiling.settings, "PROFILING_SAMPLE_RATE", 1.0):
+            self.assertTrue(profiling.should_profile(False, "cliente@x.com"))
+
+    def test_request_id_nao_escapa_do_diretorio(self):
+        with profiling.profile("../../etc/x"):
+            pass
+        self.assertIsNotNone(profiling.load_profile("../../etc/x"))
+        self.assertEqual(len(os.listdir(profiling.settings.PROFILING_DIR)), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
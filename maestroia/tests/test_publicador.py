@@ -0,0 +1,145 @@
+import time
+import unittest
+from unittest.mock import patch
+
+from maestroia.services import publishers
+
+
+class _PublicadorLento(publishers.Publisher):
+    def __init__(self, segundos, resposta):
+        super().__init__()
+        self.segundos = segundos
+        self.resposta = resposta
+
+    def publish(self, conteudo, canal):
+        time.sleep(self.segundos)
+        return self.resposta
+
+
+class TestPublicadorConcorrente(unittest.TestCase):
+    def test_canais_publicados_em_paralelo(self):
+        from maestroia.agents import publicador
+
+        fakes = {nome: _PublicadorLento(0.3, f"ok {nome}") for nome in ("instagram", "facebook", "linkedin", "tiktok")}
+        state = {"conteudos": ["post"], "canais": ["Instagram", "Facebook", "LinkedIn", "TikTok", "Orkut"]}
+        with patch.dict(publishers._registry, fakes, clear=True), \
+                patch.object(publicador.settings, "PUBLISH_MODE", "direct"):
+            inicio = time.perf_counter()
+            result = publicador.agente_publicador(state)
+            duracao = time.perf_counter() - inicio
+
+        self.assertLess(duracao, 0.9)
+        self.assertEqual(list(result["publicacoes"]), state["canais"])
+        self.assertEqual(result["publicacoes"]["LinkedIn"], "ok linkedin")
+        self.assertIn("não suportada", result["publicacoes"]["Orkut"])
+
+    def test_prazo_total_interrompe_plataforma_lenta(self):
+        from maestroia.agents import publicador
+
+        fakes = {"instagram": _PublicadorLento(0.0, "ok"), "linkedin": _PublicadorLento(1.0, "tarde demais")}
+        state = {"conteudos": ["post"], "canais": ["Instagram", "LinkedIn"]}
+        with patch.dict(publishers._registry, fakes, clear=True), \
+                patch.object(publicador.settings, "PUBLISH_MODE", "direct"), \
+                patch.object(publicador, "PUBLISH_DEADLINE_SECONDS", 0.2):
+            result = publicador.agente_publicador(state)
+
+        self.assertEqual(result["publicacoes"]["Instagram"], "ok")
+        self.assertIn("Tempo limite", result["publicacoes"]["LinkedIn"])
+
+
+class TestRegistroPublicadores(unittest.TestCase):
+    def test_nova_plataforma_por_registro(self):
+        with patch.dict(publishers._registry):
+            @publishers.register_publisher
+            class MastodonPublisher(publishers.Publisher):
+                name = "mastodon"
+                channels = ("mastodon",)
+                capabilities = publishers.Capabilities(max_chars=500)
+
+                def publish(self, conteudo, canal):
+                    return "toot"
+
+            publisher = publishers.get_publisher("Mastodon")
+            self.assertIsInstance(publisher, MastodonPublisher)
+            self.assertEqual(publisher.capabilities.max_chars, 500)
+        self.assertIsNone(publishers.get_publisher("mastodon"))
+
+    def test_sessao_reaproveitada_entre_publicacoes(self):
+        publisher = publishers.get_publisher("LinkedIn")
+        response = type("R", (), {"status_code": 201, "text": ""})()
+        with patch.object(publishers.settings, "LINKEDIN_ACCESS_TOKEN", "token"), \
+                patch("requests.Session.post", return_value=response) as post:
+            publisher.close()
+            publisher.publish("a", "LinkedIn")
+            sessao = publisher.session
+            publisher.publish("b", "LinkedIn")
+            self.assertIs(publisher.session, sessao)
+            self.assertEqual(post.call_count, 2)
+            self.assertEqual(sessao.headers["Authorization"], "Bearer token")
+        publisher.close()
+
+    def test_erro_transitorio_marcado_para_retry(self):
+        publisher = publishers.get_publisher("Facebook")
+        response = type("R", (), {"status_code": 429, "text": "rate limited"})()
+        with patch.object(publishers.settings, "META_ACCESS_TOKEN", "token"), \
+                patch("requests.Session.post", return_value=response):
+            with self.assertRaises(publishers.PublishError) as ctx:
+                publisher.publish("a", "Facebook")
+        self.assertTrue(ctx.exception.retryable)
+
+    def test_resposta_ilegivel_do_twitter_vira_publish_error(self):
+        publisher = publishers.get_publisher("Twitter/X")
+
+        def invalida(self):
+            raise ValueError("Expecting value")
+
+        respostas = [
+            type("R", (), {"status_code": 201, "text": "<html>", "json": invalida})(),
+            type("R", (), {"status_code": 201, "text": '{"errors": []}', "json": lambda self: {"errors": []}})(),
+        ]
+        for response in respostas:
+            with patch.object(publisher, "_auth", "auth"), patch("requests.Session.post", return_value=response):
+                with self.assertRaises(publishers.PublishError) as ctx:
+                    publisher.publish("a", "Twitter/X")
+            self.assertIn("respondeu 201", str(ctx.exception))
+            self.assertIn(response.text, str(ctx.exception))
+            self.assertFalse(ctx.exception.retryable)
+        publisher.close()
+
+    def _lote_meta(self, response):
+        publisher = publishers.get_publisher("Facebook")
+        with patch.object(publishers.settings, "META_ACCESS_TOKEN", "token"), \
+                patch("requests.Session.post", return_value=response):
+            return publisher.publish_batch(["a", "b", "c"], "Facebook")
+
+    def test_lote_meta_sempre_um_resultado_por_item(self):
+        curta = type("R", (), {"status_code": 200, "text": "",
+                               "json": lambda self: [{"code": 200, "body": '{"id": "1"}'}, None]})()
+        resultados = self._lote_meta(curta)
+        self.assertEqual(len(resultados), 3)
+        self.assertIn("ID: 1", resultados[0])
+        self.assertTrue(all(isinstance(r, publishers.PublishError) and r.retryable for r in resultados[1:]))
+
+        def invalida(self):
+            raise ValueError("Expecting value")
+
+        ilegivel = type("R", (), {"status_code": 200, "text": "<html>", "json": invalida})()
+        resultados = self._lote_meta(ilegivel)
+        self.assertEqual(len(resultados), 3)
+        self.assertTrue(all(r.retryable for r in resultados))
+
+    def test_lote_generico_isola_excecao_do_item(self):
+        class _Quebra(publishers.Publisher):
+            def publish(self, conteudo, canal):
+                if conteudo == "b":
+                    raise KeyError("id")
+                return f"ok {conteudo}"
+
+        resultados = _Quebra().publish_batch(["a", "b", "c"], "X")
+        self.assertEqual(resultados[0], "ok a")
+        self.assertIsInstance(resultados[1], KeyError)
+        self.assertEqual(resultados[2], "ok c")
+
+
+if __name__ == "__main__":
+    unittest.main()
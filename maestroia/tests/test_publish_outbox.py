@@ -0,0 +1,204 @@
+import os
+import tempfile
+import time
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from maestroia.models.publishing import PublishOutbox
+from maestroia.services import publishers
+from maestroia.services import publish_outbox
+from maestroia.services import rate_limits
+
+
+class _PublicadorInstavel(publishers.Publisher):
+    def __init__(self, falhas):
+        super().__init__()
+        self.falhas = falhas
+        self.chamadas = 0
+
+    def publish(self, conteudo, canal):
+        self.chamadas += 1
+        if self.chamadas <= self.falhas:
+            raise publishers.PublishError("503 temporário")
+        return f"publicado #{self.chamadas}"
+
+
+class _PublicadorEmLote(publishers.Publisher):
+    name = "lote-teste"
+    capabilities = publishers.Capabilities(batch=True, max_batch_size=10)
+    limite = None  # corta a resposta do lote nesse número de itens
+
+    def __init__(self):
+        super().__init__()
+        self.lotes = []
+
+    def publish_batch(self, conteudos, canal):
+        self.lotes.append(list(conteudos))
+        return [f"ok {c}" for c in conteudos][:self.limite]
+
+
+class TestPublishOutbox(unittest.TestCase):
+    def setUp(self):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        PublishOutbox.__table__.create(bind=engine)
+        self.Session = sessionmaker(bind=engine)
+        self.dispatcher = publish_outbox.OutboxDispatcher(session_factory=self.Session)
+
+    def _vencer_retries(self):
+        db = self.Session()
+        db.query(PublishOutbox).update({"next_attempt_at": datetime.utcnow() - timedelta(seconds=1)})
+        db.commit()
+        db.close()
+
+    def test_enfileirar_e_idempotente(self):
+        primeira = publish_outbox.enqueue_publications("camp-1", [("LinkedIn", "post")], session_factory=self.Session)
+        segunda = publish_outbox.enqueue_publications("camp-1", [("LinkedIn", "post")], session_factory=self.Session)
+
+        self.assertTrue(primeira[0]["nova"])
+        self.assertFalse(segunda[0]["nova"])
+        self.assertEqual(primeira[0]["id"], segunda[0]["id"])
+        self.assertEqual(len(publish_outbox.outbox_status("camp-1", session_factory=self.Session)), 1)
+
+    def test_enfileirar_a_mesma_chave_em_paralelo(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        engine = create_engine(f"sqlite:///{os.path.join(tmp.name, 'outbox.db')}")
+        self.addCleanup(engine.dispose)
+        PublishOutbox.__table__.create(bind=engine)
+        Session = sessionmaker(bind=engine)
+        concorrente = []
+
+        def outra_execucao(session, flush_context, instances):
+            # Grava a mesma chave depois da nossa leitura e antes do nosso INSERT
+            if not concorrente:
+                concorrente.extend(publish_outbox.enqueue_publications(
+                    "camp-p", [("LinkedIn", "post")], session_factory=Session))
+
+        def session_factory():
+            db = Session()
+            event.listen(db, "before_flush", outra_execucao)
+            return db
+
+        [item] = publish_outbox.enqueue_publications("camp-p", [("LinkedIn", "post")],
+                                                     session_factory=session_factory)
+        self.assertFalse(item["nova"])
+        self.assertEqual(item["id"], concorrente[0]["id"])
+        self.assertEqual(len(publish_outbox.outbox_status("camp-p", session_factory=Session)), 1)
+
+    def test_retry_com_backoff_ate_publicar(self):
+        fake = _PublicadorInstavel(falhas=1)
+        publish_outbox.enqueue_publications("camp-2", [("LinkedIn", "post")], session_factory=self.Session)
+        with patch.dict(publishers._registry, {"linkedin": fake}):
+            self.assertEqual(self.dispatcher.run_once(), 1)
+            status = publish_outbox.outbox_status("camp-2", session_factory=self.Session)[0]
+            self.assertEqual(status["status"], "pending")
+            self.assertIn("503", status["erro"])
+
+            # Antes do backoff vencer nada é reprocessado
+            self.assertEqual(self.dispatcher.run_once(), 0)
+            self._vencer_retries()
+            self.assertEqual(self.dispatcher.run_once(), 1)
+
+        status = publish_outbox.outbox_status("camp-2", session_factory=self.Session)[0]
+        self.assertEqual(status["status"], "sent")
+        self.assertEqual(status["tentativas"], 2)
+        self.assertEqual(status["resultado"], "publicado #2")
+
+    def test_falha_definitiva_apos_maximo_de_tentativas(self):
+        fake = _PublicadorInstavel(falhas=10)
+        publish_outbox.enqueue_publications("camp-3", [("LinkedIn", "post")], session_factory=self.Session)
+        with patch.dict(publishers._registry, {"linkedin": fake}), \
+                patch.object(publish_outbox.settings, "OUTBOX_MAX_ATTEMPTS", 2):
+            self.dispatcher.run_once()
+            self._vencer_retries()
+            self.dispatcher.run_once()
+
+        status = publish_outbox.outbox_status("camp-3", session_factory=self.Session)[0]
+        self.assertEqual(status["status"], "failed")
+        self.assertEqual(fake.chamadas, 2)
+
+    def test_limite_de_taxa_agrupa_em_lote_e_adia_excedente(self):
+        fake = _PublicadorEmLote()
+        for i in range(8):
+            publish_outbox.enqueue_publications(f"camp-{i}", [("Facebook", f"post {i}")], session_factory=self.Session)
+
+        limites = {"lote-teste": {"posts": 5, "per_seconds": 3600, "burst": 5}}
+        rate_limits.reset_buckets()
+        with patch.dict(publishers._registry, {"facebook": fake}), \
+                patch.dict(rate_limits.PLATFORM_RATE_LIMITS, limites):
+            self.dispatcher.run_once()
+            # O excedente foi reagendado para quando houver fichas: nada vence agora
+            self.assertEqual(self.dispatcher.run_once(), 0)
+        rate_limits.reset_buckets()
+
+        self.assertEqual([len(lote) for lote in fake.lotes], [5])
+        db = self.Session()
+        contagem = {
+            status: db.query(PublishOutbox).filter(PublishOutbox.status == status).count()
+            for status in ("sent", "pending")
+        }
+        adiados = db.query(PublishOutbox).filter(PublishOutbox.status == "pending").all()
+        db.close()
+        self.assertEqual(contagem, {"sent": 5, "pending": 3})
+        self.assertTrue(all(r.attempts == 0 for r in adiados))
+        self.assertTrue(all(r.next_attempt_at > datetime.utcnow() + timedelta(minutes=5) for r in adiados))
+
+    def test_lease_expirado_conta_tentativa_ate_falhar(self):
+        publish_outbox.enqueue_publications("camp-7", [("LinkedIn", "post")], session_factory=self.Session)
+        with patch.object(publish_outbox.settings, "OUTBOX_MAX_ATTEMPTS", 2):
+            for reclamada in (1, 0):
+                # Worker morreu no meio da entrega: a linha ficou em `sending` além do lease
+                db = self.Session()
+                db.query(PublishOutbox).update({"status": "sending",
+                                                "updated_at": datetime.utcnow() - timedelta(hours=1)})
+                db.commit()
+                db.close()
+                self.assertEqual(len(self.dispatcher._claim_due()), reclamada)
+
+        status = publish_outbox.outbox_status("camp-7", session_factory=self.Session)[0]
+        self.assertEqual((status["status"], status["tentativas"]), ("failed", 2))
+        self.assertIn("lease", status["erro"])
+
+    def test_laco_conta_erros_no_metrics(self):
+        erros = publish_outbox.metrics.BACKGROUND_ERRORS
+        antes = erros.value(worker="outbox", exception="OperationalError")
+        from sqlalchemy.exc import OperationalError
+        with patch.object(self.dispatcher, "run_once", side_effect=OperationalError("x", {}, Exception("db"))), \
+                patch.object(publish_outbox.settings, "OUTBOX_POLL_SECONDS", 0.01):
+            self.dispatcher.start()
+            time.sleep(0.1)
+            self.dispatcher.stop()
+        self.assertGreater(erros.value(worker="outbox", exception="OperationalError"), antes)
+
+    def test_chave_da_campanha_inclui_o_tenant(self):
+        a = publish_outbox.campaign_key_for({"tenant_id": "1", "campanha_id": "c-1"})
+        b = publish_outbox.campaign_key_for({"tenant_id": "2", "campanha_id": "c-1"})
+        self.assertNotEqual(a, b)
+        self.assertEqual(a, "1:c-1")
+        # Outra execução (outro campanha_id) com as mesmas entradas é outra campanha
+        entradas = {"tenant_id": "1", "objetivo": "vender", "canais": ["email"]}
+        self.assertNotEqual(publish_outbox.campaign_key_for({**entradas, "campanha_id": "r1"}),
+                            publish_outbox.campaign_key_for({**entradas, "campanha_id": "r2"}))
+
+    def test_lote_com_resposta_curta_nao_deixa_linha_em_sending(self):
+        fake = _PublicadorEmLote()
+        fake.limite = 1
+        publish_outbox.enqueue_publications("camp-9", [("Facebook", "p1"), ("Facebook", "p2")],
+                                            session_factory=self.Session)
+        rate_limits.reset_buckets()
+        with patch.dict(publishers._registry, {"facebook": fake}):
+            self.dispatcher.run_once()
+        rate_limits.reset_buckets()
+
+        status = {s["resultado"] or s["erro"]: s["status"]
+                  for s in publish_outbox.outbox_status("camp-9", session_factory=self.Session)}
+        self.assertEqual(sorted(status.values()), ["pending", "sent"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from maestroia.core.database import Base, Campaign
+from maestroia.models.results import ResultBlob
+from maestroia.services import campaign_history, result_store
+
+PESQUISA = {"tendencias": [f"tendência {i} para o público jovem" for i in range(200)]}
+
+
+def _resultado(n):
+    return {"objetivo": f"objetivo {n}", "pesquisa": PESQUISA, "estrategia": f"estratégia detalhada {n} " * 50}
+
+
+class TestResultStore(unittest.TestCase):
+    def setUp(self):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=engine)
+        self.db = sessionmaker(bind=engine)()
+        self.addCleanup(self.db.close)
+
+    def test_ida_e_volta_com_secoes_inline_e_em_blob(self):
+        ref = result_store.save_result(self.db, _resultado(1))
+        self.db.commit()
+        self.assertEqual(result_store.load_result(self.db, ref), _resultado(1))
+        self.assertIsNone(result_store.load_result(self.db, "0" * 64))
+
+    def test_secao_repetida_e_gravada_uma_vez(self):
+        refs = [result_store.save_result(self.db, _resultado(n)) for n in range(3)]
+        refs.append(result_store.save_result(self.db, _resultado(0)))  # campanha idêntica
+        self.db.commit()
+
+        self.assertEqual(refs[0], refs[3])
+        # 3 manifestos + 3 estratégias + 1 pesquisa compartilhada
+        self.assertEqual(self.db.query(ResultBlob).count(), 7)
+        brutos, gravados = zip(*self.db.query(ResultBlob.raw_size, ResultBlob.data))
+        self.assertLess(sum(len(d) for d in gravados), sum(brutos) / 3)
+
+    def test_le_somente_as_secoes_pedidas(self):
+        ref = result_store.save_result(self.db, _resultado(1))
+        self.db.commit()
+        with patch.object(result_store, "decompress", wraps=result_store.decompress) as decompress:
+            parcial = result_store.load_result(self.db, ref, ["estrategia", "inexistente"])
+        self.assertEqual(list(parcial), ["estrategia"])
+        self.assertEqual(decompress.call_count, 2)  # manifesto + estratégia, pesquisa intocada
+
+    def test_fallback_zlib_e_leitura_de_blobs_mistos(self):
+        ref_zstd = result_store.save_result(self.db, _resultado(1))
+        with patch.object(result_store, "zstandard", None):
+            ref_zlib = result_store.save_result(self.db, _resultado(2))
+            self.assertEqual(self.db.get(ResultBlob, ref_zlib).codec, "zlib")
+        self.db.commit()
+        self.assertEqual(result_store.load_result(self.db, ref_zstd)["pesquisa"], PESQUISA)
+        self.assertEqual(result_store.load_result(self.db, ref_zlib)["objetivo"], "objetivo 2")
+
+    def test_detalhe_da_campanha_le_pela_referencia(self):
+        ref = result_store.save_result(self.db, _resultado(5))
+        self.db.add(Campaign(id=1, user_id=7, objetivo="x", canais="email", resultado_ref=ref))
+        self.db.commit()
+        detalhe = campaign_history.get_campaign(self.db, 7, 1, ["objetivo"])
+        self.assertEqual(detalhe["resultado"], {"objetivo": "objetivo 5"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import time
+import unittest
+from datetime import datetime, timedelta, time as dtime
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from maestroia.models.publishing import PublishOutbox, ScheduledPost
+from maestroia.services import publish_outbox
+from maestroia.services.scheduler import PostScheduler
+
+
+class TestPostScheduler(unittest.TestCase):
+    def setUp(self):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        PublishOutbox.__table__.create(bind=engine)
+        ScheduledPost.__table__.create(bind=engine)
+        self.Session = sessionmaker(bind=engine)
+
+    def _scheduler(self):
+        scheduler = PostScheduler(session_factory=self.Session)
+        scheduler.start()
+        self.addCleanup(scheduler.stop)
+        return scheduler
+
+    def test_post_vencido_vai_para_o_outbox(self):
+        scheduler = self._scheduler()
+        post = scheduler.schedule("ana@x.com", "LinkedIn", "post", when=datetime.now() + timedelta(milliseconds=200))
+
+        for _ in range(50):
+            if publish_outbox.outbox_status(f"agendado-{post['id']}", session_factory=self.Session):
+                break
+            time.sleep(0.05)
+        status = publish_outbox.outbox_status(f"agendado-{post['id']}", session_factory=self.Session)
+        self.assertEqual(len(status), 1)
+        self.assertEqual(status[0]["canal"], "LinkedIn")
+        self.assertEqual(scheduler.pending_count(), 0)
+
+    def test_recupera_agendamentos_ao_reiniciar(self):
+        primeiro = self._scheduler()
+        primeiro.schedule("ana@x.com", "Instagram", "a", when=datetime.now() + timedelta(days=1))
+        cancelado = primeiro.schedule("ana@x.com", "Instagram", "b", when=datetime.now() + timedelta(days=2))
+        self.assertFalse(primeiro.cancel("bruno@x.com", cancelado["id"]))  # post de outro tenant
+        self.assertEqual(primeiro.pending_count(), 2)
+        self.assertTrue(primeiro.cancel("ana@x.com", cancelado["id"]))
+        self.assertEqual(primeiro.pending_count(), 1)  # cancelado ainda no heap, fora da contagem
+        primeiro.stop()
+
+        segundo = self._scheduler()
+        self.assertEqual(segundo.pending_count(), 1)
+        self.assertEqual([p["conteudo"] for p in segundo.list_scheduled("ana@x.com")], ["a"])
+
+    def test_horario_automatico_usa_janelas_ideais(self):
+        scheduler = PostScheduler(session_factory=self.Session)
+        depois = datetime.combine(datetime.now().date(), dtime(22, 30))
+        slot = scheduler.next_ideal_slot("ana@x.com", "LinkedIn", after=depois)
+        # LinkedIn: primeira janela do dia seguinte é 07:00-09:00
+        self.assertEqual(slot, datetime.combine(depois.date() + timedelta(days=1), dtime(7, 0)))
+
+        scheduler.schedule("ana@x.com", "LinkedIn", "a", when=slot)
+        proximo = scheduler.next_ideal_slot("ana@x.com", "LinkedIn", after=depois)
+        self.assertGreater(proximo, slot)
+        self.assertLess(proximo, datetime.combine(slot.date(), dtime(9, 0)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from maestroia.core import tracing
+
+
+class _ListExporter:
+    def __init__(self):
+        self.traces = []
+
+    def export(self, spans):
+        self.traces.append(list(spans))
+
+
+class TestTracing(unittest.TestCase):
+    def setUp(self):
+        self.exporter = _ListExporter()
+        tracing.set_exporter(self.exporter)
+        self.addCleanup(tracing.set_exporter, None)
+
+    def test_spans_aninhados_exportados_com_o_raiz(self):
+        with tracing.trace("campanha"):
+            with tracing.span("no.pesquisador"):
+                with tracing.span("llm.chat", model="fake-gpt") as llm:
+                    llm.set_attribute("prompt_tokens", 12)
+                tracing.set_attribute("cache_hit", False)
+
+        self.assertEqual(len(self.exporter.traces), 1)
+        spans = {s.name: s for s in self.exporter.traces[0]}
+        self.assertEqual(set(spans), {"campanha", "no.pesquisador", "llm.chat"})
+        self.assertEqual(len({s.trace_id for s in spans.values()}), 1)
+        self.assertEqual(spans["llm.chat"].parent_id, spans["no.pesquisador"].span_id)
+        self.assertEqual(spans["llm.chat"].attributes, {"model": "fake-gpt", "prompt_tokens": 12})
+        self.assertFalse(spans["no.pesquisador"].attributes["cache_hit"])
+        self.assertIsNone(tracing.current_span())
+
+    def test_contexto_propagado_para_threads_do_pool(self):
+        def publicar(canal):
+            with tracing.span("publicacao", canal=canal):
+                pass
+
+        with tracing.trace("campanha"), ThreadPoolExecutor(2) as pool:
+            list(pool.map(tracing.bind_context(publicar), ["Instagram", "LinkedIn"]))
+
+        self.assertEqual(len(self.exporter.traces), 1)
+        root = next(s for s in self.exporter.traces[0] if s.parent_id is None)
+        publicacoes = [s for s in self.exporter.traces[0] if s.name == "publicacao"]
+        self.assertEqual(len(publicacoes), 2)
+        self.assertTrue(all(s.parent_id == root.span_id for s in publicacoes))
+
+    def test_erro_marca_o_span(self):
+        with self.assertRaises(ValueError):
+            with tracing.trace("campanha"):
+                raise ValueError("falhou")
+        span = self.exporter.traces[0][0]
+        self.assertEqual(span.status, "error")
+        self.assertIn("falhou", span.attributes["error"])
+
+    def test_desligado_nao_registra(self):
+        tracing.set_exporter(False)
+        with tracing.trace("campanha") as root:
+            self.assertIsNone(root)
+        self.assertEqual(self.exporter.traces, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
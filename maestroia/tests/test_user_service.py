@@ -0,0 +1,79 @@
+import hashlib
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from maestroia.core import passwords
+from maestroia.core.database import Base, User
+from maestroia.services.user_service import UserRepository
+
+
+class TestUserRepository(unittest.TestCase):
+    def setUp(self):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=engine)
+        self.queries = []
+        event.listen(engine, "before_cursor_execute", lambda *a: self.queries.append(a[2]))
+        self.session_factory = sessionmaker(bind=engine)
+        self.repo = UserRepository(self.session_factory, ttl_seconds=60)
+        patcher = patch.object(passwords.settings, "BCRYPT_ROUNDS", 4)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_cadastro_login_e_email_duplicado(self):
+        criado = self.repo.create("ana@x.com", "Senha123", "Ana")
+        self.assertEqual((criado["plano"], criado["campanhas_mes"], criado["pago"]), ("free", 0, False))
+        self.assertIsNone(self.repo.create("ana@x.com", "Outra123", "Ana 2"))
+        self.assertEqual(self.repo.authenticate("ana@x.com", "Senha123")["display_name"], "Ana")
+        self.assertIsNone(self.repo.authenticate("ana@x.com", "errada"))
+        self.assertIsNone(self.repo.authenticate("bia@x.com", "Senha123"))
+
+    def test_hash_do_users_json_e_regravado_no_login(self):
+        db = self.session_factory()
+        legado = hashlib.sha256(b"Senha123").hexdigest()
+        db.add(User(email="ana@x.com", hashed_password=legado, display_name="Ana"))
+        db.commit()
+        self.assertIsNone(self.repo.authenticate("ana@x.com", "errada"))
+        self.assertIsNotNone(self.repo.authenticate("ana@x.com", "Senha123"))
+        db.expire_all()
+        novo = db.query(User).one().hashed_password
+        db.close()
+        self.assertTrue(novo.startswith("$2b$"))
+        self.assertIsNotNone(self.repo.authenticate("ana@x.com", "Senha123"))
+
+    def test_leitura_em_cache_e_invalidada_pelas_escritas(self):
+        self.repo.create("ana@x.com", "Senha123", "Ana")
+        self.repo.get("ana@x.com")
+        consultas = len(self.queries)
+        self.assertEqual(self.repo.get("ana@x.com")["campanhas_mes"], 0)
+        self.assertEqual(len(self.queries), consultas)
+
+        self.assertTrue(self.repo.increment_campaigns("ana@x.com"))
+        self.assertEqual(self.repo.get("ana@x.com")["campanhas_mes"], 1)
+        self.assertTrue(self.repo.set_logged_in("ana@x.com", True))
+        self.assertEqual(self.repo.find_logged_in()["email"], "ana@x.com")
+        self.assertFalse(self.repo.set_logged_in("bia@x.com", True))
+        with self.assertRaises(ValueError):
+            self.repo.update("ana@x.com", hashed_password="x")
+
+    def test_incremento_concorrente_nao_perde_contagem(self):
+        # Arquivo de verdade: cada thread com a sua conexão, como as sessões do Streamlit
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        engine = create_engine(f"sqlite:///{tmp.name}/users.db", connect_args={"timeout": 30})
+        self.addCleanup(engine.dispose)
+        Base.metadata.create_all(bind=engine)
+        repo = UserRepository(sessionmaker(bind=engine), ttl_seconds=60)
+        repo.create("ana@x.com", "Senha123", "Ana")
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda _: repo.increment_campaigns("ana@x.com"), range(50)))
+        self.assertEqual(repo.get("ana@x.com")["campanhas_mes"], 50)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -61,6 +61,8 @@ def main():
     if args.migrate:
         if shutil.which('alembic'):
             run('alembic upgrade head')
+            # Consultas quentes ainda usam os índices depois da migração?
+            run('python -m maestroia.core.query_plans')
         else:
             print('Alembic não encontrado no PATH — pular migrações.')
 
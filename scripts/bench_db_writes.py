@@ -0,0 +1,150 @@
+"""Benchmark de escrita concorrente no SQLite: PRAGMAs padrão x ajustados (maestroia.core.database).
+
+Cada cenário roda num arquivo novo, com processos separados (como workers do uvicorn e o
+app Streamlit): os escritores gravam uma campanha e incrementam o contador do usuário na
+mesma transação, e os leitores consultam o histórico paginado. "padrao" reproduz o engine
+antigo (journal DELETE, synchronous FULL, timeout de 5 s do sqlite3); "ajustado" usa os
+valores de settings (WAL, synchronous NORMAL, busy timeout, cache e mmap).
+
+Exemplos:
+  python scripts/bench_db_writes.py
+  python scripts/bench_db_writes.py --writers 8 --readers 4 --duration 20 --output logs/bench_db.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+SCENARIOS = {
+    "padrao": {
+        "SQLITE_JOURNAL_MODE": "DELETE",
+        "SQLITE_SYNCHRONOUS": "FULL",
+        "SQLITE_BUSY_TIMEOUT_MS": "5000",
+        "SQLITE_CACHE_SIZE_KB": "2000",
+        "SQLITE_MMAP_SIZE_MB": "0",
+    },
+    "ajustado": {},  # valores de settings/.env
+}
+PAYLOAD = "x" * 4096
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * pct / 100
+    low = int(pos)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (pos - low)
+
+
+# Rodam nos processos do pool; o DATABASE_URL e os PRAGMAs chegam pelo ambiente
+
+def _setup() -> None:
+    from maestroia.core.database import SessionLocal, User, init_db
+
+    init_db()
+    db = SessionLocal()
+    db.add(User(email="bench@maestroia.local", hashed_password="x", campanhas_mes=0))
+    db.commit()
+    db.close()
+
+
+def _worker(role: str, duration: float) -> dict:
+    from sqlalchemy import update
+    from sqlalchemy.exc import OperationalError
+
+    from maestroia.core.database import Campaign, SessionLocal, User
+
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        db = SessionLocal()
+        try:
+            if role == "writer":
+                db.add(Campaign(user_id=1, objetivo="bench", publico_alvo="bench", canais="email",
+                                orcamento="100", resultado=PAYLOAD))
+                db.execute(update(User).where(User.id == 1).values(campanhas_mes=User.campanhas_mes + 1))
+                db.commit()
+            else:
+                db.query(Campaign.id, Campaign.objetivo).filter(Campaign.user_id == 1) \
+                    .order_by(Campaign.id.desc()).limit(20).all()
+            latencies.append(time.perf_counter() - start)
+        except OperationalError:  # "database is locked"
+            db.rollback()
+            errors += 1
+        finally:
+            db.close()
+    return {"role": role, "latencies": latencies, "errors": errors}
+
+
+def run_scenario(name: str, writers: int, readers: int, duration: float, workdir: str) -> dict:
+    path = Path(workdir) / f"{name}.db"
+    saved = dict(os.environ)
+    os.environ.update(SCENARIOS[name], DATABASE_URL=f"sqlite:///{path}")
+    try:
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=writers + readers, mp_context=ctx) as pool:
+            pool.submit(_setup).result()
+            # Aquece os processos (import + conexão) antes de medir
+            list(pool.map(time.sleep, [0.2] * (writers + readers)))
+            futures = [pool.submit(_worker, "writer", duration) for _ in range(writers)]
+            futures += [pool.submit(_worker, "reader", duration) for _ in range(readers)]
+            results = [f.result() for f in futures]
+    finally:
+        os.environ.clear()
+        os.environ.update(saved)
+
+    report = {}
+    for role in ("writer", "reader"):
+        latencies = [lat for r in results if r["role"] == role for lat in r["latencies"]]
+        report[role] = {
+            "ops": len(latencies),
+            "ops_por_s": round(len(latencies) / duration, 1),
+            "erros_lock": sum(r["errors"] for r in results if r["role"] == role),
+            "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, default=4, help="processos escritores")
+    parser.add_argument("--readers", type=int, default=2, help="processos leitores")
+    parser.add_argument("--duration", type=float, default=10.0, help="segundos por cenário")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), action="append",
+                        help="roda só este cenário (pode repetir)")
+    parser.add_argument("--output", type=Path, help="salva o relatório em JSON")
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "sk-bench")  # settings exige a chave, o benchmark não usa
+    report = {"config": {"writers": args.writers, "readers": args.readers, "duration_s": args.duration}}
+    with tempfile.TemporaryDirectory() as workdir:
+        for name in args.scenario or ["padrao", "ajustado"]:
+            report[name] = run_scenario(name, args.writers, args.readers, args.duration, workdir)
+            for role, r in report[name].items():
+                print(f"{name:9} {role:7} {r['ops_por_s']:>8} ops/s  p50 {r['p50_ms']:>8}ms  "
+                      f"p95 {r['p95_ms']:>8}ms  p99 {r['p99_ms']:>8}ms  locked {r['erros_lock']}")
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"Relatório salvo em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
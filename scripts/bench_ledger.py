@@ -0,0 +1,95 @@
+"""Benchmark do razão: uma transação por commit x gravador em lote (commit em grupo).
+
+Cria um banco SQLite temporário (com os PRAGMAs de settings), uma conta com --wallets
+carteiras e dispara transações de duas pernas entre carteiras aleatórias a partir de
+--threads produtores. "direto" chama `ledger.create_transaction`; "lote" usa o
+`LedgerBatchWriter`, em que cada produtor espera o seu Future. Confere no fim se a soma
+dos saldos continua zero.
+
+Exemplos:
+  python scripts/bench_ledger.py
+  python scripts/bench_ledger.py --threads 32 --transactions 5000 --synchronous FULL
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+
+def run(mode: str, args, workdir: str) -> dict:
+    from sqlalchemy import func
+    from sqlalchemy.orm import sessionmaker
+
+    from maestroia.core.database import init_db, make_engine
+    from maestroia.models.finance import Account, Wallet
+    from maestroia.services import ledger
+    from maestroia.services.ledger_writer import LedgerBatchWriter
+
+    engine = make_engine(f"sqlite:///{workdir}/{mode}.db")
+    init_db(engine)
+    session_factory = sessionmaker(bind=engine)
+    db = session_factory()
+    db.add(Account(id=1, email="bench@maestroia.local"))
+    db.add_all(Wallet(id=i, account_id=1, currency="BRL", balance=0) for i in range(1, args.wallets + 1))
+    db.commit()
+    db.close()
+
+    writer = LedgerBatchWriter(session_factory) if mode == "lote" else None
+
+    def one(n: int) -> bool:
+        rng = random.Random(n)
+        debit, credit = rng.sample(range(1, args.wallets + 1), 2)
+        amount = Decimal(rng.randint(1, 10_000)) / 100
+        postings = [{"wallet_id": debit, "amount": amount, "is_debit": True},
+                    {"wallet_id": credit, "amount": amount}]
+        if writer is not None:
+            result = writer.post("uso", postings, {"n": n})
+        else:
+            result = ledger.create_transaction("uso", postings, {"n": n}, session_factory=session_factory)
+        return result["status"] == "ok"
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        ok = sum(pool.map(one, range(args.transactions)))
+    elapsed = time.perf_counter() - start
+    if writer is not None:
+        writer.close()
+
+    db = session_factory()
+    total = db.query(func.sum(Wallet.balance)).scalar()
+    db.close()
+    engine.dispose()
+    return {"ok": ok, "tps": round(args.transactions / elapsed, 1), "soma_saldos": round(float(total or 0), 6)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=16, help="produtores simultâneos")
+    parser.add_argument("--transactions", type=int, default=2000)
+    parser.add_argument("--wallets", type=int, default=100)
+    parser.add_argument("--synchronous", default=None, help="sobrescreve SQLITE_SYNCHRONOUS (ex.: FULL)")
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "sk-bench")  # settings exige a chave, o benchmark não usa
+    if args.synchronous:
+        os.environ["SQLITE_SYNCHRONOUS"] = args.synchronous
+    with tempfile.TemporaryDirectory() as workdir:
+        resultados = {mode: run(mode, args, workdir) for mode in ("direto", "lote")}
+    for mode, r in resultados.items():
+        print(f"{mode:7} {r['tps']:>9} transações/s  ok {r['ok']}/{args.transactions}  soma dos saldos {r['soma_saldos']}")
+    print(f"ganho: {resultados['lote']['tps'] / resultados['direto']['tps']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
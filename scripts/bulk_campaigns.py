@@ -0,0 +1,102 @@
+"""Envia um arquivo CSV/JSONL de campanhas para /campaign/bulk e acompanha o progresso.
+
+Cada linha do arquivo é uma campanha (objetivo, publico_alvo, canais, orcamento; no CSV os
+canais vão separados por ";"). O arquivo é enviado em streaming e os eventos por linha
+chegam conforme o servidor grava os lotes. Linhas com falha ficam no lote e podem ser
+reprocessadas com --retry <job_id>.
+
+Exemplos:
+  python scripts/bulk_campaigns.py campanhas.csv --email agencia@x.com --password ...
+  python scripts/bulk_campaigns.py campanhas.jsonl --concurrency 8
+  python scripts/bulk_campaigns.py --retry 3f2a9c... --email agencia@x.com --password ...
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Iterator
+
+import httpx
+
+CHUNK_BYTES = 64 * 1024
+
+
+def login(client: httpx.Client, email: str, password: str) -> str:
+    response = client.post("/token", data={"username": email, "password": password})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+def read_chunks(path: Path) -> Iterator[bytes]:
+    with path.open("rb") as file:
+        while chunk := file.read(CHUNK_BYTES):
+            yield chunk
+
+
+def print_event(event: dict[str, Any]) -> None:
+    kind = event.get("event")
+    if kind == "job":
+        print(f"Lote {event['job_id']} (concorrência {event['concurrency']})", file=sys.stderr)
+    elif kind == "row":
+        detalhe = f"campanha {event['campaign_id']}" if event["status"] == "ok" else event.get("error", "")
+        print(f"  linha {event['row']:>5}  {event['status']:<8} {detalhe}", file=sys.stderr)
+    elif kind == "summary":
+        print(
+            f"Concluído: {event['ok']} ok, {event['failed']} com falha, {event['invalid']} inválidas "
+            f"de {event['total']}",
+            file=sys.stderr,
+        )
+        if event["failed"]:
+            print(f"Para reprocessar as falhas: --retry {event['job_id']}", file=sys.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("file", nargs="?", type=Path, help="arquivo .csv ou .jsonl")
+    parser.add_argument("--retry", metavar="JOB_ID", help="reprocessa as linhas com falha de um lote")
+    parser.add_argument("--format", choices=("csv", "jsonl"), help="padrão: pela extensão do arquivo")
+    parser.add_argument("--concurrency", type=int)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--events", type=Path, help="grava os eventos NDJSON recebidos neste arquivo")
+    parser.add_argument("--timeout", type=float, default=600.0)
+    args = parser.parse_args()
+    if not args.file and not args.retry:
+        parser.error("informe o arquivo ou --retry <job_id>")
+
+    params: dict[str, Any] = {}
+    if args.concurrency:
+        params["concurrency"] = args.concurrency
+    with httpx.Client(base_url=args.base_url, timeout=args.timeout) as client:
+        client.headers["Authorization"] = f"Bearer {login(client, args.email, args.password)}"
+        if args.retry:
+            request = client.build_request("POST", f"/campaign/bulk/{args.retry}/retry", params=params)
+        else:
+            params["format"] = args.format or ("jsonl" if args.file.suffix in (".jsonl", ".ndjson") else "csv")
+            request = client.build_request("POST", "/campaign/bulk", params=params, content=read_chunks(args.file))
+        response = client.send(request, stream=True)
+        try:
+            if response.status_code != 200:
+                response.read()
+                raise SystemExit(f"Erro {response.status_code}: {response.text}")
+            events_file = args.events.open("w", encoding="utf-8") if args.events else None
+            try:
+                for line in response.iter_lines():
+                    if not line.strip():
+                        continue
+                    if events_file:
+                        events_file.write(line + "\n")
+                    print_event(json.loads(line))
+            finally:
+                if events_file:
+                    events_file.close()
+        finally:
+            response.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""Teste de carga ponta a ponta da API de campanhas (maestroia/api/routes.py).
+
+Faz login em /token e dispara /campaign/run e /campaign/history numa taxa alvo (modo aberto,
+--rps) ou com N clientes simultâneos (modo fechado, --concurrency). Reporta vazão, latências
+p50/p95/p99, taxa de erro por rota e tempos por nó do grafo (`tempos_nos` da resposta), e
+salva tudo em JSON para comparar execuções.
+
+Servidor local com LLM falso (sem rede nem chaves):
+  LLM_PROVIDER=fake FAKE_LLM_LATENCY_MS=300 PUBLISH_MODE=outbox MOCK_PLATFORMS_URL=http://127.0.0.1:9100 \\
+      uvicorn maestroia.api.routes:app --port 8000
+
+Exemplos:
+  python scripts/load_test_campaigns.py --concurrency 8 --duration 60
+  python scripts/load_test_campaigns.py --rps 5 --duration 120 --history-ratio 0.3 --label fake-300ms
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+
+ROOT = Path(__file__).resolve().parents[1]
+LOAD_TEST_DIR = ROOT / "logs" / "load_tests"
+
+CAMPAIGNS = [
+    {"objetivo": "Vender cursos de yoga online", "publico_alvo": "Mulheres 30-45", "canais": ["Instagram", "Facebook"], "orcamento": 1500},
+    {"objetivo": "Gerar leads para software B2B", "publico_alvo": "Gestores de TI", "canais": ["LinkedIn"], "orcamento": 5000},
+    {"objetivo": "Lançar linha de cafés especiais", "publico_alvo": "Jovens urbanos 20-35", "canais": ["Instagram", "TikTok", "Twitter/X"], "orcamento": 3000},
+    {"objetivo": "Aumentar matrículas de academia", "publico_alvo": "Adultos 25-40", "canais": ["Facebook", "Google Ads"], "orcamento": 2000},
+]
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Percentil com interpolação linear (mesma convenção do numpy)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * pct / 100
+    low = int(pos)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (pos - low)
+
+
+def summarize(latencies: list[float]) -> dict[str, float]:
+    return {
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "media_ms": round(sum(latencies) / len(latencies) * 1000, 1) if latencies else 0.0,
+        "max_ms": round(max(latencies) * 1000, 1) if latencies else 0.0,
+    }
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.status: dict[str, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.node_times: dict[str, list[float]] = defaultdict(list)
+
+    def record(self, rota: str, latency: float, status: str, body: Any = None):
+        self.latencies[rota].append(latency)
+        self.status[rota][status] += 1
+        if isinstance(body, dict):
+            tempos = (body.get("result") or {}).get("tempos_nos") or {}
+            for node, seconds in tempos.items():
+                self.node_times[node].append(float(seconds))
+
+    def report(self, elapsed: float) -> dict[str, Any]:
+        rotas = {}
+        for rota, latencies in self.latencies.items():
+            total = len(latencies)
+            erros = sum(n for s, n in self.status[rota].items() if not s.startswith("2"))
+            rotas[rota] = {
+                "requisicoes": total,
+                "vazao_rps": round(total / elapsed, 2) if elapsed else 0.0,
+                "erros": erros,
+                "taxa_erro": round(erros / total, 4) if total else 0.0,
+                "status": dict(self.status[rota]),
+                **summarize(latencies),
+            }
+        total = sum(len(v) for v in self.latencies.values())
+        return {
+            "duracao_s": round(elapsed, 2),
+            "requisicoes": total,
+            "vazao_rps": round(total / elapsed, 2) if elapsed else 0.0,
+            "rotas": rotas,
+            "nos": {node: {"amostras": len(v), **summarize(v)} for node, v in self.node_times.items()},
+        }
+
+
+async def login(client: httpx.AsyncClient, email: str, password: str, register: bool) -> str:
+    if register:
+        # /register recebe query params; 400 = usuário já existe
+        await client.post("/register", params={"email": email, "password": password})
+    response = await client.post("/token", data={"username": email, "password": password})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def one_request(client: httpx.AsyncClient, recorder: Recorder, history_ratio: float, rng: random.Random):
+    if rng.random() < history_ratio:
+        rota, call = "GET /campaign/history", client.get("/campaign/history")
+    else:
+        payload = dict(rng.choice(CAMPAIGNS))
+        # campanha_id único: cada execução publica de fato em vez de cair na idempotência do outbox
+        payload["campanha_id"] = f"load-{time.time_ns()}-{rng.randrange(10**6)}"
+        rota, call = "POST /campaign/run", client.post("/campaign/run", json=payload)
+
+    inicio = time.perf_counter()
+    try:
+        response = await call
+        latency = time.perf_counter() - inicio
+        body = response.json() if response.headers.get("content-type", "").startswith("application/json") else None
+        recorder.record(rota, latency, str(response.status_code), body)
+    except httpx.HTTPError as e:
+        recorder.record(rota, time.perf_counter() - inicio, type(e).__name__)
+
+
+async def run_closed(client, recorder, args, rng):
+    """N clientes em laço: mede a vazão máxima sustentável com essa concorrência."""
+    deadline = time.perf_counter() + args.duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            await one_request(client, recorder, args.history_ratio, rng)
+
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+
+
+async def run_open(client, recorder, args, rng):
+    """Chegadas de Poisson na taxa alvo, independentes do tempo de resposta do servidor."""
+    deadline = time.perf_counter() + args.duration
+    tasks = set()
+    while time.perf_counter() < deadline:
+        task = asyncio.create_task(one_request(client, recorder, args.history_ratio, rng))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        await asyncio.sleep(rng.expovariate(args.rps))
+    if tasks:
+        await asyncio.wait(tasks)
+
+
+async def main_async(args) -> dict[str, Any]:
+    rng = random.Random(args.seed)
+    limits = httpx.Limits(max_connections=max(args.concurrency, 100), max_keepalive_connections=max(args.concurrency, 100))
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        token = await login(client, args.email, args.password, not args.no_register)
+        client.headers["Authorization"] = f"Bearer {token}"
+        recorder = Recorder()
+        inicio = time.perf_counter()
+        if args.rps:
+            await run_open(client, recorder, args, rng)
+        else:
+            await run_closed(client, recorder, args, rng)
+        elapsed = time.perf_counter() - inicio
+
+    return {
+        "label": args.label,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            "base_url": args.base_url,
+            "modo": "aberto" if args.rps else "fechado",
+            "rps": args.rps,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "history_ratio": args.history_ratio,
+        },
+        "resultado": recorder.report(elapsed),
+    }
+
+
+def print_report(report: dict[str, Any]):
+    resultado = report["resultado"]
+    print(f"\n=== {report['label'] or 'load test'} ({report['config']['modo']}) ===")
+    print(f"{resultado['requisicoes']} requisições em {resultado['duracao_s']}s -> {resultado['vazao_rps']} req/s")
+    for rota, r in resultado["rotas"].items():
+        print(f"  {rota:24} {r['vazao_rps']:>7} req/s  p50 {r['p50_ms']:>8}ms  p95 {r['p95_ms']:>8}ms  "
+              f"p99 {r['p99_ms']:>8}ms  erros {r['taxa_erro']:.2%}")
+    if resultado["nos"]:
+        print("  Tempos por nó:")
+        for node, r in resultado["nos"].items():
+            print(f"    {node:18} p50 {r['p50_ms']:>8}ms  p95 {r['p95_ms']:>8}ms  p99 {r['p99_ms']:>8}ms")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Teste de carga da API de campanhas MaestroIA")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--email", default="loadtest@maestroia.local")
+    parser.add_argument("--password", default="loadtest-password")
+    parser.add_argument("--no-register", action="store_true", help="não tenta criar o usuário antes do login")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--rps", type=float, default=0.0, help="taxa alvo (modo aberto)")
+    mode.add_argument("--concurrency", type=int, default=4, help="clientes simultâneos (modo fechado)")
+    parser.add_argument("--duration", type=float, default=30.0, help="segundos de carga")
+    parser.add_argument("--history-ratio", type=float, default=0.2, help="fração das requisições em /campaign/history")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--label", default="")
+    parser.add_argument("--output", type=Path, help="arquivo JSON (padrão: logs/load_tests/load_<timestamp>.json)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    report = asyncio.run(main_async(args))
+    print_report(report)
+
+    output = args.output
+    if output is None:
+        LOAD_TEST_DIR.mkdir(parents=True, exist_ok=True)
+        output = LOAD_TEST_DIR / f"load_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.json"
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"\nRelatório salvo em {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Move os resultados legados de `campaigns.resultado` para o result_store comprimido.
+
+Converte em lotes as linhas que ainda guardam o JSON inteiro, grava as seções em
+`result_blobs` (deduplicadas) e limpa a coluna antiga. Com --vacuum, compacta o arquivo
+SQLite no fim para devolver o espaço ao disco.
+
+Exemplos:
+  python scripts/migrate_campaign_results.py
+  python scripts/migrate_campaign_results.py --batch-size 200 --vacuum
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from sqlalchemy import text  # noqa: E402
+
+from maestroia.core.database import Campaign, SessionLocal, engine, init_db  # noqa: E402
+from maestroia.services import result_store  # noqa: E402
+
+
+def _db_size() -> int | None:
+    path = engine.url.database
+    return os.path.getsize(path) if engine.url.get_backend_name() == "sqlite" and path and os.path.exists(path) else None
+
+
+def migrate(batch_size: int = 100) -> int:
+    convertidas, last_id = 0, 0
+    init_db()
+    while True:
+        db = SessionLocal()
+        try:
+            rows = (
+                db.query(Campaign)
+                .filter(Campaign.id > last_id, Campaign.resultado.isnot(None), Campaign.resultado_ref.is_(None))
+                .order_by(Campaign.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not rows:
+                return convertidas
+            for campaign in rows:
+                campaign.resultado_ref = result_store.save_result(db, json.loads(campaign.resultado))
+                campaign.resultado = None
+            db.commit()
+            convertidas += len(rows)
+            last_id = rows[-1].id
+            print(f"{convertidas} campanhas convertidas (até id {last_id})")
+        finally:
+            db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--vacuum", action="store_true", help="compacta o SQLite ao final")
+    args = parser.parse_args()
+
+    antes = _db_size()
+    total = migrate(args.batch_size)
+    if args.vacuum and engine.url.get_backend_name() == "sqlite":
+        with engine.connect() as conn:
+            conn.execution_options(isolation_level="AUTOCOMMIT").execute(text("VACUUM"))
+    depois = _db_size()
+    print(f"{total} campanhas migradas")
+    if antes is not None and depois is not None:
+        print(f"Banco: {antes / 1024:.0f} KiB -> {depois / 1024:.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Importa o antigo users.json do app Streamlit para a tabela `users`.
+
+Roda uma vez: cada conta vira uma linha, com nome, plano, contador de campanhas e data de
+cadastro. O hash sha256 é mantido e trocado por bcrypt no primeiro login. Emails que já
+existem na tabela (contas criadas pela API) só recebem os campos que ainda estão vazios.
+No fim o arquivo é renomeado para users.json.migrated, a menos que se passe --keep.
+
+Exemplos:
+  python scripts/migrate_users_json.py
+  python scripts/migrate_users_json.py --file /caminho/users.json --keep
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from maestroia.core.database import SessionLocal, User, init_db  # noqa: E402
+
+
+def _created_at(value) -> datetime | None:
+    try:
+        return datetime.fromisoformat(value) if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+def migrate(users: dict) -> tuple[int, int]:
+    """(contas criadas, contas já existentes completadas)."""
+    criadas = completadas = 0
+    init_db()
+    db = SessionLocal()
+    try:
+        existentes = {u.email: u for u in db.query(User).filter(User.email.in_(list(users)))}
+        for email, data in users.items():
+            campos = {
+                "hashed_password": data.get("password_hash"),
+                "display_name": data.get("display_name"),
+                "plano": data.get("plano", "free"),
+                "pago": bool(data.get("pago", False)),
+                "campanhas_mes": int(data.get("campanhas_mes", 0)),
+                "logged_in": bool(data.get("logged_in", False)),
+                "created_at": _created_at(data.get("created_at")),
+            }
+            user = existentes.get(email)
+            if user is None:
+                db.add(User(email=email, **campos))
+                criadas += 1
+                continue
+            for campo, valor in campos.items():
+                if getattr(user, campo) is None:
+                    setattr(user, campo, valor)
+            completadas += 1
+        db.commit()
+    finally:
+        db.close()
+    return criadas, completadas
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--file", default=str(ROOT / "users.json"), help="caminho do users.json")
+    parser.add_argument("--keep", action="store_true", help="não renomear o arquivo depois de importar")
+    args = parser.parse_args()
+
+    path = Path(args.file)
+    if not path.exists():
+        print(f"{path} não encontrado; nada a migrar")
+        return
+    with path.open(encoding="utf-8") as f:
+        users = json.load(f)
+    criadas, completadas = migrate(users)
+    print(f"{criadas} contas criadas, {completadas} já existiam")
+    if not args.keep:
+        destino = path.with_name(path.name + ".migrated")
+        path.rename(destino)
+        print(f"{path.name} renomeado para {destino.name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""Relatório dos traces exportados em JSONL (TRACE_EXPORTER=jsonl).
+
+Mostra, para uma campanha, o caminho crítico (a cadeia de spans que determinou a duração
+total) e a fatia de cada nó do grafo; com --all, agrega todas as campanhas do arquivo.
+
+Exemplos:
+  python scripts/trace_report.py                      # última campanha de logs/traces.jsonl
+  python scripts/trace_report.py --trace 3f2a...      # campanha específica
+  python scripts/trace_report.py --all --json         # agregado em JSON
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+from collections import defaultdict
+from pathlib import Path
+from typing import Any
+
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_TRACE_FILE = ROOT / "logs" / "traces.jsonl"
+
+
+def load_traces(path: Path, root_name: str = "campanha") -> dict[str, list[dict[str, Any]]]:
+    traces: dict[str, list[dict[str, Any]]] = defaultdict(list)
+    with path.open("r", encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            if line:
+                span = json.loads(line)
+                traces[span["trace_id"]].append(span)
+    return {
+        trace_id: spans
+        for trace_id, spans in traces.items()
+        if any(s["parent_id"] is None and s["name"] == root_name for s in spans)
+    }
+
+
+def _children(spans: list[dict[str, Any]]) -> dict[str | None, list[dict[str, Any]]]:
+    children = defaultdict(list)
+    for span in spans:
+        children[span["parent_id"]].append(span)
+    return children
+
+
+def critical_path(spans: list[dict[str, Any]]) -> list[tuple[int, dict[str, Any]]]:
+    """Cadeia (profundidade, span) que determinou o fim do trace.
+
+    Em cada nível parte do filho que terminou por último e volta no tempo escolhendo o filho
+    que terminou mais tarde antes do início do anterior — filhos em paralelo fora dessa
+    cadeia não influenciam a duração.
+    """
+    children = _children(spans)
+    root = next(s for s in spans if s["parent_id"] is None)
+    path: list[tuple[int, dict[str, Any]]] = []
+
+    def walk(span: dict[str, Any], depth: int):
+        path.append((depth, span))
+        chain = []
+        limit = span["end_ns"]
+        candidates = sorted(children.get(span["span_id"], []), key=lambda s: s["end_ns"], reverse=True)
+        for child in candidates:
+            if child["end_ns"] <= limit:
+                chain.append(child)
+                limit = child["start_ns"]
+        for child in reversed(chain):
+            walk(child, depth + 1)
+
+    walk(root, 0)
+    return path
+
+
+def node_shares(spans: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    root = next(s for s in spans if s["parent_id"] is None)
+    total = root["duration_ms"] or 1.0
+    nodes = [s for s in spans if s["parent_id"] == root["span_id"] and s["name"].startswith("no.")]
+    return [
+        {
+            "no": s["name"][3:],
+            "duracao_ms": round(s["duration_ms"], 1),
+            "fatia": round(s["duration_ms"] / total, 4),
+            "cache_hit": s["attributes"].get("cache_hit"),
+        }
+        for s in sorted(nodes, key=lambda s: s["start_ns"])
+    ]
+
+
+def trace_summary(trace_id: str, spans: list[dict[str, Any]]) -> dict[str, Any]:
+    root = next(s for s in spans if s["parent_id"] is None)
+    return {
+        "trace_id": trace_id,
+        "duracao_ms": round(root["duration_ms"], 1),
+        "atributos": root["attributes"],
+        "nos": node_shares(spans),
+        "caminho_critico": [
+            {"profundidade": depth, "span": s["name"], "duracao_ms": round(s["duration_ms"], 1), "atributos": s["attributes"]}
+            for depth, s in critical_path(spans)
+        ],
+    }
+
+
+def aggregate(traces: dict[str, list[dict[str, Any]]]) -> dict[str, Any]:
+    shares: dict[str, list[float]] = defaultdict(list)
+    durations: dict[str, list[float]] = defaultdict(list)
+    totals = []
+    for spans in traces.values():
+        root = next(s for s in spans if s["parent_id"] is None)
+        totals.append(root["duration_ms"])
+        for node in node_shares(spans):
+            shares[node["no"]].append(node["fatia"])
+        for span in spans:
+            if span["parent_id"] is not None:
+                durations[span["name"]].append(span["duration_ms"])
+
+    def quantile(values: list[float], q: int) -> float:
+        return round(statistics.quantiles(values, n=100)[q - 1], 1) if len(values) > 1 else round(values[0], 1)
+
+    return {
+        "campanhas": len(traces),
+        "duracao_media_ms": round(statistics.mean(totals), 1) if totals else 0.0,
+        "fatia_media_por_no": {no: round(statistics.mean(v), 4) for no, v in shares.items()},
+        "spans": {
+            name: {"chamadas": len(v), "p50_ms": quantile(v, 50), "p95_ms": quantile(v, 95)}
+            for name, v in sorted(durations.items())
+        },
+    }
+
+
+def print_summary(summary: dict[str, Any]):
+    print(f"Campanha {summary['trace_id']} — {summary['duracao_ms']} ms")
+    print("\nFatia por nó:")
+    for node in summary["nos"]:
+        bar = "#" * int(node["fatia"] * 40)
+        cache = " (memória)" if node["cache_hit"] else ""
+        print(f"  {node['no']:18} {node['duracao_ms']:>9} ms  {node['fatia']:>6.1%}  {bar}{cache}")
+    print("\nCaminho crítico:")
+    for item in summary["caminho_critico"]:
+        attrs = {k: v for k, v in item["atributos"].items() if k in ("model", "canal", "prompt_tokens", "cache_hit", "fallback")}
+        extra = f"  {attrs}" if attrs else ""
+        print(f"  {'  ' * item['profundidade']}{item['span']:<{30 - 2 * item['profundidade']}} {item['duracao_ms']:>9} ms{extra}")
+
+
+def print_aggregate(report: dict[str, Any]):
+    print(f"{report['campanhas']} campanhas — duração média {report['duracao_media_ms']} ms")
+    print("\nFatia média por nó:")
+    for no, share in sorted(report["fatia_media_por_no"].items(), key=lambda item: -item[1]):
+        print(f"  {no:18} {share:>6.1%}")
+    print("\nSpans:")
+    for name, stats in report["spans"].items():
+        print(f"  {name:26} {stats['chamadas']:>6}x  p50 {stats['p50_ms']:>9} ms  p95 {stats['p95_ms']:>9} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Caminho crítico e fatia por nó dos traces MaestroIA")
+    parser.add_argument("--file", type=Path, default=DEFAULT_TRACE_FILE)
+    parser.add_argument("--trace", help="trace_id (padrão: a campanha mais recente)")
+    parser.add_argument("--all", action="store_true", help="agrega todas as campanhas do arquivo")
+    parser.add_argument("--json", action="store_true", help="saída em JSON")
+    args = parser.parse_args()
+
+    traces = load_traces(args.file)
+    if not traces:
+        raise SystemExit(f"Nenhuma campanha encontrada em {args.file}")
+
+    if args.all:
+        report = aggregate(traces)
+        print(json.dumps(report, ensure_ascii=False, indent=2)) if args.json else print_aggregate(report)
+        return
+
+    if args.trace:
+        if args.trace not in traces:
+            raise SystemExit(f"Trace {args.trace} não encontrado")
+        trace_id = args.trace
+    else:
+        trace_id = max(traces, key=lambda t: max(s["end_ns"] for s in traces[t]))
+    summary = trace_summary(trace_id, traces[trace_id])
+    print(json.dumps(summary, ensure_ascii=False, indent=2)) if args.json else print_summary(summary)
+
+
+if __name__ == "__main__":
+    main()
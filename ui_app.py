@@ -1,9 +1,9 @@
 import requests
 import streamlit as st
 import json
-import os
 import hashlib
 import re
+import uuid
 import warnings
 from io import BytesIO
 from datetime import datetime, timedelta
@@ -16,6 +16,11 @@ from reportlab.lib.units import inch
 warnings.filterwarnings("ignore", message="Core Pydantic V1 functionality isn't compatible with Python 3.14 or greater")
 
 from maestroia.graphs.marketing_graph import build_marketing_graph
+from maestroia.services.scheduler import get_scheduler, HORARIOS_IDEAIS
+from maestroia.core import profiling
+from maestroia.core.database import init_db
+from maestroia.config.settings import DB_AUTO_MIGRATE
+from maestroia.services.user_service import get_user_repository
 
 # Mercado Pago
 import mercadopago
@@ -41,8 +46,12 @@ def criar_preferencia_pagamento(email, plano_nome, valor):
     }
     preference_response = sdk.preference().create(preference_data)
     return preference_response["response"].get("init_point")
-# Arquivo para armazenar usuários
-USERS_FILE = "users.json"
+# Schema atualizado uma vez por processo (o Streamlit reexecuta o script a cada interação)
+if DB_AUTO_MIGRATE:
+    init_db()
+
+# Usuários ficam na tabela `users` (scripts/migrate_users_json.py importa o antigo users.json)
+user_repo = get_user_repository()
 
 # Planos disponíveis
 PLANOS = {
@@ -80,25 +89,6 @@ PLANOS = {
     }
 }
 
-def load_users():
-    """Carrega usuários do arquivo JSON"""
-    if os.path.exists(USERS_FILE):
-        try:
-            with open(USERS_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except:
-            return {}
-    return {}
-
-def save_users(users):
-    """Salva usuários no arquivo JSON"""
-    with open(USERS_FILE, 'w', encoding='utf-8') as f:
-        json.dump(users, f, indent=2, ensure_ascii=False)
-
-def hash_password(password):
-    """Hash da senha para armazenamento seguro"""
-    return hashlib.sha256(password.encode()).hexdigest()
-
 def validate_email(email):
     """Valida formato do email"""
     pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
@@ -150,10 +140,7 @@ def pode_executar_campanha(user_data):
 
 def incrementar_campanha_usuario(email):
     """Incrementa contador de campanhas do usuário"""
-    users = load_users()
-    if email in users:
-        users[email]["campanhas_mes"] = users[email].get("campanhas_mes", 0) + 1
-        save_users(users)
+    user_repo.increment_campaigns(email)
 
 def gerar_pdf_campanha(result, objetivo, publico, canais, orcamento):
     """Gera um PDF com os resultados da campanha"""
@@ -527,13 +514,11 @@ if "logged_in" not in st.session_state:
 
 # Verificar se há usuário logado persistentemente
 if not st.session_state.logged_in:
-    users = load_users()
-    for email, user_data in users.items():
-        if user_data.get("logged_in", False):
-            st.session_state.logged_in = True
-            st.session_state.email = email
-            st.session_state.display_name = user_data.get("display_name", "Usuário")
-            break
+    user_data = user_repo.find_logged_in()
+    if user_data:
+        st.session_state.logged_in = True
+        st.session_state.email = user_data["email"]
+        st.session_state.display_name = user_data.get("display_name", "Usuário")
 
 if not st.session_state.logged_in:
     # Sistema de autenticação com abas
@@ -573,14 +558,12 @@ if not st.session_state.logged_in:
             )
 
             if st.button("📝 Criar Conta", type="primary", use_container_width=True):
-                users = load_users()
-
                 # Validações
                 if not reg_display_name.strip():
                     st.error("❌ Digite um nome de exibição!")
                 elif not validate_email(reg_email):
                     st.error("❌ Digite um email válido!")
-                elif reg_email in users:
+                elif user_repo.exists(reg_email):
                     st.error("❌ Este email já está cadastrado!")
                 elif reg_password != reg_confirm_password:
                     st.error("❌ As senhas não coincidem!")
@@ -590,16 +573,12 @@ if not st.session_state.logged_in:
                         st.error(f"❌ {msg}")
                     else:
                         # Criar conta
-                        users[reg_email] = {
-                            "display_name": reg_display_name.strip(),
-                            "password_hash": hash_password(reg_password),
-                            "created_at": str(st.session_state.get("current_time", "2025-12-30"))
-                        }
-                        save_users(users)
-
-                        st.success("✅ Conta criada com sucesso!")
-                        st.info("Agora você pode fazer login com suas credenciais.")
-                        st.balloons()
+                        if user_repo.create(reg_email, reg_password, reg_display_name.strip()) is None:
+                            st.error("❌ Este email já está cadastrado!")
+                        else:
+                            st.success("✅ Conta criada com sucesso!")
+                            st.info("Agora você pode fazer login com suas credenciais.")
+                            st.balloons()
 
         st.markdown('</div>', unsafe_allow_html=True)
 
@@ -623,30 +602,30 @@ if not st.session_state.logged_in:
             )
 
             if st.button("🚀 Entrar", type="primary", use_container_width=True):
-                users = load_users()
-
                 if not login_email or not login_password:
                     st.error("❌ Preencha email e senha!")
-                elif login_email not in users:
+                elif not user_repo.exists(login_email):
                     st.error("❌ Email não encontrado! Faça seu cadastro primeiro.")
-                elif users[login_email]["password_hash"] != hash_password(login_password):
-                    st.error("❌ Senha incorreta!")
                 else:
-                    # Login bem-sucedido
-                    users[login_email]["logged_in"] = True
-                    save_users(users)
-                    st.session_state.logged_in = True
-                    st.session_state.display_name = users[login_email]["display_name"]
-                    st.session_state.email = login_email
-                    st.success(f"✅ Bem-vindo de volta, {users[login_email]['display_name']}!")
-                    st.rerun()
+                    login_user = user_repo.authenticate(login_email, login_password)
+                    if login_user is None:
+                        st.error("❌ Senha incorreta!")
+                    else:
+                        # Login bem-sucedido
+                        user_repo.set_logged_in(login_email, True)
+                        st.session_state.logged_in = True
+                        st.session_state.display_name = login_user["display_name"]
+                        st.session_state.email = login_email
+                        st.success(f"✅ Bem-vindo de volta, {login_user['display_name']}!")
+                        st.rerun()
 
         st.markdown('</div>', unsafe_allow_html=True)
 else:
     # Carregar dados do usuário
-    users = load_users()
     user_email = st.session_state.email
-    user_data = users.get(user_email, {})
+    user_data = user_repo.get(user_email) or {}
+    # Mesmo tenant da API (id do usuário): memória de campanhas e agendamentos são um só por conta
+    tenant_id = str(user_data.get("id") or user_email)
     display_name = st.session_state.get("display_name", "Usuário")
 
     # Verificar status do plano
@@ -685,10 +664,7 @@ else:
             st.warning(f"🆓 {plano_info['nome']}")
 
         if st.button("🚪 Sair", use_container_width=True):
-            users = load_users()
-            if user_email in users:
-                users[user_email]["logged_in"] = False
-                save_users(users)
+            user_repo.set_logged_in(user_email, False)
             st.session_state.logged_in = False
             st.rerun()
 
@@ -782,9 +758,18 @@ else:
                     "objetivo": objetivo,
                     "publico_alvo": publico,
                     "canais": canais,
-                    "orcamento": orcamento
+                    "orcamento": orcamento,
+                    "tenant_id": tenant_id,
+                    # Cada clique em executar é uma campanha nova para o outbox de publicações
+                    "campanha_id": f"ui-{uuid.uuid4().hex}"
                 }
-                result = graph.invoke(state)
+                # Admin com ?profile=1 na URL (ou sorteio por PROFILING_SAMPLE_RATE) gera perfil da execução
+                perfilar = profiling.should_profile(st.query_params.get("profile") == "1", user_email)
+                run_id = f"ui-{datetime.now().strftime('%Y%m%d%H%M%S')}-{hashlib.sha256(user_email.encode()).hexdigest()[:6]}"
+                with profiling.profile(run_id, enabled=perfilar, rota="streamlit", usuario=user_email):
+                    result = graph.invoke(state)
+                if perfilar:
+                    st.caption(f"🔬 Perfil gravado: `{run_id}` (python -m maestroia.core.profiling show {run_id})")
                 st.session_state.last_result = result
                 st.session_state.campaign_executed = True
                 st.session_state.campaign_data = state
@@ -1218,15 +1203,7 @@ else:
         # Análise de horários ideais
         st.markdown("#### 🕐 Horários Mais Acessados no Nicho")
 
-        # Simulação de dados de horários (futuramente integrar com analytics reais)
-        horarios_ideais = {
-            "Instagram": ["08:00-10:00", "18:00-20:00", "12:00-14:00"],
-            "Facebook": ["13:00-15:00", "19:00-21:00", "09:00-11:00"],
-            "Twitter/X": ["12:00-14:00", "18:00-20:00", "08:00-10:00"],
-            "LinkedIn": ["07:00-09:00", "12:00-14:00", "17:00-19:00"],
-            "TikTok": ["18:00-22:00", "12:00-14:00", "08:00-10:00"],
-            "YouTube": ["14:00-16:00", "19:00-21:00", "11:00-13:00"]
-        }
+        horarios_ideais = HORARIOS_IDEAIS
 
         col1, col2 = st.columns(2)
         with col1:
@@ -1258,13 +1235,32 @@ else:
                 with col3:
                     hora_agendamento = st.time_input("Hora:")
 
+                horario_automatico = st.checkbox("🕐 Usar o próximo horário ideal da plataforma", value=True)
+
                 if st.button("📅 Agendar Post", type="primary"):
-                    # Simulação de agendamento (futuramente integrar com scheduler real)
-                    st.success(f"✅ Post agendado para {plataforma} em {data_agendamento} às {hora_agendamento}")
-                    # TODO: Salvar no banco de dados ou scheduler
+                    conteudo_agendado = st.session_state.last_result["conteudos"][selected_conteudo - 1]
+                    quando = None if horario_automatico else datetime.combine(data_agendamento, hora_agendamento)
+                    if quando is not None and quando <= datetime.now():
+                        st.error("❌ Escolha um horário no futuro.")
+                    else:
+                        agendado = get_scheduler().schedule(tenant_id, plataforma, conteudo_agendado, when=quando)
+                        st.success(f"✅ Post agendado para {plataforma} em {agendado['horario']:%d/%m/%Y às %H:%M}")
             else:
                 st.info("📝 Aprove conteúdos na aba de Resultados primeiro.")
         else:
             st.info("📝 Execute e aprove conteúdos primeiro para agendar posts.")
 
+        # Próximos posts agendados do usuário
+        agendados = get_scheduler().list_scheduled(tenant_id)
+        if agendados:
+            st.markdown("#### 🗓️ Próximos Posts Agendados")
+            for post in agendados:
+                col1, col2 = st.columns([4, 1])
+                with col1:
+                    st.markdown(f"**{post['canal']}** — {post['horario']:%d/%m/%Y %H:%M}: {post['conteudo'][:80]}...")
+                with col2:
+                    if st.button("🗑️ Cancelar", key=f"cancelar_agendamento_{post['id']}"):
+                        get_scheduler().cancel(tenant_id, post['id'])
+                        st.rerun()
+
         st.markdown('</div>', unsafe_allow_html=True)
\ No newline at end of file